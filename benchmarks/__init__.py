@@ -0,0 +1,4 @@
+"""Benchmark suite for desper, dsdl and monospace hot paths.
+
+Run from the repository root with ``python -m benchmarks``.
+"""
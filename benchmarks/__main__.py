@@ -0,0 +1,6 @@
+"""Run the benchmark suite(see :py:func:`benchmarks.runner.main`)."""
+from . import (bench_ecs, bench_coroutines, bench_collisions, bench_game,
+               bench_res, bench_db, bench_memory)
+from .runner import main
+
+main()
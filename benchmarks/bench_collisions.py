@@ -0,0 +1,107 @@
+"""Benchmarks for :py:mod:`dsdl.collisions`."""
+import random
+import desper
+import dsdl
+from .runner import benchmark, timer
+
+WIDTH = 1080
+HEIGHT = 1920
+GRID_SIZE = 100
+NUM_BOXES = 500
+NUM_PAIRS = 1000
+
+
+def make_boxes(num_boxes=NUM_BOXES, seed=0):
+    """Build bounding boxes scattered over the benchmark area."""
+    rng = random.Random(seed)
+    boxes = []
+    for _ in range(num_boxes):
+        bbox = dsdl.BoundingBox(w=rng.randint(20, 150),
+                                h=rng.randint(20, 150))
+        bbox.x = rng.uniform(0, WIDTH)
+        bbox.y = rng.uniform(0, HEIGHT)
+        boxes.append(bbox)
+
+    return boxes
+
+
+def make_colliders(num_pairs=NUM_PAIRS, seed=0):
+    """Build pairs of mixed colliders(boxes and circles)."""
+    rng = random.Random(seed)
+    pairs = []
+    for _ in range(num_pairs):
+        pair = []
+        for _ in range(2):
+            if rng.random() < .5:
+                collider = dsdl.BoundingBox(w=rng.randint(20, 150),
+                                            h=rng.randint(20, 150))
+            else:
+                collider = dsdl.CollisionCircle(rng.randint(10, 75))
+            collider.x = rng.uniform(0, 300)
+            collider.y = rng.uniform(0, 300)
+            pair.append(collider)
+
+        pairs.append(tuple(pair))
+
+    return pairs
+
+
+@benchmark('collisions.spatial_hash.update', loops=20)
+def bench_spatial_hash_update(loops):
+    spatial_hash = dsdl.SpatialHash(WIDTH, HEIGHT, GRID_SIZE)
+    couples = [(object(), bbox) for bbox in make_boxes()]
+
+    start = timer()
+    for _ in range(loops):
+        # Move everything down, as enemies do
+        for couple in couples:
+            bbox = couple[1]
+            bbox.y = (bbox.y + 7) % HEIGHT
+            spatial_hash.update(couple)
+
+    return timer() - start
+
+
+@benchmark('collisions.spatial_hash.get_from_bbox', loops=20)
+def bench_spatial_hash_get(loops):
+    spatial_hash = dsdl.SpatialHash(WIDTH, HEIGHT, GRID_SIZE)
+    for bbox in make_boxes():
+        spatial_hash.update((object(), bbox))
+    queries = make_boxes(seed=1)
+
+    start = timer()
+    for _ in range(loops):
+        for bbox in queries:
+            spatial_hash.get_from_bbox(bbox)
+
+    return timer() - start
+
+
+@benchmark('collisions.check_collisions', loops=50)
+def bench_check_collisions(loops):
+    pairs = make_colliders()
+
+    start = timer()
+    for _ in range(loops):
+        for collider1, collider2 in pairs:
+            dsdl.check_collisions(collider1, collider2)
+
+    return timer() - start
+
+
+@benchmark('collisions.bbox_processor', loops=100)
+def bench_bbox_processor(loops):
+    world = desper.AbstractWorld()
+    processor = dsdl.BoundingBoxProcessor()
+    world.add_processor(processor)
+
+    offsets = list(dsdl.Offset) + [(5, 40)]
+    for i, bbox in enumerate(make_boxes()):
+        bbox.offset = offsets[i % len(offsets)]
+        world.create_entity(dsdl.Position(bbox.x, bbox.y), bbox)
+
+    start = timer()
+    for _ in range(loops):
+        processor.process()
+
+    return timer() - start
@@ -0,0 +1,44 @@
+"""Benchmarks for :class:`desper.CoroutineProcessor`."""
+import desper
+from .runner import benchmark, timer
+
+NUM_COROUTINES = 1000
+
+
+def active_coroutine():
+    """Coroutine resumed at each frame."""
+    while True:
+        yield
+
+
+def waiting_coroutine(wait):
+    """Coroutine paused for `wait` frames at each resume."""
+    while True:
+        yield wait
+
+
+def make_processor(num_coroutines=NUM_COROUTINES):
+    """Build a processor running the given number of coroutines.
+
+    Half of them are resumed at each frame, the other half wait for a
+    variable number of frames.
+    """
+    processor = desper.CoroutineProcessor()
+    for i in range(num_coroutines):
+        if i % 2:
+            processor.start(waiting_coroutine(i % 60 + 1))
+        else:
+            processor.start(active_coroutine())
+
+    return processor
+
+
+@benchmark('coroutines.process', loops=200)
+def bench_process(loops):
+    processor = make_processor()
+
+    start = timer()
+    for _ in range(loops):
+        processor.process()
+
+    return timer() - start
@@ -0,0 +1,59 @@
+"""Benchmarks for the commit latency of the game db.
+
+Updates are executed on a copy of the main db, with the default sqlite
+configuration and with the one of :py:func:`monospace.connect_db`.
+"""
+import os.path as pt
+import shutil
+import sqlite3
+import tempfile
+import monospace
+from .runner import benchmark, timer
+
+MAIN_DB = pt.join(monospace.simulation.RES_DIR, 'db', 'main.db')
+BATCH_SIZE = 10     # Statements per transaction, for batched benchmarks
+
+OPTION_UPDATE_QUERY = 'UPDATE `options` SET `value`=? WHERE `option_name`=?'
+
+
+def time_updates(connect, loops, batch_size=1):
+    """Time option updates on a temporary copy of the main db.
+
+    :param connect: Function opening a connection, given a filename.
+    :param batch_size: Number of updates committed at once.
+    """
+    with tempfile.TemporaryDirectory() as dirname:
+        filename = pt.join(dirname, 'bench.db')
+        shutil.copy2(MAIN_DB, filename)
+        db = connect(filename)
+
+        start = timer()
+        for i in range(loops):
+            for _ in range(batch_size):
+                db.execute(OPTION_UPDATE_QUERY, (i % 2, 'sfx'))
+            db.commit()
+        elapsed = timer() - start
+
+        db.close()
+
+    return elapsed
+
+
+@benchmark('db.commit.default', loops=100)
+def bench_commit_default(loops):
+    return time_updates(sqlite3.connect, loops)
+
+
+@benchmark('db.commit.wal', loops=100)
+def bench_commit_wal(loops):
+    return time_updates(monospace.connect_db, loops)
+
+
+@benchmark('db.commit.default.batch', loops=100)
+def bench_commit_default_batch(loops):
+    return time_updates(sqlite3.connect, loops, BATCH_SIZE)
+
+
+@benchmark('db.commit.wal.batch', loops=100)
+def bench_commit_wal_batch(loops):
+    return time_updates(monospace.connect_db, loops, BATCH_SIZE)
@@ -0,0 +1,129 @@
+"""Benchmarks for :class:`desper.AbstractWorld` queries and churn."""
+import desper
+import dsdl
+from .runner import benchmark, timer
+
+TREE_DEPTH = 4
+TREE_BRANCHING = 3
+NUM_ENTITIES = 1000
+NUM_CHURN = 1000
+
+
+class Root:
+    """Root of the benchmarked component hierarchy."""
+
+
+def make_tree(depth=TREE_DEPTH, branching=TREE_BRANCHING):
+    """Build a tree of subclasses of :class:`Root`.
+
+    :return: The list of the leaf classes.
+    """
+    level = [Root]
+    for depth_index in range(depth - 1):
+        level = [type('Node{}_{}'.format(depth_index, i), (parent,), {})
+                 for i, parent in enumerate(
+                     parent for parent in level
+                     for _ in range(branching))]
+
+    return level
+
+
+# Built once, since subclasses are registered globally in their parents
+LEAVES = make_tree()
+
+
+def make_world(num_entities=NUM_ENTITIES):
+    """Build a world populated with components from the tree.
+
+    :return: A tuple (world, entities).
+    """
+    world = desper.AbstractWorld()
+    entities = [world.create_entity(LEAVES[i % len(LEAVES)]())
+                for i in range(num_entities)]
+
+    return world, entities
+
+
+@benchmark('ecs.get_component.deep', loops=20)
+def bench_get_component(loops):
+    world, _ = make_world()
+
+    start = timer()
+    for _ in range(loops):
+        world.clear_cache()         # Measure the actual query
+        world.get_component(Root)
+
+    return timer() - start
+
+
+@benchmark('ecs.get_component.cached', loops=10000)
+def bench_get_component_cached(loops):
+    world, _ = make_world()
+    world.get_component(Root)
+
+    start = timer()
+    for _ in range(loops):
+        world.get_component(Root)
+
+    return timer() - start
+
+
+@benchmark('ecs.try_component.deep', loops=10)
+def bench_try_component(loops):
+    world, entities = make_world()
+
+    start = timer()
+    for _ in range(loops):
+        for entity in entities:
+            world.try_component(entity, Root)
+
+    return timer() - start
+
+
+@benchmark('ecs.entity_churn', loops=10)
+def bench_entity_churn(loops):
+    world = desper.AbstractWorld()
+
+    start = timer()
+    for _ in range(loops):
+        entities = [world.create_entity(dsdl.Position(), dsdl.Velocity(),
+                                        LEAVES[0]())
+                    for _ in range(NUM_CHURN)]
+
+        for entity in entities:
+            world.delete_entity(entity)
+        world.process()             # Actually delete dead entities
+
+    return timer() - start
+
+
+def particle_churn(world, spawn, loops):
+    """Time the spawn and deletion of :py:data:`NUM_CHURN` particles,
+    given a spawning function ``spawn(world)``."""
+    start = timer()
+    for _ in range(loops):
+        entities = [spawn(world) for _ in range(NUM_CHURN)]
+
+        for entity in entities:
+            world.delete_entity(entity)
+        world.process()             # Actually delete dead entities
+
+    return timer() - start
+
+
+@benchmark('ecs.particle_churn', loops=10)
+def bench_particle_churn(loops):
+    return particle_churn(
+        desper.AbstractWorld(),
+        lambda world: world.create_entity(
+            dsdl.Particle(30), dsdl.Position(offset=dsdl.Offset.CENTER),
+            None, dsdl.Velocity()),
+        loops)
+
+
+@benchmark('ecs.particle_churn.pooled', loops=10)
+def bench_particle_churn_pooled(loops):
+    pool = dsdl.ParticlePool(NUM_CHURN)
+    return particle_churn(
+        desper.AbstractWorld(),
+        lambda world: pool.acquire(world, None, 0, 0, 0, 0, 30), loops)
@@ -0,0 +1,58 @@
+"""Benchmarks for the whole game, stepped headlessly."""
+import dsdl
+import monospace
+from .runner import benchmark, timer
+
+SEED = 0
+WARMUP_TICKS = 300
+
+_model = None
+
+
+def get_model():
+    """Get the headless model, built once per process."""
+    global _model
+
+    if _model is None:
+        _model = monospace.init_headless_model(seed=SEED)
+
+    return _model
+
+
+def start_late_game(model):
+    """Start a new game directly from the infinite wave.
+
+    A few ticks are executed, so that the screen gets populated.
+    """
+    window_size = model.get_window_size()
+    dsdl.set_input_source(
+        dsdl.ScriptedInput(monospace.simulation.sweep_input(*window_size)))
+
+    game_handle = model.res['game_world']
+    game_handle.clear()
+    model.world_handle_stack.clear()
+    model.switch(game_handle, stack=True)
+
+    game = model.current_world.get_processor(monospace.GameProcessor)
+    game._cur_threshold = len(game.waves) - 1
+
+    model.step(WARMUP_TICKS)
+
+
+@benchmark('game.inf_wave.step', loops=500)
+def bench_inf_wave_step(loops):
+    model = get_model()
+    game_handle = model.res['game_world']
+    start_late_game(model)
+
+    elapsed = 0
+    for _ in range(loops):
+        # Restart if the ship died(not measured)
+        if model.current_world_handle is not game_handle:
+            start_late_game(model)
+
+        start = timer()
+        model.step()
+        elapsed += timer() - start
+
+    return elapsed
@@ -0,0 +1,76 @@
+"""Benchmarks for the memory footprint of live particles.
+
+The runner only measures time(building the particles). Run this module
+to print the memory used by :py:data:`NUM_PARTICLES` live particles::
+
+    python -m benchmarks.bench_memory
+"""
+import tracemalloc
+import desper
+import dsdl
+from .runner import benchmark, timer
+
+NUM_PARTICLES = 100000
+
+
+def spawn_particles(world, num=NUM_PARTICLES):
+    """Populate a world with particles, like the game does(see
+    :class:`dsdl.ParticlePool`)."""
+    return [world.create_entity(
+        dsdl.Particle(30, -0.1 / 64, -0.002),
+        dsdl.Position(i, i, dsdl.Offset.CENTER, 6 / 64, 10 / 64),
+        None, dsdl.Velocity(1, 1)) for i in range(num)]
+
+
+def measure_particles(num=NUM_PARTICLES):
+    """Measure the memory used by live particles.
+
+    :return: A tuple (components, total) of sizes in bytes: the memory
+             used by the components alone, and by the components along
+             with the world bookkeeping.
+    """
+    tracemalloc.start()
+
+    start = tracemalloc.take_snapshot()
+    components = [(dsdl.Particle(30), dsdl.Position(i, i, dsdl.Offset.CENTER),
+                   dsdl.Velocity(1, 1)) for i in range(num)]
+    components_size = sum(
+        stat.size_diff
+        for stat in tracemalloc.take_snapshot().compare_to(start, 'filename'))
+    del components
+
+    start = tracemalloc.take_snapshot()
+    world = desper.AbstractWorld()
+    spawn_particles(world, num)
+    total_size = sum(
+        stat.size_diff
+        for stat in tracemalloc.take_snapshot().compare_to(start, 'filename'))
+
+    tracemalloc.stop()
+    return components_size, total_size
+
+
+@benchmark('memory.particles.build', loops=1)
+def bench_particles_build(loops):
+    elapsed = 0
+    for _ in range(loops):
+        world = desper.AbstractWorld()
+
+        start = timer()
+        spawn_particles(world)
+        elapsed += timer() - start
+
+    return elapsed
+
+
+def main():
+    components, total = measure_particles()
+    print('{} live particles: {:.1f}MB of components ({:.0f}B each), '
+          '{:.1f}MB in a world ({:.0f}B each)'.format(
+              NUM_PARTICLES, components / 2 ** 20,
+              components / NUM_PARTICLES, total / 2 ** 20,
+              total / NUM_PARTICLES))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+"""Benchmarks for the resource tree of :class:`desper.GameModel`."""
+import desper
+import monospace
+from .runner import benchmark, timer
+
+RES_DIRS = [monospace.simulation.RES_DIR]
+
+_importer_dict = None
+
+
+def get_importer_dict():
+    """Get the game importer dictionary, built once per process."""
+    global _importer_dict
+
+    if _importer_dict is None:
+        _importer_dict = monospace.build_importer_dict()
+
+    return _importer_dict
+
+
+def walk(res):
+    """Access all the directories of a resource tree."""
+    for value in res.values():
+        if isinstance(value, dict):
+            walk(value)
+
+
+@benchmark('res.init_handles', loops=100)
+def bench_init_handles(loops):
+    importer_dict = get_importer_dict()
+
+    start = timer()
+    for _ in range(loops):
+        desper.GameModel(RES_DIRS, importer_dict)
+
+    return timer() - start
+
+
+@benchmark('res.init_handles.full_scan', loops=100)
+def bench_init_handles_full(loops):
+    importer_dict = get_importer_dict()
+
+    start = timer()
+    for _ in range(loops):
+        walk(desper.GameModel(RES_DIRS, importer_dict).res)
+
+    return timer() - start
@@ -0,0 +1,183 @@
+"""Minimal benchmark runner.
+
+Benchmarks are registered with the :py:func:`benchmark` decorator. A
+benchmark is a function accepting a number of loops and returning the
+time(in seconds) spent executing them, so that setup code can be
+excluded from the measure(the same protocol of pyperf's
+``Runner.bench_time_func``).
+
+Results are emitted as JSON, so that they can be stored and compared
+between commits(see :py:func:`main`).
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+BENCHMARKS = {}     # {name: (function, default loops)}
+
+RESULTS_VERSION = 1
+
+
+def benchmark(name, loops=100):
+    """Decorator registering a benchmark function.
+
+    :param name: Unique name of the benchmark.
+    :param loops: Default number of loops for the plain runner.
+    """
+    def decorator(func):
+        if name in BENCHMARKS:
+            raise ValueError('Benchmark {} already registered'.format(name))
+
+        BENCHMARKS[name] = func, loops
+        return func
+
+    return decorator
+
+
+def timer():
+    """Timer used by the benchmarks."""
+    return time.perf_counter()
+
+
+def git_revision():
+    """Get the current commit hash, or None if unavailable."""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+            check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def select(patterns):
+    """Get the names of the benchmarks matching any of the patterns.
+
+    A benchmark matches if a pattern is a substring of its name. All
+    benchmarks are selected if no pattern is given.
+    """
+    return [name for name in BENCHMARKS
+            if not patterns or any(pat in name for pat in patterns)]
+
+
+def run(name, repeat=5, loops=None):
+    """Run a registered benchmark.
+
+    :param repeat: Number of measures.
+    :param loops: Loops per measure(the registered default if None).
+    :return: A dictionary of results. Times are per loop, in seconds.
+    """
+    func, default_loops = BENCHMARKS[name]
+    loops = default_loops if loops is None else loops
+
+    func(1)         # Warmup
+    values = [func(loops) / loops for _ in range(repeat)]
+
+    return {
+        'loops': loops,
+        'values': values,
+        'mean': statistics.mean(values),
+        'median': statistics.median(values),
+        'stdev': statistics.stdev(values) if len(values) > 1 else 0.,
+        'min': min(values)
+    }
+
+
+def compare(old, new):
+    """Print the ratio between old and new medians, per benchmark."""
+    for name, result in new['benchmarks'].items():
+        old_result = old['benchmarks'].get(name)
+        if old_result is None:
+            continue
+
+        ratio = result['median'] / old_result['median']
+        print('{:40} {:10.3g}s -> {:10.3g}s  x{:.2f}'.format(
+            name, old_result['median'], result['median'], ratio),
+            file=sys.stderr)
+
+
+def run_pyperf(names, patterns, argv):
+    """Run the selected benchmarks through pyperf.
+
+    Command line arguments are forwarded to pyperf(use its ``-o``
+    option to store the results as JSON).
+    """
+    import pyperf
+
+    # Workers are spawned as new processes, selecting the same set of
+    # benchmarks
+    program_args = ['-m', 'benchmarks', '--pyperf']
+    for pattern in patterns:
+        program_args += ['-b', pattern]
+
+    sys.argv[1:] = argv
+    runner = pyperf.Runner(program_args=program_args)
+    for name in names:
+        runner.bench_time_func(name, BENCHMARKS[name][0])
+
+
+def main(argv=None):
+    """Run benchmarks from the command line.
+
+    By default, a plain timer is used and the results are written as
+    JSON on the standard output(or on the file given with ``-o``).
+    With ``--pyperf`` the benchmarks are delegated to pyperf, and the
+    unknown arguments are forwarded to it.
+    """
+    parser = argparse.ArgumentParser(description='Run benchmarks.')
+    parser.add_argument('-b', '--bench', action='append', default=[],
+                        help='run only the benchmarks containing BENCH '
+                             '(can be repeated)')
+    parser.add_argument('-l', '--list', action='store_true',
+                        help='list the available benchmarks and exit')
+    parser.add_argument('-r', '--repeat', type=int, default=5,
+                        help='measures per benchmark')
+    parser.add_argument('--loops', type=int,
+                        help='override the loops per measure')
+    parser.add_argument('-o', '--output',
+                        help='JSON output file(standard output by default)')
+    parser.add_argument('--compare', metavar='FILE',
+                        help='compare the results with a previous JSON '
+                             'output')
+    parser.add_argument('--pyperf', action='store_true',
+                        help='run the benchmarks through pyperf')
+    args, unknown = parser.parse_known_args(argv)
+
+    names = select(args.bench)
+
+    if args.list:
+        print('\n'.join(names))
+        return
+
+    if args.pyperf:
+        run_pyperf(names, args.bench,
+                   unknown + (['-o', args.output] if args.output else []))
+        return
+
+    if unknown:
+        parser.error('unrecognized arguments: ' + ' '.join(unknown))
+
+    results = {
+        'version': RESULTS_VERSION,
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'benchmarks': {}
+    }
+    for name in names:
+        print('running', name, file=sys.stderr)
+        results['benchmarks'][name] = run(name, args.repeat, args.loops)
+
+    if args.output is None:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    else:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+
+    if args.compare is not None:
+        with open(args.compare) as file:
+            compare(json.load(file), results)
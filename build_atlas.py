@@ -0,0 +1,43 @@
+"""Render the text atlases, to be shipped with the game.
+
+Run before packaging(e.g. before ``buildozer android release``), so
+that localized strings don't need to be rendered on first launch(see
+``dsdl.FontCacheHandle``).
+"""
+import argparse
+import os.path as pt
+import sdl2
+from sdl2.sdlimage import IMG_Init, IMG_INIT_PNG
+from sdl2.sdlttf import TTF_Init
+import desper
+import dsdl
+import monospace
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-o', '--output',
+                        default=pt.join(pt.dirname(pt.abspath(__file__)),
+                                        monospace.ATLAS_DIR_NAME),
+                        help='destination directory')
+    args = parser.parse_args()
+
+    desper.options['resource_extensions'] = False
+
+    IMG_Init(IMG_INIT_PNG)
+    TTF_Init()
+
+    dsdl.FontCacheHandle.atlas_dir = args.output
+    model = desper.GameModel([monospace.simulation.RES_DIR],
+                             monospace.build_importer_dict())
+
+    for lang, handle in model.res['str'].items():
+        index, surface = handle.build_atlas()
+        sdl2.SDL_FreeSurface(surface)
+
+        print('Atlas written for {} ({} strings, {}x{})'.format(
+            lang, len(index['rects']), *index['size']))
+
+
+if __name__ == '__main__':
+    main()
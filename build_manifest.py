@@ -0,0 +1,33 @@
+"""Generate the resource manifest, to be shipped with the game.
+
+Run before packaging(e.g. before ``buildozer android release``), so
+that the resource directory doesn't need to be scanned on startup.
+"""
+import argparse
+import os.path as pt
+import desper
+import monospace
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-o', '--output',
+                        default=pt.join(pt.dirname(pt.abspath(__file__)),
+                                        monospace.MANIFEST_NAME),
+                        help='destination file')
+    args = parser.parse_args()
+
+    desper.options['resource_extensions'] = False
+
+    stats = desper.ScanStats()
+    manifest = desper.write_manifest(
+        args.output, [monospace.simulation.RES_DIR],
+        monospace.build_importer_dict(), stats=stats)
+
+    print('Manifest written to {} ({} directories, {} files, {:.3f}s)'
+          .format(args.output, len(manifest['dirs']), stats.files,
+                  stats.seconds))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+"""Verify the db migrations(see ``monospace.migration``).
+
+Synthetic dbs are created at every historical version and migrated to
+the current one. Run after adding a migration step.
+"""
+import argparse
+import os.path as pt
+import sys
+import tempfile
+import monospace
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--checksum', action='store_true',
+                        help='print the schema checksum of a migrated db '
+                             'and exit')
+    args = parser.parse_args()
+
+    main_db = pt.join(monospace.simulation.RES_DIR, 'db', 'main.db')
+
+    if args.checksum:
+        with tempfile.TemporaryDirectory() as dirname:
+            filename = pt.join(dirname, 'checksum.db')
+            monospace.create_db(filename, monospace.MAIN_DB_VERSION)
+            db = monospace.connect_db(filename)
+            print(monospace.schema_checksum(db))
+            db.close()
+        return
+
+    errors = monospace.check_migrations(main_db)
+    for error in errors:
+        print(error)
+
+    print('{} migration errors'.format(len(errors)))
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -37,8 +37,14 @@ desper's :class:`AbstractWorld` (which can be freely derived). The set
 of base polymorphic types is made of: :class:`AbstractWorld`,
 :class:`AbstractProcessor`, :class:`AbstractComponent`.
 """
+from .pool import *
 from .world import *
 from .gamemodel import *
+from .scan import *
+from .manifest import *
 from .options import *
 from .res import *
+from .preload import *
+from .manager import *
+from .reload import *
 from .ecs import *
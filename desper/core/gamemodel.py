@@ -1,12 +1,26 @@
-import glob
-import os
 import os.path as pt
 import inspect as insp
-from functools import reduce
+import weakref
 
 from .res import Handle
+from .scan import ScanStats, LazyResourceDict, _ResourceScanner
+from .manifest import load_manifest, write_manifest, decode_manifest
+from .preload import Preloader, collect_handles
 from ._signature import LooseSignature
-from .options import options
+
+
+# Cache for importer signature checks, {importer: bool}
+_checked_importers = weakref.WeakKeyDictionary()
+
+
+def _check_importer(importer):
+    """Check(and cache) if an importer matches the lambda signature."""
+    checked = _checked_importers.get(importer)
+    if checked is None:
+        checked = insp.signature(importer) == GameModel.LAMBDA_SIG
+        _checked_importers[importer] = checked
+
+    return checked
 
 
 class GameModel:
@@ -42,7 +56,7 @@ class GameModel:
     iterable containing the parameters passed to the Handle
     constructor otherwise."""
 
-    def __init__(self, dirs=[], importer_dict={}):
+    def __init__(self, dirs=[], importer_dict={}, manifest=None):
         """Construct a new GameModel from an importer dictionary.
 
         An importer dictionary is in the form:
@@ -65,16 +79,20 @@ class GameModel:
                      scanned in search of resources.
         :param importer_dict: A dictionary that associates regex
                               patterns to Handle implementations.
+        :param manifest: Optional filename of a resource manifest(see
+                         :py:meth:`init_handles`).
         """
         self._current_world = None
         self._current_world_handle = None
         self.quit = False
+        self.watcher = None
 
+        self.scan_stats = ScanStats()
         self.res = {}
         if dirs:
-            self.init_handles(dirs, importer_dict)
+            self.init_handles(dirs, importer_dict, manifest)
 
-    def init_handles(self, dirs, importer_dict):
+    def init_handles(self, dirs, importer_dict, manifest=None):
         """Init a handle structure for resources and place it in `res`.
 
         An importer dictionary is in the form:
@@ -95,6 +113,11 @@ class GameModel:
             it won't be used anymore(meaning that each file will be
             considered at most once).
 
+        If a `manifest` filename is given and the file is a valid
+        manifest(see :py:mod:`desper.core.manifest`), the handles are
+        created from it, without scanning `dirs`. Otherwise, `dirs` are
+        fully scanned and the manifest is written for the next time.
+
         This will call :py:meth:`_init_handles` as its internal
         implementation. If you need to reimplement this logic, please
         consider overriding :py:meth:`_init_handles` instead.
@@ -106,10 +129,11 @@ class GameModel:
                      scanned in search of resources.
         :param importer_dict: A dictionary that associates lamdas to
                               Handle implementations.
+        :param manifest: Optional filename of a resource manifest.
         """
-        self.res.update(self._init_handles(dirs, importer_dict))
+        self.res.update(self._init_handles(dirs, importer_dict, manifest))
 
-    def _init_handles(self, dirs, importer_dict):
+    def _init_handles(self, dirs, importer_dict, manifest=None):
         """Init a handle structure for resources and return it.
 
         An importer dictionary is in the form:
@@ -133,6 +157,10 @@ class GameModel:
             due to file extensions being disabled the model will keep
             the first loaded :class:`Handle` .
 
+        Directories are explored lazily: each of them is scanned on
+        first access(see :class:`LazyResourceDict`). Time spent scanning
+        is tracked in :py:attr:`scan_stats`.
+
         :raises TypeError: If dirs is an empty list.
         :raises TypeError: If the functions in `importer_dict` don't
                            match :py:attr:`GameModel.LAMBDA_SIG`.
@@ -140,69 +168,58 @@ class GameModel:
                      scanned in search of resources.
         :param importer_dict: A dictionary that associates lamdas to
                               Handle implementations.
+        :param manifest: Optional filename of a resource manifest.
         :return: A data structure containing handles, used to access
                  resources from the main game logic(in this specific
                  implementation, a dict of dicts(each dict representing
                  a directory in the filesystem)).
         """
         # Check lambda signatures
-        if not all([insp.signature(fun) == GameModel.LAMBDA_SIG
-                    for fun in importer_dict]):
+        if not all([_check_importer(fun) for fun in importer_dict]):
             raise TypeError
 
-        # Get recursively all the content of the given dirs
-        pathnames = reduce(
-            lambda x, y: x + y,
-            [[(pt.relpath(glob_path, start=dirpath), dirpath) for glob_path
-              in glob.glob(pt.join(dirpath, '**'), recursive=True)]
-             for dirpath in dirs])
-
-        # Get a dictionary in the form: {rel_path: abs_path}
-        # where rel_path is relative to the given
-        # path_dict = {rel_path: abs_path for abs_path in pathnames}
-
-        # Parse the dirs creating the handle structure from
-        # importer_dict
-        res = {}
-        used_paths = set()
-        for item, dirpath in pathnames:
-            abs_path = pt.join(dirpath, item)
-            p = res
-
-            split = item.split(os.sep)
-            for subitem in split:
-                # If it's a leaf and it's not a dir, find a handle for
-                # it
-                if subitem == split[-1] and not pt.isdir(abs_path):
-                    for lam, handle in importer_dict.items():
-                        # If the resource has already been loaded, skip
-                        if abs_path in used_paths:
-                            break
-
-                        params = lam(pt.abspath(dirpath), item, self.res)
-                        if params is not None:
-                            # Check if extensions are kept or ignored
-                            if options['resource_extensions']:
-                                res_key = subitem
-                            else:
-                                res_key = pt.splitext(subitem)[0]
-
-                            # Actually create the Handle (skip if
-                            # already existing).
-                            if res_key not in p:
-                                p[res_key] = handle(*params)
-
-                            # Keep track of already loaded resources
-                            # so that it won't be considered in future
-                            # iterations
-                            used_paths.add(abs_path)
-
-                # If it's not a leaf, it's a directory. Make a subtree.
-                elif subitem != split[-1]:
-                    p = p.setdefault(subitem, {})
+        if manifest is not None:
+            res = load_manifest(manifest, dirs, importer_dict, self.res,
+                                self.scan_stats)
+            if res is not None:
+                return res
+
+            try:
+                return decode_manifest(
+                    write_manifest(manifest, dirs, importer_dict, self.res,
+                                   self.scan_stats),
+                    dirs, importer_dict, self.res)
+            except (OSError, TypeError):
+                pass        # Manifest not supported, scan lazily
+
+        scanner = _ResourceScanner(importer_dict, self.res,
+                                   self.scan_stats)
+
+        # Only the given dirs are queued, the actual exploration is
+        # done lazily(see LazyResourceDict)
+        res = LazyResourceDict(scanner)
+        for dirpath in dirs:
+            res.add_dir(pt.abspath(dirpath))
 
         return res
 
+    def preload(self, *items, max_workers=None):
+        """Start loading the given resources in background.
+
+        The returned :class:`Preloader` must be updated regularly on the
+        main thread(e.g. by a loading world, see
+        :py:meth:`Preloader.update`) to complete the loading.
+
+        :param items: Resource paths('/' separated, e.g.
+                      ``'text/enemies'``), resource subtrees(dicts) or
+                      :class:`Handle` s. Directories and subtrees are
+                      preloaded recursively.
+        :param max_workers: Number of worker threads.
+        :return: A :class:`Preloader` instance.
+        :raises KeyError: If a path doesn't exist.
+        """
+        return Preloader(collect_handles(self.res, items), max_workers)
+
     def loop(self):
         """Start the main loop.
 
@@ -214,6 +231,10 @@ class GameModel:
         self.quit = False
 
         while not self.quit:
+            # Reload changed resources(see ResourceWatcher.install)
+            if self.watcher is not None:
+                self.watcher.update()
+
             self._current_world.process(self)
 
     @property
@@ -245,3 +266,7 @@ class GameModel:
 
         self._current_world_handle = world_handle
         self._current_world = world_handle.get()
+
+        # Resources of the left world might be evictable now
+        if Handle.manager is not None:
+            Handle.manager.collect()
@@ -0,0 +1,169 @@
+"""Memory bounded resource management(see :class:`ResourceManager`)."""
+from collections import OrderedDict
+
+from .res import Handle, WorldHandle
+
+
+class ResourceManager:
+    """Keep the memory used by cached resources under a budget.
+
+    Once installed(see :py:meth:`install`), the manager is notified
+    each time a tracked :class:`Handle` (one with a
+    :py:attr:`Handle.memory_category`) is loaded or accessed. Memory is
+    accounted per category(see :py:meth:`Handle.memory_usage`) and when
+    the usage of a category exceeds its budget, the least recently used
+    resources of that category are evicted(see :py:meth:`Handle.clear`).
+
+    Pinned resources are never evicted. A resource is pinned if:
+
+    - it was explicitly pinned(see :py:meth:`pin`)
+    - it's a world and it's the current one or it's in the world stack
+      of the model(if any, see ``dsdl.SDLGameModel.switch``)
+    - it was accessed by a world that is still cached(which may hold
+      references to it)
+
+    :param model: The :class:`GameModel` the resources belong to.
+    :param budgets: A dictionary in the form ``{category: budget}``.
+                    Categories without budget are only accounted.
+    """
+
+    def __init__(self, model, budgets=None):
+        self.model = model
+        self.budgets = {} if budgets is None else dict(budgets)
+        self.pinned = set()
+        self.evictions = 0
+
+        self._lru = OrderedDict()   # {handle: None}, least recent first
+        self._users = {}            # {handle: {world_handle, ...}}
+        self._usage = {}            # {handle: amount}
+
+    def install(self):
+        """Make this manager track all the handles.
+
+        :return: The manager itself.
+        """
+        Handle.manager = self
+        return self
+
+    def uninstall(self):
+        """Stop tracking handles."""
+        if Handle.manager is self:
+            Handle.manager = None
+
+    def pin(self, handle):
+        """Prevent a resource from being evicted."""
+        self.pinned.add(handle)
+
+    def unpin(self, handle):
+        """Allow a pinned resource to be evicted again."""
+        self.pinned.discard(handle)
+
+    def loaded(self, handle):
+        """Notify that a handle has loaded its resource.
+
+        Called by :class:`Handle`. The budget of the handle category is
+        enforced.
+        """
+        self._usage[handle] = handle.memory_usage()
+        self.touch(handle)
+        self.collect(handle.memory_category)
+
+    def touch(self, handle):
+        """Notify that a resource has been accessed.
+
+        Called by :class:`Handle`.
+        """
+        self._lru[handle] = None
+        self._lru.move_to_end(handle)
+
+        world_handle = self.model.current_world_handle
+        if world_handle is not None and world_handle is not handle:
+            self._users.setdefault(handle, set()).add(world_handle)
+
+    def forget(self, handle):
+        """Notify that a resource has been cleared.
+
+        Called by :class:`Handle`.
+        """
+        self._lru.pop(handle, None)
+        self._users.pop(handle, None)
+        self._usage.pop(handle, None)
+
+        # A cleared world doesn't reference resources anymore
+        if handle.memory_category == WorldHandle.memory_category:
+            for users in self._users.values():
+                users.discard(handle)
+
+    def users(self, handle):
+        """Get the world handles that accessed a resource, as a set."""
+        return set(self._users.get(handle, ()))
+
+    def is_pinned(self, handle):
+        """Check whether a resource can't be evicted."""
+        if handle in self.pinned:
+            return True
+
+        if handle.memory_category == WorldHandle.memory_category:
+            return (handle is self.model.current_world_handle
+                    or handle in getattr(self.model, 'world_handle_stack',
+                                         ()))
+
+        # The current world might still be under construction
+        current = self.model.current_world_handle
+        return any(user.loaded or user is current
+                   for user in self._users.get(handle, ()))
+
+    def usage(self, category):
+        """Get the memory currently used by the given category."""
+        # Worlds change over time, always recompute them
+        if category == WorldHandle.memory_category:
+            for handle in self._lru:
+                if handle.memory_category == category:
+                    self._usage[handle] = handle.memory_usage()
+
+        return sum(amount for handle, amount in self._usage.items()
+                   if handle.memory_category == category)
+
+    def stats(self):
+        """Get the usage of each category, as a dictionary.
+
+        In the form ``{category: (usage, budget)}``(budget is None if
+        not set).
+        """
+        categories = {handle.memory_category for handle in self._lru}
+        categories.update(self.budgets)
+
+        return {category: (self.usage(category),
+                           self.budgets.get(category))
+                for category in categories}
+
+    def collect(self, category=None):
+        """Evict resources until their categories are within budget.
+
+        :param category: The category to collect. If None, all the
+                         categories with a budget are collected.
+        :return: The number of evicted resources.
+        """
+        categories = self.budgets if category is None else (category,)
+
+        evicted = 0
+        for cat in categories:
+            budget = self.budgets.get(cat)
+            if budget is None:
+                continue
+
+            usage = self.usage(cat)
+            for handle in tuple(self._lru):
+                if usage <= budget:
+                    break
+
+                if handle.memory_category != cat or self.is_pinned(handle):
+                    continue
+
+                usage -= self._usage.get(handle, 0)
+                handle.clear()      # Will call forget
+                evicted += 1
+
+        self.evictions += evicted
+        return evicted
+
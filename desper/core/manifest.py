@@ -0,0 +1,302 @@
+"""Persisted resource manifests(see :class:`GameModel`).
+
+A manifest is a JSON file describing the whole handle tree built from
+some resource directories: for each resource, the type of its
+:class:`Handle` and the parameters given to its constructor. Loading a
+manifest replaces the exploration of the resource directories(and the
+execution of the importers) with a single file read.
+
+Paths are stored relative to the resource directories, so that a
+manifest generated at build time can be shipped with the game. A
+manifest is considered valid as long as the listings of the scanned
+directories don't change(checked through the directory modification
+times first, and through a hash of the listings when those differ, e.g.
+after the resources are extracted on a device). Changes to the content
+of a file don't invalidate a manifest, since they don't affect the
+handle tree.
+
+Supported importer parameters are strings(paths inside the resource
+directories are relativized), numbers, booleans, None, lists and the
+resource dictionary itself(see :py:attr:`GameModel.LAMBDA_SIG`).
+"""
+import hashlib
+import json
+import os
+import os.path as pt
+import time
+
+from .options import options
+from .scan import ScanStats, LazyResourceDict, _ResourceScanner
+
+MANIFEST_VERSION = 1
+
+HANDLE_KEY = '$handle'
+PATH_KEY = '$path'
+RES_KEY = '$res'
+
+
+class _ManifestEntry:
+    """Placeholder for a handle, storing its type and parameters."""
+    __slots__ = 'handle_type', 'params'
+
+    def __init__(self, handle_type, params):
+        self.handle_type = handle_type
+        self.params = params
+
+
+class _ManifestScanner(_ResourceScanner):
+    """Scanner recording scanned directories and handle parameters."""
+
+    def __init__(self, importer_dict, resources, stats):
+        super().__init__(importer_dict, resources, stats)
+        self.dirs = []      # [(root, rel_dir), ...]
+
+    def scan(self, res, dirs):
+        dirs = tuple(dirs)
+        self.dirs.extend(dirs)
+        super().scan(res, dirs)
+
+    def make_handle(self, handle_type, params):
+        return _ManifestEntry(handle_type, tuple(params))
+
+
+def handle_type_name(handle_type):
+    """Get the fully qualified name of a handle type."""
+    return '{}:{}'.format(handle_type.__module__, handle_type.__qualname__)
+
+
+def dir_hash(path):
+    """Get a hash of the listing of a directory(hidden files excluded).
+
+    Only names are taken into account, subdirectories are marked by a
+    trailing slash.
+    """
+    with os.scandir(path) as entries:
+        names = sorted(entry.name + ('/' if entry.is_dir() else '')
+                       for entry in entries
+                       if not entry.name.startswith('.'))
+
+    return hashlib.sha1('\n'.join(names).encode()).hexdigest()
+
+
+def _encode_param(param, roots, resources):
+    """Encode an importer parameter as JSON compatible data.
+
+    :raises TypeError: If the parameter isn't supported.
+    """
+    if param is resources:
+        return {RES_KEY: None}
+
+    if isinstance(param, str):
+        for index, root in enumerate(roots):
+            if pt.isabs(param) and pt.commonpath((root, param)) == root:
+                rel_path = pt.relpath(param, root)
+                return {PATH_KEY: [index, rel_path.replace(os.sep, '/')]}
+        return param
+
+    if param is None or isinstance(param, (bool, int, float)):
+        return param
+
+    if isinstance(param, (list, tuple)):
+        return [_encode_param(item, roots, resources) for item in param]
+
+    raise TypeError('Unsupported importer parameter: {!r}'.format(param))
+
+
+def _decode_param(param, roots, resources):
+    """Decode an importer parameter encoded by :py:func:`_encode_param`."""
+    if isinstance(param, dict):
+        if RES_KEY in param:
+            return resources
+
+        index, rel_path = param[PATH_KEY]
+        return pt.join(roots[index], *rel_path.split('/'))
+
+    if isinstance(param, list):
+        return [_decode_param(item, roots, resources) for item in param]
+
+    return param
+
+
+def _encode_tree(res, roots, resources):
+    """Encode a tree of :class:`_ManifestEntry` s."""
+    tree = {}
+    for key, value in res.items():
+        if isinstance(value, dict):
+            tree[key] = _encode_tree(value, roots, resources)
+        else:
+            tree[key] = {
+                HANDLE_KEY: handle_type_name(value.handle_type),
+                'params': [_encode_param(param, roots, resources)
+                           for param in value.params]}
+
+    return tree
+
+
+def _decode_tree(tree, roots, resources, handle_types):
+    """Build a handle tree from an encoded one.
+
+    :raises KeyError: If an unknown handle type is found.
+    """
+    res = {}
+    for key, value in tree.items():
+        if HANDLE_KEY in value:
+            params = [_decode_param(param, roots, resources)
+                      for param in value['params']]
+            res[key] = handle_types[value[HANDLE_KEY]](*params)
+        else:
+            res[key] = _decode_tree(value, roots, resources, handle_types)
+
+    return res
+
+
+def _walk(res):
+    """Access all the directories of a lazy resource tree."""
+    for value in res.values():
+        if isinstance(value, dict):
+            _walk(value)
+
+
+def build_manifest(dirs, importer_dict, resources=None, stats=None):
+    """Fully scan the given resource directories, building a manifest.
+
+    :param dirs: A list of resource directories(see :class:`GameModel`).
+    :param importer_dict: The importer dictionary(see
+                          :class:`GameModel`).
+    :param resources: The resource dictionary given to the importers.
+    :param stats: An optional :class:`ScanStats` instance to update.
+    :return: The manifest, as JSON compatible data.
+    :raises TypeError: If an importer returns unsupported parameters.
+    """
+    resources = {} if resources is None else resources
+    roots = [pt.abspath(dirpath) for dirpath in dirs]
+    scanner = _ManifestScanner(importer_dict, resources,
+                               ScanStats() if stats is None else stats)
+
+    res = LazyResourceDict(scanner)
+    for root in roots:
+        res.add_dir(root)
+    _walk(res)
+
+    signatures = []
+    for root, rel_dir in scanner.dirs:
+        path = pt.join(root, rel_dir)
+        signatures.append([roots.index(root), rel_dir.replace(os.sep, '/'),
+                           os.stat(path).st_mtime_ns, dir_hash(path)])
+
+    return {
+        'version': MANIFEST_VERSION,
+        'resource_extensions': options['resource_extensions'],
+        'handle_types': [handle_type_name(handle_type)
+                         for handle_type in importer_dict.values()],
+        'roots': len(roots),
+        'dirs': signatures,
+        'tree': _encode_tree(res, roots, resources)
+    }
+
+
+def write_manifest(filename, dirs, importer_dict, resources=None,
+                   stats=None):
+    """Build a manifest(see :py:func:`build_manifest`) and save it.
+
+    The file is opened before building, so that an unwritable location
+    fails before the full scan.
+
+    :return: The written manifest.
+    :raises OSError: If the manifest can't be written.
+    """
+    # Write on a temporary file first, so that a broken manifest is
+    # never left behind
+    tmp_filename = filename + '.tmp'
+    with open(tmp_filename, 'w') as file:
+        try:
+            manifest = build_manifest(dirs, importer_dict, resources,
+                                      stats)
+        except BaseException:
+            file.close()
+            os.remove(tmp_filename)
+            raise
+
+        json.dump(manifest, file, separators=(',', ':'))
+    os.replace(tmp_filename, filename)
+
+    return manifest
+
+
+def decode_manifest(manifest, dirs, importer_dict, resources=None):
+    """Build a handle tree from a manifest(no validity check).
+
+    :return: The handle tree(see :py:meth:`GameModel._init_handles`).
+    :raises KeyError: If an unknown handle type is found.
+    """
+    handle_types = {handle_type_name(handle_type): handle_type
+                    for handle_type in importer_dict.values()}
+
+    return _decode_tree(manifest['tree'],
+                        [pt.abspath(dirpath) for dirpath in dirs],
+                        {} if resources is None else resources,
+                        handle_types)
+
+
+def is_manifest_valid(manifest, dirs, importer_dict):
+    """Check whether a manifest is valid for the given setup.
+
+    The manifest must be compatible with the given resource
+    directories and importer dictionary, and the listings of the
+    directories must be the same as when the manifest was built.
+    """
+    if (manifest.get('version') != MANIFEST_VERSION
+            or manifest.get('resource_extensions')
+            != options['resource_extensions']
+            or manifest.get('handle_types')
+            != [handle_type_name(handle_type)
+                for handle_type in importer_dict.values()]
+            or manifest.get('roots') != len(dirs)):
+        return False
+
+    roots = [pt.abspath(dirpath) for dirpath in dirs]
+    for index, rel_dir, mtime, hash_ in manifest['dirs']:
+        path = pt.join(roots[index], *rel_dir.split('/'))
+        try:
+            if (os.stat(path).st_mtime_ns != mtime
+                    and dir_hash(path) != hash_):
+                return False
+        except OSError:
+            return False
+
+    return True
+
+
+def load_manifest(filename, dirs, importer_dict, resources=None,
+                  stats=None):
+    """Build a handle tree from a manifest file, if valid.
+
+    :param filename: The manifest file.
+    :param dirs: A list of resource directories(see :class:`GameModel`).
+    :param importer_dict: The importer dictionary(see
+                          :class:`GameModel`).
+    :param resources: The resource dictionary given to the handles
+                      requiring it.
+    :param stats: An optional :class:`ScanStats` instance to update.
+    :return: The handle tree(see :py:meth:`GameModel._init_handles`),
+             or None if the manifest is missing, malformed or no longer
+             valid(see :py:func:`is_manifest_valid`).
+    """
+    start = time.perf_counter()
+
+    try:
+        with open(filename) as file:
+            manifest = json.load(file)
+
+        if not is_manifest_valid(manifest, dirs, importer_dict):
+            return None
+
+        res = decode_manifest(manifest, dirs, importer_dict, resources)
+    except (OSError, ValueError, KeyError, IndexError, TypeError):
+        return None
+
+    if stats is not None:
+        stats.manifest = True
+        stats.seconds += time.perf_counter() - start
+
+    return res
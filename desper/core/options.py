@@ -1,4 +1,4 @@
-options = {'resource_extensions': True}
+options = {'resource_extensions': True, 'debug': False}
 """Dictionary of global options for desper.
 
 `resource_extensions`:
@@ -18,4 +18,9 @@ there can only be one resource with a given name. Note that
 overlapping names could be allowed in special cases(e.g. an image
 file and its metadata might have the same name, based on their
 importer lambda's/:class:`Handle` s).
+
+`debug`:
+Whether to run additional sanity checks(e.g. validation of component
+parameters). Disabled by default, since checks may be executed in hot
+paths.
 """
@@ -0,0 +1,151 @@
+"""Recycling of short lived entities(see :class:`EntityPool`).
+
+Entities spawned in large numbers(e.g. bullets, particles) are usually
+built from scratch and deleted shortly after, generating a steady
+amount of garbage. A pool keeps the components of deleted entities, and
+resets them on the next spawn instead of building new ones.
+"""
+from dataclasses import dataclass, fields
+
+DEFAULT_POOL_CAPACITY = 256     # Free entities kept per key
+
+
+@dataclass
+class PoolStats:
+    """Statistics about the entities spawned through an
+    :class:`EntityPool`.
+
+    `created` counts entities built from scratch, `reused` the ones
+    built from recycled components. `released` counts deleted entities
+    given back to the pool, `discarded` the ones dropped because the
+    pool was full.
+    """
+    created: int = 0
+    reused: int = 0
+    released: int = 0
+    discarded: int = 0
+
+    @property
+    def reuse_ratio(self):
+        """Fraction of the spawned entities that were recycled."""
+        spawned = self.created + self.reused
+        return self.reused / spawned if spawned else 0.
+
+    def add(self, other):
+        """Accumulate the statistics of another instance."""
+        for field in fields(self):
+            setattr(self, field.name,
+                    getattr(self, field.name) + getattr(other, field.name))
+
+
+class PoolMember:
+    """Component marking an entity spawned by an :class:`EntityPool`.
+
+    When the entity is deleted from an :class:`AbstractWorld`, its
+    components are given back to the pool.
+    """
+    __slots__ = 'pool', 'key', 'components', '__weakref__'
+
+    def __init__(self, pool, key, components):
+        self.pool = pool
+        self.key = key
+        self.components = components
+
+
+class EntityPool:
+    """Spawn entities recycling the components of deleted ones.
+
+    Entities are spawned through :py:meth:`acquire`. When they are
+    deleted(in any way) from an :class:`AbstractWorld`, their
+    components are kept by the pool, and reset on a later spawn.
+    Deleted entities are released when the deletion is finalized(i.e.
+    at the beginning of the next ``process``), so recycled components
+    are never shared with a living entity.
+
+    Subclasses define how to build components(see :py:meth:`create`)
+    and how to reset them(see :py:meth:`reset`). Entities with a
+    different set of components can share a pool, as long as they are
+    given different keys(see :py:meth:`key`).
+
+    Components shouldn't be referenced anywhere else once the entity is
+    deleted, since they will be reused.
+
+    :param capacity: Maximum number of free entities kept per key. A
+                     capacity of 0 disables recycling.
+    """
+
+    def __init__(self, capacity=DEFAULT_POOL_CAPACITY):
+        self.capacity = capacity
+        self.stats = PoolStats()
+        self._free = {}         # {key: [PoolMember, ...]}
+
+    @property
+    def free(self):
+        """Number of free entities, ready to be recycled."""
+        return sum(map(len, self._free.values()))
+
+    def key(self, *args, **kwargs):
+        """Get the key of an entity, given the spawn arguments.
+
+        Only entities with the same key are recycled into each other.
+        By default, all the entities share the same key.
+        """
+        return None
+
+    def create(self, *args, **kwargs):
+        """Build the components of a new entity.
+
+        :return: A tuple of components.
+        """
+        raise NotImplementedError
+
+    def reset(self, components, *args, **kwargs):
+        """Reset recycled components, given the spawn arguments.
+
+        :param components: The tuple of components of a released entity
+                           (as built by :py:meth:`create`).
+        :return: The tuple of components of the new entity(usually
+                 the given one, components can also be replaced).
+        """
+        raise NotImplementedError
+
+    def acquire(self, world, *args, **kwargs):
+        """Spawn an entity in the given world.
+
+        Additional arguments are passed to :py:meth:`key`,
+        :py:meth:`create` and :py:meth:`reset`.
+
+        :param world: An :class:`AbstractWorld`.
+        :return: The new entity.
+        """
+        key = self.key(*args, **kwargs)
+        free = self._free.get(key)
+
+        if free:
+            member = free.pop()
+            member.components = self.reset(member.components, *args,
+                                           **kwargs)
+            self.stats.reused += 1
+        else:
+            member = PoolMember(self, key, self.create(*args, **kwargs))
+            self.stats.created += 1
+
+        return world.create_entity(member, *member.components)
+
+    def release(self, member):
+        """Take back the components of a deleted entity.
+
+        Called by :class:`AbstractWorld` when deleting the entity.
+        """
+        self.stats.released += 1
+
+        free = self._free.setdefault(member.key, [])
+        if len(free) >= self.capacity:
+            self.stats.discarded += 1
+            return
+
+        free.append(member)
+
+    def clear(self):
+        """Drop all the free entities."""
+        self._free.clear()
@@ -0,0 +1,169 @@
+"""Background preloading of resources(see :py:meth:`GameModel.preload`).
+
+Handles are loaded in two steps: the thread safe part of the loading
+process(see :py:meth:`Handle._prepare`) is executed by a pool of worker
+threads, while the rest(e.g. GPU uploads) is executed on the main thread
+by :py:meth:`Preloader.update`, within a time budget, so that a loading
+world can keep rendering(and show progress) in the meantime.
+"""
+import functools
+import os.path as pt
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from .options import options
+from .res import Handle
+
+DEFAULT_TIME_BUDGET = 0.004     # Seconds per update(a quarter of a frame)
+
+_executors = {}         # {max_workers: ThreadPoolExecutor}
+
+
+def get_resource(res, path):
+    """Get a resource(or a resource subtree) from its path.
+
+    :param res: The resource dictionary(e.g. :py:attr:`GameModel.res`).
+    :param path: The path of the resource, with '/' separated parts
+                 (e.g. 'text/enemies/rocket2'). Extensions are ignored
+                 if the `resource_extensions` option is disabled.
+    :raises KeyError: If the path doesn't exist.
+    """
+    *dirs, name = path.strip('/').split('/')
+    if not options['resource_extensions']:
+        name = pt.splitext(name)[0]
+
+    for part in dirs:
+        res = res[part]
+
+    return res[name] if name else res
+
+
+def collect_handles(res, items):
+    """Collect handles from the given items, in order and without
+    duplicates.
+
+    :param res: The resource dictionary paths refer to.
+    :param items: An iterable of resource paths(see
+                  :py:func:`get_resource`), resource subtrees(dicts)
+                  and :class:`Handle` s. Subtrees are explored
+                  recursively.
+    :return: A list of :class:`Handle` s.
+    """
+    handles = []
+    seen = set()
+    stack = list(reversed(items))
+    while stack:
+        item = stack.pop()
+        if isinstance(item, str):
+            item = get_resource(res, item)
+
+        if isinstance(item, dict):
+            stack.extend(reversed(tuple(item.values())))
+        elif isinstance(item, Handle) and id(item) not in seen:
+            seen.add(id(item))
+            handles.append(item)
+
+    return handles
+
+
+def _get_executor(max_workers=None):
+    """Get the pool of worker threads shared by all the preloaders
+    with the given number of workers."""
+    executor = _executors.get(max_workers)
+    if executor is None:
+        executor = _executors[max_workers] = ThreadPoolExecutor(
+            max_workers, thread_name_prefix='preload')
+
+    return executor
+
+
+def _release_future(handle, future):
+    """Release the data prepared by a future, if any."""
+    if future.exception() is None:
+        handle._release_prepared(future.result())
+
+
+class Preloader:
+    """Load a set of handles in background.
+
+    On construction, the thread safe part of the loading process of
+    each handle(:py:meth:`Handle._prepare`) is submitted to a pool of
+    worker threads, shared by all the preloaders. The loading is then
+    completed on the main thread by calling :py:meth:`update`
+    regularly(e.g. once per frame).
+
+    Handles are completed in the given order. Already loaded handles
+    are skipped.
+
+    :param handles: An iterable of :class:`Handle` s.
+    :param max_workers: Number of worker threads(see
+                        ``concurrent.futures.ThreadPoolExecutor``).
+                        Preloaders with the same number share the
+                        same threads.
+    """
+
+    def __init__(self, handles, max_workers=None):
+        handles = [handle for handle in handles if not handle.loaded]
+        self.total = len(handles)
+        self.completed = 0
+
+        executor = _get_executor(max_workers)
+        self._pending = deque((handle, executor.submit(handle._prepare))
+                              for handle in handles)
+
+    @property
+    def done(self):
+        """Whether all the handles have been loaded."""
+        return not self._pending
+
+    @property
+    def progress(self):
+        """Progress of the loading, from 0 to 1."""
+        if self.total == 0:
+            return 1.
+
+        return self.completed / self.total
+
+    def update(self, time_budget=DEFAULT_TIME_BUDGET, block=False):
+        """Complete the loading of prepared handles, on main thread.
+
+        Handles are completed until the time budget is exceeded(at
+        least one is completed per call, if ready).
+
+        :param time_budget: Time budget for the call, in seconds.
+        :param block: Whether to wait for handles that aren't prepared
+                      yet, instead of returning.
+        :return: True if all the handles have been loaded.
+        :raises Exception: Any exception raised while preparing a
+                           handle. The handle is dropped, so that
+                           following calls go on with the others.
+        """
+        start = time.perf_counter()
+        while self._pending:
+            handle, future = self._pending[0]
+            if not block and not future.done():
+                break
+
+            self._pending.popleft()
+            self.completed += 1
+            handle.load_prepared(future.result())
+
+            if time.perf_counter() - start >= time_budget:
+                break
+
+        return self.done
+
+    def wait(self):
+        """Complete the loading of all the handles, blocking."""
+        while not self.update(block=True):
+            pass
+
+    def cancel(self):
+        """Stop loading. Handles already completed stay loaded."""
+        while self._pending:
+            handle, future = self._pending.popleft()
+            if not future.cancel():
+                # Already running, release its data once prepared
+                future.add_done_callback(
+                    functools.partial(_release_future, handle))
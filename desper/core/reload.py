@@ -0,0 +1,225 @@
+"""Hot reloading of resources, for development(see
+:class:`ResourceWatcher`).
+"""
+import os
+import os.path as pt
+import time
+
+from .res import Handle, WorldHandle
+from .scan import ScanStats, _ResourceScanner
+
+DEFAULT_INTERVAL = .5       # Seconds between two polls
+
+
+def snapshot_files(dirs):
+    """Get the state of all the files in the given directories.
+
+    Hidden files and directories are ignored.
+
+    :param dirs: An iterable of directory paths.
+    :return: A dictionary in the form ``{path: (mtime_ns, size)}``.
+    """
+    files = {}
+    stack = [pt.abspath(dirpath) for dirpath in dirs]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.name.startswith('.'):
+                        continue
+
+                    if entry.is_dir():
+                        stack.append(entry.path)
+                    else:
+                        stat = entry.stat()
+                        files[entry.path] = stat.st_mtime_ns, stat.st_size
+        except OSError:
+            continue        # Removed in the meantime
+
+    return files
+
+
+def iter_handles(res):
+    """Iterate over the handles of a resource tree, as tuples
+    (dictionary, key, handle).
+
+    Unexplored directories(see :class:`LazyResourceDict`) aren't
+    explored, since they can't contain loaded handles.
+    """
+    stack = [res]
+    while stack:
+        dic = stack.pop()
+        for key, value in tuple(dict.items(dic)):
+            if isinstance(value, dict):
+                stack.append(value)
+            elif isinstance(value, Handle):
+                yield dic, key, value
+
+
+class ResourceWatcher:
+    """Reload resources when their files change, while the game runs.
+
+    Meant for development: the resource directories are polled(see
+    :py:meth:`update`), and when a file changes the handles depending on
+    it(see :py:meth:`Handle.watched_files`) are cleared, so that they
+    are loaded again on the next :py:meth:`Handle.get`. Handles of
+    removed files are removed from the resource tree, while new files
+    are given a handle through the importers(if their directory is
+    already in the tree).
+
+    Cleared resources may be destroyed(e.g. SDL textures), so loaded
+    worlds that accessed them are rebuilt(see
+    :py:meth:`WorldHandle.rebuild`). Users are known through the
+    installed :class:`ResourceManager`: without one, all the loaded
+    worlds are rebuilt. Worlds that opt in(see
+    :py:attr:`WorldHandle.rebuild_on_reload`) are rebuilt on each
+    reload.
+
+    :param model: The :class:`GameModel` to watch.
+    :param dirs: The resource directories of the model.
+    :param importer_dict: The importer dictionary of the model(see
+                          :class:`GameModel`).
+    :param interval: Minimum time between two polls, in seconds.
+    """
+
+    def __init__(self, model, dirs, importer_dict,
+                 interval=DEFAULT_INTERVAL):
+        self.model = model
+        self.roots = [pt.abspath(dirpath) for dirpath in dirs]
+        self.interval = interval
+        self.reloads = 0
+
+        self._scanner = _ResourceScanner(importer_dict, model.res,
+                                         ScanStats())
+        self._files = snapshot_files(self.roots)
+        self._last_poll = time.perf_counter()
+
+    def install(self):
+        """Make the model update this watcher in its main loop.
+
+        :return: The watcher itself.
+        """
+        self.model.watcher = self
+        return self
+
+    def uninstall(self):
+        """Stop watching."""
+        if self.model.watcher is self:
+            self.model.watcher = None
+
+    def poll(self):
+        """Get the files changed since the last poll.
+
+        :return: A tuple of sets (changed, added, removed) of paths.
+        """
+        files = snapshot_files(self.roots)
+        changed = {path for path, state in files.items()
+                   if path in self._files and self._files[path] != state}
+        added = files.keys() - self._files.keys()
+        removed = self._files.keys() - files.keys()
+
+        self._files = files
+        self._last_poll = time.perf_counter()
+
+        return changed, added, removed
+
+    def update(self):
+        """Poll the resource directories and reload changes, if the
+        polling interval has elapsed.
+
+        Called by the model main loop, once installed.
+
+        :return: The list of cleared handles.
+        """
+        if time.perf_counter() - self._last_poll < self.interval:
+            return []
+
+        changed, added, removed = self.poll()
+        if not (changed or added or removed):
+            return []
+
+        return self.reload(changed, added, removed)
+
+    def reload(self, changed=(), added=(), removed=()):
+        """Apply the given file changes to the resource tree.
+
+        Worlds are rebuilt(see :py:meth:`WorldHandle.rebuild`) only if
+        the resource tree was actually affected.
+
+        :param changed: Paths of modified files.
+        :param added: Paths of new files.
+        :param removed: Paths of removed files.
+        :return: The list of cleared handles.
+        """
+        changed = {pt.abspath(path) for path in changed}
+        removed = {pt.abspath(path) for path in removed}
+
+        cleared = []
+        users = set()           # Worlds referencing cleared resources
+        affected = False
+        for dic, key, handle in iter_handles(self.model.res):
+            files = {pt.abspath(path) for path in handle.watched_files()}
+            if not files & (changed | removed):
+                continue
+
+            if handle.loaded:
+                users |= self._users(handle)
+                handle.clear()
+                cleared.append(handle)
+
+            if files & removed:
+                dict.__delitem__(dic, key)
+                affected = True
+
+        for path in added:
+            affected |= self._add_file(pt.abspath(path))
+
+        if cleared or affected:
+            self.reloads += 1
+            self._rebuild_worlds(users)
+
+        return cleared
+
+    def _users(self, handle):
+        """Get the world handles that may reference a resource."""
+        if Handle.manager is not None:
+            return Handle.manager.users(handle)
+
+        # Unknown, assume all the loaded worlds do
+        return {world_handle for _, _, world_handle
+                in iter_handles(self.model.res)
+                if isinstance(world_handle, WorldHandle)
+                and world_handle.loaded}
+
+    def _add_file(self, path):
+        """Create a handle for a new file, if its directory is in the
+        resource tree.
+
+        :return: Whether a handle was created.
+        """
+        for root in self.roots:
+            if pt.commonpath((root, path)) != root:
+                continue
+
+            rel_path = pt.relpath(path, root)
+            *parts, name = rel_path.split(os.sep)
+
+            res = self.model.res
+            for part in parts:
+                res = dict.get(res, part)
+                if not isinstance(res, dict):
+                    return False
+
+            size = dict.__len__(res)
+            self._scanner._add_file(res, name, root, rel_path)
+            return dict.__len__(res) > size
+
+        return False
+
+    def _rebuild_worlds(self, users=()):
+        """Rebuild the loaded worlds that opted in, or that are in the
+        given set of users of the reloaded resources."""
+        for _, _, handle in iter_handles(self.model.res):
+            if (isinstance(handle, WorldHandle) and handle.loaded
+                    and (handle.rebuild_on_reload or handle in users)):
+                handle.rebuild(self.model)
@@ -19,6 +19,10 @@ def get_resource_importer(location, accepted_exts):
                      accepted).
     :param accepted_exts: An iterable of extensions recognized as valid
                           resource file.
+
+    `location` and `accepted_exts` are also stored as attributes of the
+    returned function, so that rules can be indexed by an
+    :class:`ImporterDict`.
     """
     def importer(root, rel_path, resources):
         """Return the joined path `root` + `rel_path` if accepted.
@@ -36,6 +40,9 @@ def get_resource_importer(location, accepted_exts):
 
         return None
 
+    importer.location = location
+    importer.accepted_exts = accepted_exts
+
     return importer
 
 
@@ -49,6 +56,14 @@ class Handle:
     behaviour(correctly load and cache the desired resource).
     """
 
+    manager = None
+    """The :class:`ResourceManager` tracking handles, if any(see
+    :py:meth:`ResourceManager.install`)."""
+
+    memory_category = None
+    """Category of the resource for memory accounting(see
+    :class:`ResourceManager`). If None, the handle isn't tracked."""
+
     def __init__(self):
         """Construct an empty handle."""
         self._value = None
@@ -63,6 +78,81 @@ class Handle:
         """
         raise NotImplementedError
 
+    def _prepare(self):
+        """Base method for the thread safe part of resource loading.
+
+        Called by a :class:`Preloader` on a worker thread. Implement
+        this method(together with :py:meth:`_load_prepared`) to move
+        the expensive part of the loading process(e.g. reading and
+        decoding files) out of the main thread. The returned value is
+        passed to :py:meth:`_load_prepared`.
+
+        By default nothing is prepared.
+        """
+        return None
+
+    def _load_prepared(self, prepared):
+        """Base method for loading from prepared data, on main thread.
+
+        :param prepared: The value returned by :py:meth:`_prepare`.
+        :return: The loaded resource, like :py:meth:`_load`.
+
+        By default :py:meth:`_load` is called.
+        """
+        return self._load()
+
+    def _release_prepared(self, prepared):
+        """Release prepared data that won't be used.
+
+        Called when the resource was loaded meanwhile(e.g. by a call to
+        :py:meth:`get`). By default nothing is done.
+        """
+
+    def load_prepared(self, prepared):
+        """Cache the resource from the given prepared data.
+
+        If the resource is already cached, the data is released
+        instead(see :py:meth:`_release_prepared`).
+
+        :param prepared: The value returned by :py:meth:`_prepare`.
+        :return: The specific resource instance handled by this Handle.
+        """
+        if self._value is None:
+            self._value = self._load_prepared(prepared)
+            self._notify_loaded()
+        else:
+            self._release_prepared(prepared)
+
+        return self._value
+
+    def memory_usage(self):
+        """Estimate the memory used by the cached resource.
+
+        The unit depends on :py:attr:`memory_category` (e.g. bytes for
+        textures). Used by :class:`ResourceManager`, by default 0.
+        """
+        return 0
+
+    def watched_files(self):
+        """Get the files the resource is loaded from.
+
+        Used by :class:`ResourceWatcher` to clear the handle when one of
+        them changes. By default, the `filename` attribute(if any).
+        """
+        filename = getattr(self, 'filename', None)
+        return () if filename is None else (filename,)
+
+    def _notify_loaded(self):
+        """Notify the manager(if any) that the resource was loaded."""
+        if (self.manager is not None and self.memory_category is not None
+                and self._value is not None):
+            self.manager.loaded(self)
+
+    @property
+    def loaded(self):
+        """Whether the resource is currently cached."""
+        return self._value is not None
+
     def get(self):
         """Get the handled resource(and cache it if it's not already).
 
@@ -72,6 +162,9 @@ class Handle:
         """
         if self._value is None:
             self._value = self._load()
+            self._notify_loaded()
+        elif self.manager is not None and self.memory_category is not None:
+            self.manager.touch(self)
 
         return self._value
 
@@ -85,6 +178,9 @@ class Handle:
         may or may not release the memory based on the garbage
         collector.
         """
+        if self.manager is not None and self.memory_category is not None:
+            self.manager.forget(self)
+
         self._value = None
 
 
@@ -108,6 +204,41 @@ class IdentityHandle(Handle):
         return self._value
 
 
+class WorldHandle(Handle):
+    """Base class for handles of worlds.
+
+    Worlds are accounted by their number of entities(see
+    :class:`ResourceManager`).
+    """
+    memory_category = 'world'
+
+    rebuild_on_reload = False
+    """Whether the world is rebuilt when resources are reloaded(see
+    :py:meth:`rebuild`)."""
+
+    def memory_usage(self):
+        """Get the number of entities in the world."""
+        if self._value is None:
+            return 0
+
+        return self._value.entity_count
+
+    def rebuild(self, model):
+        """Rebuild the world, e.g. after some resources were reloaded.
+
+        Called by :class:`ResourceWatcher` if
+        :py:attr:`rebuild_on_reload` is True. By default the world is
+        cleared, and switched to again if it's the current one.
+
+        :param model: The :class:`GameModel` the world belongs to.
+        """
+        current = model.current_world_handle is self
+        self.clear()
+
+        if current:
+            model.switch(self)
+
+
 @dataclass(order=True)
 class _PrioritizedDictEntry:
     """Class used to contain a prioritized entry for importer dicts.
@@ -120,6 +251,126 @@ class _PrioritizedDictEntry:
     priority: int
 
 
+class ImporterDict(OrderedDict):
+    """An importer dictionary with a compiled rule matcher.
+
+    Rules(the keys) that carry the ``location`` and ``accepted_exts``
+    attributes(see :py:func:`get_resource_importer`) are indexed by
+    (location, extension), so that for each file only the rules that
+    may accept it are evaluated(see :py:meth:`match`). Other rules
+    (e.g. custom lambdas) are evaluated for every file, as usual.
+
+    Candidates for a directory and extension are computed once and
+    cached. The index is rebuilt when the dictionary is modified.
+
+    Note: when ``accepted_exts`` is a string, it's considered as a
+    single extension.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self._index = None      # {(location, ext): {rule position, ...}}
+        self._generic = None    # [rule position, ...]
+        self._cache = {}        # {(rel_dir, ext): [(lam, handle), ...]}
+        super().__init__(*args, **kwargs)
+
+    def _invalidate(self):
+        """Drop the rule index, rebuilt on the next match."""
+        self._index = None
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._invalidate()
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._invalidate()
+
+    # Mutating methods of OrderedDict don't go through __setitem__ and
+    # __delitem__
+    def pop(self, *args):
+        value = super().pop(*args)
+        self._invalidate()
+        return value
+
+    def popitem(self, last=True):
+        item = super().popitem(last)
+        self._invalidate()
+        return item
+
+    def setdefault(self, key, default=None):
+        value = super().setdefault(key, default)
+        self._invalidate()
+        return value
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self._invalidate()
+
+    def move_to_end(self, key, last=True):
+        super().move_to_end(key, last)
+        self._invalidate()
+
+    def clear(self):
+        super().clear()
+        self._invalidate()
+
+    def _compile(self):
+        """Build the rule index."""
+        self._index = {}
+        self._generic = []
+        self._cache = {}
+
+        for position, lam in enumerate(self):
+            location = getattr(lam, 'location', None)
+            exts = getattr(lam, 'accepted_exts', None)
+            if location is None or exts is None:
+                self._generic.append(position)
+                continue
+
+            if isinstance(exts, str):
+                exts = exts,
+
+            for ext in exts:
+                self._index.setdefault((location, ext), set()).add(position)
+
+    def _candidates(self, rel_dir, ext):
+        """Get the rules that may accept files in the given dir, with
+        the given extension(in order).
+        """
+        positions = set(self._generic)
+        for part in rel_dir.split(pt.sep):
+            positions.update(self._index.get((part, ext), ()))
+
+        rules = tuple(self.items())
+        return [rules[position] for position in sorted(positions)]
+
+    def match(self, root, rel_path, resources):
+        """Find the first rule accepting the given file.
+
+        The parameters are the same of :py:attr:`GameModel.LAMBDA_SIG`.
+
+        :return: A tuple (handle_type, params), or None if no rule
+                 accepts the file.
+        """
+        if self._index is None:
+            self._compile()
+
+        rel_dir, name = pt.split(rel_path)
+        ext = pt.splitext(name)[1]
+
+        rules = self._cache.get((rel_dir, ext))
+        if rules is None:
+            rules = self._cache[rel_dir, ext] = self._candidates(rel_dir,
+                                                                 ext)
+
+        for lam, handle in rules:
+            params = lam(root, rel_path, resources)
+            if params is not None:
+                return handle, params
+
+        return None
+
+
 class ImporterDictBuilder:
     """Builder class for importer dictionaries(for :class:`GameModel`)
 
@@ -176,9 +427,10 @@ class ImporterDictBuilder:
         dictionary calling build multiple times).
 
         :return: An importer dictionary which rules are defined by
-                 previous calls to :py:meth:`add_rule`.
+                 previous calls to :py:meth:`add_rule`(an
+                 :class:`ImporterDict`, with a compiled matcher).
         """
-        importer_dict = OrderedDict()
+        importer_dict = ImporterDict()
         while not self._queue.empty():
             el = self._queue.get()
             importer_dict[el.key_lambda] = el.handle_type
@@ -0,0 +1,200 @@
+"""Lazy exploration of resource directories(see :class:`GameModel`)."""
+import os
+import os.path as pt
+import time
+from dataclasses import dataclass
+
+from .options import options
+from .res import ImporterDict
+
+
+@dataclass
+class ScanStats:
+    """Statistics about the resource directories scanned so far.
+
+    `manifest` tells whether the handles were loaded from a resource
+    manifest(see :py:func:`load_manifest`).
+    """
+    dirs: int = 0
+    files: int = 0
+    seconds: float = 0.
+    manifest: bool = False
+
+
+class _ResourceScanner:
+    """Populate :class:`LazyResourceDict` s from the filesystem.
+
+    :param importer_dict: The importer dictionary(see
+                          :py:attr:`GameModel.LAMBDA_SIG`).
+    :param resources: The resource dictionary passed to the importers.
+    :param stats: A :class:`ScanStats` instance to update.
+    """
+
+    def __init__(self, importer_dict, resources, stats):
+        self.importers = tuple(importer_dict.items())
+        self._match = (importer_dict.match
+                       if isinstance(importer_dict, ImporterDict) else None)
+        self.resources = resources
+        self.stats = stats
+
+    def scan(self, res, dirs):
+        """Populate the given dictionary with the content of dirs.
+
+        Files are assigned a :class:`Handle` through the importers,
+        subdirectories are added as new(unexplored)
+        :class:`LazyResourceDict` s.
+
+        :param res: The :class:`LazyResourceDict` to populate.
+        :param dirs: An iterable of tuples (root, rel_dir), where `root`
+                     is the resource directory and `rel_dir` the
+                     relative path to the directory to scan.
+        """
+        start = time.perf_counter()
+
+        for root, rel_dir in dirs:
+            self.stats.dirs += 1
+            with os.scandir(pt.join(root, rel_dir)) as entries:
+                for entry in entries:
+                    # Hidden files are ignored
+                    if entry.name.startswith('.'):
+                        continue
+
+                    rel_path = pt.join(rel_dir, entry.name)
+                    if entry.is_dir():
+                        self._add_subdir(res, entry.name, root, rel_path)
+                    else:
+                        self.stats.files += 1
+                        self._add_file(res, entry.name, root, rel_path)
+
+        self.stats.seconds += time.perf_counter() - start
+
+    def _add_subdir(self, res, name, root, rel_path):
+        """Queue a subdirectory for a lazy scan."""
+        subdir = dict.get(res, name)
+        if subdir is None:
+            subdir = LazyResourceDict(self)
+            dict.__setitem__(res, name, subdir)
+
+        # Skip if the name is taken by a resource
+        if isinstance(subdir, LazyResourceDict):
+            subdir.add_dir(root, rel_path)
+
+    def _add_file(self, res, name, root, rel_path):
+        """Create a handle for the given file(first matching rule)."""
+        match = self.match(root, rel_path)
+        if match is None:
+            return
+
+        handle, params = match
+
+        # Check if extensions are kept or ignored
+        if options['resource_extensions']:
+            res_key = name
+        else:
+            res_key = pt.splitext(name)[0]
+
+        # Actually create the Handle (skip if already existing).
+        if not dict.__contains__(res, res_key):
+            dict.__setitem__(res, res_key, self.make_handle(handle, params))
+
+    def match(self, root, rel_path):
+        """Find the first rule accepting the given file.
+
+        If the importer dictionary is an :class:`ImporterDict`, its
+        compiled matcher is used.
+
+        :return: A tuple (handle_type, params), or None if no rule
+                 accepts the file.
+        """
+        if self._match is not None:
+            return self._match(root, rel_path, self.resources)
+
+        for lam, handle in self.importers:
+            params = lam(root, rel_path, self.resources)
+            if params is not None:
+                return handle, params
+
+        return None
+
+    def make_handle(self, handle_type, params):
+        """Instantiate a handle for a resource.
+
+        Override to customize what is stored in the tree.
+        """
+        return handle_type(*params)
+
+
+class LazyResourceDict(dict):
+    """A directory of the resource tree, populated on first access.
+
+    On creation the dictionary is empty. Directories to be explored are
+    queued with :py:meth:`add_dir`, and actually scanned when the
+    content of the dictionary is first accessed(e.g. reading a key,
+    iterating, checking for membership). Subdirectories are added as
+    new, unexplored, :class:`LazyResourceDict` s.
+
+    Keys explicitly set are never overwritten by the scan.
+    """
+
+    def __init__(self, scanner):
+        super().__init__()
+        self._scanner = scanner
+        self._pending = []      # [(root, rel_dir), ...]
+
+    def add_dir(self, root, rel_dir=''):
+        """Queue a directory to be scanned on first access.
+
+        :param root: The absolute path to the resource directory.
+        :param rel_dir: The relative path from `root` to the directory.
+        """
+        self._pending.append((root, rel_dir))
+
+    def populate(self):
+        """Scan the queued directories, if any."""
+        if self._pending:
+            pending, self._pending = self._pending, []
+            self._scanner.scan(self, pending)
+
+    def __getitem__(self, key):
+        self.populate()
+        return super().__getitem__(key)
+
+    def __contains__(self, key):
+        self.populate()
+        return super().__contains__(key)
+
+    def __iter__(self):
+        self.populate()
+        return super().__iter__()
+
+    def __len__(self):
+        self.populate()
+        return super().__len__()
+
+    def __repr__(self):
+        self.populate()
+        return super().__repr__()
+
+    def get(self, key, default=None):
+        self.populate()
+        return super().get(key, default)
+
+    def setdefault(self, key, default=None):
+        self.populate()
+        return super().setdefault(key, default)
+
+    def pop(self, *args):
+        self.populate()
+        return super().pop(*args)
+
+    def keys(self):
+        self.populate()
+        return super().keys()
+
+    def values(self):
+        self.populate()
+        return super().values()
+
+    def items(self):
+        self.populate()
+        return super().items()
@@ -3,6 +3,8 @@ import weakref
 
 import esper
 
+from .pool import PoolMember
+
 
 class AbstractComponent:
     """An inheritance based component for an entity-component design.
@@ -171,8 +173,17 @@ class AbstractWorld(esper.World):
 
     NB: Despite the name, it's not an abstract class(While it's designed
     to be derived, it's not compulsive).
+
+    Deleted entities spawned by an :class:`EntityPool` are given back to
+    their pool.
     """
 
+    @property
+    def entity_count(self):
+        """Number of entities in the world(including the ones deleted
+        but not finalized yet)."""
+        return len(self._entities)
+
     def _get_component(self, component_type):
         """Get an iterator for Entity, Component pairs.
 
@@ -394,6 +405,24 @@ class AbstractWorld(esper.World):
         if on_attach and isinstance(component_instance, OnAttachListener):
             component_instance.on_attach(entity, self)
 
+    def _release_pooled(self, entity):
+        """Give the components of an entity back to its pool, if any."""
+        member = self._entities[entity].get(PoolMember)
+        if member is not None:
+            member.pool.release(member)
+
+    def delete_entity(self, entity, immediate=False):
+        if immediate:
+            self._release_pooled(entity)
+
+        super().delete_entity(entity, immediate)
+
+    def _clear_dead_entities(self):
+        for entity in self._dead_entities:
+            self._release_pooled(entity)
+
+        super()._clear_dead_entities()
+
     def create_entity(self, *components, on_attach=True):
         """Create a new Entity.
         This method returns an Entity ID, which is just a plain integer.
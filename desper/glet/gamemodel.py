@@ -102,6 +102,9 @@ class GletGameModel(desper.GameModel):
         # Render clear
         self.window.clear()
 
+        if self.watcher is not None:
+            self.watcher.update()
+
         self._current_world.process(self)
 
         # print(pyglet.clock.get_fps())
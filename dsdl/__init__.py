@@ -6,6 +6,10 @@ from .ecs import *
 from .collisions import *
 from .finger import *
 from .akeyboard import *
+from .mouse import *
+from .audio import *
+from .headless import *
+from .replay import *
 
 try:
     import android
@@ -0,0 +1,258 @@
+"""Module for audio playback(SDL_mixer)."""
+import ctypes
+from dataclasses import dataclass, fields
+
+import dsdl
+import sdl2.sdlmixer as mix
+
+_sound_manager = None
+
+
+def get_sound_manager():
+    """Get the installed :class:`SoundManager`, if any."""
+    return _sound_manager
+
+
+def play_chunk(chunk, loops=0, channel=-1):
+    """Play an audio chunk on the given channel.
+
+    By default the first free channel is used, or the chunk is mixed by
+    the installed :class:`SoundManager`(if any). In headless mode
+    nothing is played(null mixer).
+
+    :return: The channel playing the chunk, -1 if it isn't played.
+    """
+    if chunk is None or dsdl.is_headless():
+        return -1
+
+    if channel == -1 and _sound_manager is not None:
+        return _sound_manager.play(chunk, loops)
+
+    return mix.Mix_PlayChannel(channel, chunk, loops)
+
+
+@dataclass
+class MixStats:
+    """Statistics about the sounds mixed by a :class:`SoundManager`.
+
+    `deduped` counts requests merged with an identical sound started in
+    the same frame, `stolen` the voices of other sounds halted to make
+    room for a new sound(restarting a voice of the same sound, when
+    its voice limit is reached, isn't a steal), `dropped` the requests
+    that couldn't be played. `voices` is the number of voices playing
+    at the end of the frame.
+    """
+    requested: int = 0
+    played: int = 0
+    deduped: int = 0
+    stolen: int = 0
+    dropped: int = 0
+    voices: int = 0
+
+    def add(self, other):
+        """Accumulate the statistics of another instance."""
+        for field in fields(self):
+            setattr(self, field.name,
+                    getattr(self, field.name) + getattr(other, field.name))
+
+
+class SoundManager:
+    """Mix audio chunks on preallocated groups of channels.
+
+    Once installed(see :py:meth:`install`), chunks played through
+    :py:func:`play_chunk` are mixed by the manager:
+
+    - identical sounds requested in the same frame are played once
+    - each sound can be limited to a number of voices. When the limit
+      is reached, the oldest voice of the sound is restarted
+    - each sound is played on a group of channels. When all the
+      channels of a group are busy, the oldest voice with the lowest
+      priority(not higher than the one of the new sound) is stolen,
+      otherwise the sound is dropped
+
+    Sounds are configured through their handles(see
+    :py:meth:`configure`), unconfigured sounds are played on the first
+    group, without voice limit and with priority 0.
+
+    Frames are delimited by :py:meth:`new_frame`(called by
+    :class:`EventHandlerProcessor`). Statistics of the last frame are
+    available in :py:attr:`frame_stats`, cumulative ones in
+    :py:attr:`total_stats`.
+
+    :param groups: A dictionary in the form ``{name: channels}``, in
+                   order.
+    """
+
+    def __init__(self, groups):
+        self.groups = dict(groups)
+        self.frame = 0
+        self.stats = MixStats()
+        self.frame_stats = MixStats()
+        self.total_stats = MixStats()
+
+        self._channels = {}     # {group: (tag, range of channels)}
+        self._handles = {}      # {handle: (group, voices, priority)}
+        self._sounds = {}       # {chunk address: (group, voices, priority)}
+        self._voices = {}       # {channel: (chunk address, priority, frame)}
+        self._frame_played = {}     # {chunk address: channel}
+
+        first = 0
+        for tag, (name, channels) in enumerate(self.groups.items()):
+            self._channels[name] = tag, range(first, first + channels)
+            first += channels
+
+    @property
+    def default_group(self):
+        """Name of the group of unconfigured sounds(the first one)."""
+        return next(iter(self.groups))
+
+    def install(self):
+        """Allocate and group the channels, and make
+        :py:func:`play_chunk` use this manager.
+
+        Volumes are reset on allocation, set them after the manager is
+        installed.
+
+        :return: The manager itself.
+        """
+        global _sound_manager
+
+        if not dsdl.is_headless():
+            mix.Mix_AllocateChannels(sum(self.groups.values()))
+            for tag, channels in self._channels.values():
+                mix.Mix_GroupChannels(channels.start, channels.stop - 1,
+                                      tag)
+
+        _sound_manager = self
+        return self
+
+    def uninstall(self):
+        """Stop mixing chunks through this manager."""
+        global _sound_manager
+
+        if _sound_manager is self:
+            _sound_manager = None
+
+    def configure(self, handle, group=None, voices=None, priority=0):
+        """Set how a sound is mixed.
+
+        :param handle: The :class:`ChunkHandle` of the sound. Settings
+                       apply to the chunk even if it's reloaded.
+        :param group: Name of the group of channels(the first one if
+                      None).
+        :param voices: Maximum number of voices for the sound(no limit
+                       if None).
+        :param priority: Priority of the sound when stealing voices.
+        :raises KeyError: If the group doesn't exist.
+        """
+        group = self.default_group if group is None else group
+        self._channels[group]       # Check existence
+        self._handles[handle] = group, voices, priority
+        self._sounds.clear()
+
+    def invalidate(self):
+        """Forget the settings cached by chunk address.
+
+        Called by :class:`ChunkHandle` when a chunk is loaded or freed,
+        since a new chunk may be allocated at the address of an old
+        one.
+        """
+        self._sounds.clear()
+
+    def _settings(self, address):
+        """Get the settings of a chunk, given its address."""
+        settings = self._sounds.get(address)
+        if settings is not None:
+            return settings
+
+        # Map the chunks currently loaded by the configured handles
+        # (skipping the ones that failed to load)
+        self._sounds = {
+            ctypes.addressof(handle._value.contents): handle_settings
+            for handle, handle_settings in self._handles.items()
+            if handle.loaded and handle._value}
+
+        return self._sounds.setdefault(address,
+                                       (self.default_group, None, 0))
+
+    def _prune(self):
+        """Forget the voices that finished playing."""
+        for channel in tuple(self._voices):
+            if not mix.Mix_Playing(channel):
+                del self._voices[channel]
+
+    def _victim(self, channels, priority):
+        """Get the channel to steal in a full group, -1 if none."""
+        candidates = [(voice_priority, frame, channel)
+                      for channel, (_, voice_priority, frame)
+                      in self._voices.items()
+                      if channel in channels and voice_priority <= priority]
+        if not candidates:
+            return -1
+
+        return min(candidates)[2]
+
+    def play(self, chunk, loops=0):
+        """Play a chunk, according to its settings.
+
+        Usually called through :py:func:`play_chunk`.
+
+        :return: The channel playing the chunk, -1 if it isn't played.
+        """
+        self.stats.requested += 1
+
+        address = ctypes.addressof(chunk.contents)
+        channel = self._frame_played.get(address)
+        if channel is not None:
+            self.stats.deduped += 1
+            return channel
+
+        group, voices, priority = self._settings(address)
+        tag, channels = self._channels[group]
+        self._prune()
+
+        same = [(frame, channel)
+                for channel, (voice_address, _, frame) in self._voices.items()
+                if voice_address == address]
+        stealing = False
+        if voices is not None and len(same) >= voices:
+            channel = min(same)[1]      # Restart the oldest voice
+        else:
+            channel = mix.Mix_GroupAvailable(tag)
+            if channel == -1:
+                channel = self._victim(channels, priority)
+                stealing = True
+
+        if channel == -1:
+            self.stats.dropped += 1
+            return -1
+
+        if channel in self._voices:
+            mix.Mix_HaltChannel(channel)
+            if stealing:
+                self.stats.stolen += 1
+
+        channel = mix.Mix_PlayChannel(channel, chunk, loops)
+        if channel == -1:
+            self.stats.dropped += 1
+            return -1
+
+        self._voices[channel] = address, priority, self.frame
+        self._frame_played[address] = channel
+        self.stats.played += 1
+
+        return channel
+
+    def new_frame(self):
+        """Start a new frame, collecting the statistics of the last one."""
+        if not dsdl.is_headless():
+            self._prune()
+        self.stats.voices = len(self._voices)
+
+        self.frame_stats = self.stats
+        self.total_stats.add(self.stats)
+        self.total_stats.voices = self.stats.voices
+        self.stats = MixStats()
+
+        self._frame_played.clear()
+        self.frame += 1
@@ -1,10 +1,19 @@
 import math
 import functools
+import desper
 import dsdl
 
 
 class BoundingBox:
-    """Rectangle representing a collision bounding box."""
+    """Rectangle representing a collision bounding box.
+
+    The punctual offset of the box is precomputed in
+    :py:attr:`offset_x` and :py:attr:`offset_y`(see
+    :py:meth:`update_offset`).
+    """
+    __slots__ = ('x', 'y', 'w', 'h', 'offset_x', 'offset_y', '_offset',
+                 '_offset_resolver', '_offset_w', '_offset_h',
+                 '__weakref__')
 
     def __init__(self, offset=dsdl.Offset.ORIGIN, w=0, h=0):
         self.x = None
@@ -12,14 +21,37 @@ class BoundingBox:
         self.w = w
         self.h = h
 
-        if isinstance(offset, (list, tuple)) and len(offset) != 2:
-            raise TypeError('Please provide two values for an offset(x, y)')
-        elif (not isinstance(offset, (list, tuple))
-              and not isinstance(offset, dsdl.Offset)):
-            raise TypeError('The given offset should be of type dsdl.Offset, \
-                             or of type list/tuple providing two values(x, y)')
-
-        self.offset = offset
+        # Same as setting offset, inlined since it's a hot path
+        if desper.options['debug']:
+            dsdl.check_offset(offset)
+        self._offset = offset
+        self._offset_resolver = (dsdl.OFFSET_RESOLVERS[offset]
+                                 if type(offset) is dsdl.Offset else None)
+        self.update_offset()
+
+    @property
+    def offset(self):
+        return self._offset
+
+    @offset.setter
+    def offset(self, offset):
+        self._offset = offset
+        self._offset_resolver = dsdl.resolve_offset(offset)
+        self.update_offset()
+
+    def update_offset(self):
+        """Compute the punctual offset of the box, given its size.
+
+        Called automatically when the offset is set, and by
+        :class:`BoundingBoxProcessor` when the size changes.
+        """
+        if self._offset_resolver is None:
+            self.offset_x, self.offset_y = self._offset
+        else:
+            self.offset_x, self.offset_y = self._offset_resolver(self.w,
+                                                                 self.h)
+        self._offset_w = self.w
+        self._offset_h = self.h
 
     def overlaps(self, bbox):
         """Check for the collision between this box and a given one."""
@@ -35,6 +67,7 @@ class BoundingBox:
 
 class CollisionCircle:
     """Circle representing a collision."""
+    __slots__ = 'x', 'y', 'rad', '__weakref__'
 
     def __init__(self, rad):
         self.x = None
@@ -158,8 +191,6 @@ class SpatialHash:
 
         self._population = {}       # (Object, BoundingBox): {(x, y), ...}
 
-        print(self.num_rows, self.num_columns)
-
     def update(self, couple):
         """Add object to the grid, if not present.
 
@@ -194,12 +225,9 @@ class SpatialHash:
 
     def remove(self, couple):
         """Remove an object from the grid, if present."""
-        pop = self._population.get(couple, set())
-        for pos in pop:
+        for pos in self._population.pop(couple, ()):
             self._grid[pos[0]][pos[1]].discard(couple)
 
-        pop.discard(couple)
-
     def get(self, x, y):
         """Get the content of the cell of (non hashed) x, y."""
         if x > self.width or y > self.height or x < 0 or y < 0:
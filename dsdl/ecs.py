@@ -1,6 +1,7 @@
 import ctypes
 import math
 from enum import Enum
+import desper
 import dsdl
 import esper
 from sdl2 import *
@@ -12,6 +13,17 @@ class EventHandlerProcessor(esper.Processor):
     def process(self, model, *args):
         # Initialize
         dsdl.reset_fingers()
+
+        # A new frame for the mixer(see dsdl.SoundManager)
+        sound_manager = dsdl.get_sound_manager()
+        if sound_manager is not None:
+            sound_manager.new_frame()
+
+        # No SDL events in headless mode, advance the input source
+        if dsdl.is_headless():
+            dsdl.get_input_source().tick(model)
+            return
+
         event = SDL_Event()
         while SDL_PollEvent(ctypes.byref(event)) != 0:
             if event.type == SDL_FINGERDOWN:
@@ -20,6 +32,9 @@ class EventHandlerProcessor(esper.Processor):
                 dsdl.finger_id_up(event.tfinger.fingerId)
             elif event.type == SDL_FINGERMOTION:
                 dsdl.finger_id_update(event.tfinger.fingerId, event.tfinger)
+            elif event.type == SDL_APP_WILLENTERBACKGROUND:
+                for listener in getattr(model, 'background_listeners', ()):
+                    listener()
             elif event.type == SDL_QUIT:
                 model.quit = True
                 break
@@ -31,30 +46,42 @@ class TextureRendererProcessor(esper.Processor):
     """Processor that renders SDL_Textures(in pair with Position)."""
 
     def process(self, model, *args):
+        # Nothing to draw in headless mode, only keep animations going
+        if dsdl.is_headless():
+            for _, (tex, pos, animation) in self.world.get_components(
+                    ctypes.POINTER(SDL_Texture), Position, Animation):
+                animation.update()
+            return
+
         for en, (tex, pos) in self.world.get_components(
                 ctypes.POINTER(SDL_Texture), Position):
-            w, h = ctypes.c_int(), ctypes.c_int()
-            SDL_QueryTexture(tex, None, None, w, h)
+            # Textures may be regions of an atlas(see dsdl.atlas_region)
+            src = getattr(tex, 'region', None)
+            if src is None:
+                w, h = ctypes.c_int(), ctypes.c_int()
+                SDL_QueryTexture(tex, None, None, w, h)
+                src_x, src_y, w, h = 0, 0, w.value, h.value
+            else:
+                src_x, src_y, w, h = src.x, src.y, src.w, src.h
 
             animation = self.world.try_component(en, Animation)
             frames = 1 if animation is None else animation.frames
 
             offset_x, offset_y = pos.get_offset(
-                w.value // frames * pos.size_x,
-                h.value * pos.size_y)
+                w // frames * pos.size_x,
+                h * pos.size_y)
             offset_x, offset_y = int(offset_x), int(offset_y)
 
-            src = None
             dest = SDL_Rect(round(pos.x - offset_x), round(pos.y - offset_y),
-                            int(w.value * pos.size_x),
-                            int(h.value * pos.size_y))
+                            int(w * pos.size_x),
+                            int(h * pos.size_y))
 
             if animation is not None:
                 animation.update()
                 src = SDL_Rect(
-                    animation.cur_frame * w.value // animation.frames, 0,
-                    w.value // animation.frames, h)
-                dest.w = w.value // animation.frames
+                    src_x + animation.cur_frame * w // animation.frames,
+                    src_y, w // animation.frames, h)
+                dest.w = w // animation.frames
 
             # Set alpha
             SDL_SetTextureAlphaMod(tex, int(pos.alpha))
@@ -77,6 +104,9 @@ class ScreenClearerProcessor(esper.Processor):
         self.color = SDL_Color(0, 0, 0, 255)
 
     def process(self, model, *args):
+        if dsdl.is_headless():
+            return
+
         SDL_RenderPresent(model.renderer)
 
         SDL_SetRenderDrawColor(model.renderer, self.color.r,
@@ -99,21 +129,13 @@ class BoundingBoxProcessor(esper.Processor):
     def process(self, *args):
         for en, (pos, bbox) in self.world.get_components(dsdl.Position,
                                                          dsdl.BoundingBox):
-            # Calculate offset
-            offset_x = 0
-            offset_y = 0
-            if bbox.offset == Offset.CENTER:
-                offset_x = bbox.w // 2
-                offset_y = bbox.h // 2
-            elif bbox.offset == Offset.BOTTOM_CENTER:
-                offset_x = bbox.w // 2
-                offset_y = bbox.h - 1
-            elif isinstance(bbox.offset, (list, tuple)):
-                offset_x, offset_y = bbox.offset
+            # Offsets are precomputed(see BoundingBox.update_offset)
+            if bbox.w != bbox._offset_w or bbox.h != bbox._offset_h:
+                bbox.update_offset()
 
             # Update position of bbox
-            bbox.x = pos.x - offset_x
-            bbox.y = pos.y - offset_y
+            bbox.x = pos.x - bbox.offset_x
+            bbox.y = pos.y - bbox.offset_y
 
 
 class CollisionCircleProcessor(esper.Processor):
@@ -167,6 +189,9 @@ class FillRectangleRenderProcessor(esper.Processor):
     """Render filled rectangles."""
 
     def process(self, model):
+        if dsdl.is_headless():
+            return
+
         r, g, b, a = (ctypes.c_ubyte(), ctypes.c_ubyte(), ctypes.c_ubyte(),
                       ctypes.c_ubyte())
         SDL_GetRenderDrawColor(model.renderer, ctypes.byref(r),
@@ -203,6 +228,9 @@ class BoundingBoxRendererProcessor(esper.Processor):
     """Show bounding boxes on screen."""
 
     def process(self, model):
+        if dsdl.is_headless():
+            return
+
         for _, bbox in self.world.get_component(dsdl.BoundingBox):
             SDL_SetRenderDrawColor(model.renderer, 255, 0, 0, 255)
             if bbox.x is not None and bbox.y is not None:
@@ -217,12 +245,80 @@ class BoundingBoxRendererProcessor(esper.Processor):
         #                      255, 0, 0, 255)
 
 
+class PreloadProcessor(esper.Processor):
+    """Complete the loading of preloaded resources, once per frame.
+
+    :param preloader: A :class:`desper.Preloader` instance(see
+                      :py:meth:`desper.GameModel.preload`).
+    :param on_done: Optional callable, called with the model as
+                    parameter once the loading is completed.
+    :param time_budget: Time budget per frame, in seconds.
+    """
+
+    def __init__(self, preloader, on_done=None,
+                 time_budget=desper.DEFAULT_TIME_BUDGET):
+        self.preloader = preloader
+        self.on_done = on_done
+        self.time_budget = time_budget
+        self._notified = False
+
+    def process(self, model):
+        if self._notified:
+            return
+
+        if self.preloader.update(self.time_budget):
+            self._notified = True
+            if self.on_done is not None:
+                self.on_done(model)
+
+
 class Offset(Enum):
     CENTER = 'center'
     ORIGIN = 'origin'
     BOTTOM_CENTER = 'bottom_center'
 
 
+OFFSET_RESOLVERS = {
+    Offset.ORIGIN: lambda w, h: (0, 0),
+    Offset.CENTER: lambda w, h: (w // 2, h // 2),
+    Offset.BOTTOM_CENTER: lambda w, h: (w // 2, h - 1)
+}
+"""Functions computing the punctual offset of each :class:`Offset`,
+given the width and height of the object."""
+
+
+def check_offset(offset):
+    """Validate an offset(an :class:`Offset`, or a couple of values).
+
+    :raises TypeError: If the offset is invalid.
+    """
+    if isinstance(offset, (list, tuple)) and len(offset) != 2:
+        raise TypeError('Please provide two values for an offset(x, y)')
+    elif not isinstance(offset, (list, tuple)) and not isinstance(offset,
+                                                                  Offset):
+        raise TypeError('The given offset should be of type dsdl.Offset, \
+                         or of type list/tuple providing two values(x, y)')
+
+
+def resolve_offset(offset):
+    """Get the function computing the punctual offset of an offset.
+
+    Offsets are validated(see :py:func:`check_offset`) only if the
+    `debug` option of desper is enabled.
+
+    :return: A function ``(w, h) -> (x, y)`` from
+             :py:data:`OFFSET_RESOLVERS`, or None if the offset is
+             already a couple of values.
+    """
+    if desper.options['debug']:
+        check_offset(offset)
+
+    if isinstance(offset, Offset):
+        return OFFSET_RESOLVERS[offset]
+
+    return None
+
+
 class Position:
     """Positional component(used for rendering/collisions).
 
@@ -236,6 +332,9 @@ class Position:
 
     alpha is between 0(transparent) and 255(visible).
     """
+    __slots__ = ('x', 'y', 'size_x', 'size_y', 'rot', 'alpha', '_offset',
+                 '_offset_resolver', '_offset_w', '_offset_h',
+                 '_offset_value', '__weakref__')
 
     def __init__(self, x=0, y=0, offset=Offset.ORIGIN, size_x=1, size_y=1,
                  rot=0, alpha=255):
@@ -246,14 +345,23 @@ class Position:
         self.rot = rot
         self.alpha = alpha
 
-        if isinstance(offset, (list, tuple)) and len(offset) != 2:
-            raise TypeError('Please provide two values for an offset(x, y)')
-        elif not isinstance(offset, (list, tuple)) and not isinstance(offset,
-                                                                      Offset):
-            raise TypeError('The given offset should be of type dsdl.Offset, \
-                             or of type list/tuple providing two values(x, y)')
+        # Same as setting offset, inlined since it's a hot path
+        if desper.options['debug']:
+            check_offset(offset)
+        self._offset = offset
+        self._offset_resolver = (OFFSET_RESOLVERS[offset]
+                                 if type(offset) is Offset else None)
+        self._offset_w = None
+
+    @property
+    def offset(self):
+        return self._offset
 
-        self.offset = offset
+    @offset.setter
+    def offset(self, offset):
+        self._offset = offset
+        self._offset_resolver = resolve_offset(offset)
+        self._offset_w = None
 
     def get_offset(self, w, h):
         """Get a couple of values representing the punctual offset.
@@ -261,15 +369,16 @@ class Position:
         This method is designed to be used when Position.offset is
         an Offset instance. This will transform the given Offset type in
         actual values, dynamically calculating them given the w and h.
+        The result is cached for the last given size.
         """
-        if self.offset == Offset.ORIGIN:
-            return 0, 0
-        elif self.offset == Offset.CENTER:
-            return w // 2, h // 2
-        elif self.offset == Offset.BOTTOM_CENTER:
-            return w // 2, h - 1
-        elif isinstance(self.offset, (tuple, list)):
-            return self.offset
+        if w != self._offset_w or h != self._offset_h:
+            self._offset_w = w
+            self._offset_h = h
+            self._offset_value = (
+                self._offset if self._offset_resolver is None
+                else self._offset_resolver(w, h))
+
+        return self._offset_value
 
 
 class Velocity:
@@ -278,6 +387,7 @@ class Velocity:
     This vector will update the position vector(if present) by the
     VelocityProcessor.
     """
+    __slots__ = 'x', 'y', '__weakref__'
 
     def __init__(self, x=0, y=0):
         self.x = x
@@ -291,6 +401,8 @@ class Animation:
     animation(horizontal spritesheet, borders/offsets in the sheet
     aren't supported).
     """
+    __slots__ = ('frames', 'delay', 'oneshot', 'run', 'cur_frame',
+                 '_counter', '__weakref__')
 
     def __init__(self, frames=1, delay=1, start_frame=0, oneshot=False,
                  run=True):
@@ -317,6 +429,8 @@ class Animation:
 
 class Particle:
     """Particle component, defining particle ranges(size, rot, etc)."""
+    __slots__ = ('lifetime', 'size_inc', 'vel_inc', 'rot_inc', 'life_left',
+                 '__weakref__')
 
     def __init__(self, lifetime, size_inc=0, vel_inc=0, rot_inc=0):
         self.lifetime = lifetime
@@ -327,8 +441,48 @@ class Particle:
         self.life_left = lifetime
 
 
+class ParticlePool(desper.EntityPool):
+    """Pool of particle entities(see :class:`desper.EntityPool`).
+
+    Particles are made of a :class:`Particle`, a :class:`Position`, a
+    texture and a :class:`Velocity`. Spawn them with
+    ``pool.acquire(world, texture, x, y, vel_x, vel_y, lifetime, ...)``
+    (see :py:meth:`create` for all the parameters).
+    """
+
+    def create(self, texture, x, y, vel_x, vel_y, lifetime, size_inc=0,
+               vel_inc=0, rot_inc=0, size_x=1, size_y=1,
+               offset=Offset.CENTER):
+        """Build the components of a particle.
+
+        :param texture: The texture of the particle.
+        :param x: Starting x(see :class:`Position`).
+        :param y: Starting y.
+        :param vel_x: Starting horizontal velocity.
+        :param vel_y: Starting vertical velocity.
+        :param lifetime: Life of the particle, in frames(see
+                         :class:`Particle`). Other parameters are
+                         passed to :class:`Particle` and
+                         :class:`Position` accordingly.
+        """
+        return (Particle(lifetime, size_inc, vel_inc, rot_inc),
+                Position(x, y, offset, size_x, size_y),
+                texture, Velocity(vel_x, vel_y))
+
+    def reset(self, components, texture, x, y, vel_x, vel_y, lifetime,
+              size_inc=0, vel_inc=0, rot_inc=0, size_x=1, size_y=1,
+              offset=Offset.CENTER):
+        particle, position, _, velocity = components
+        particle.__init__(lifetime, size_inc, vel_inc, rot_inc)
+        position.__init__(x, y, offset, size_x, size_y)
+        velocity.__init__(vel_x, vel_y)
+
+        return particle, position, texture, velocity
+
+
 class FillRectangle:
     """Renderized filled rectangle."""
+    __slots__ = 'x', 'y', 'w', 'h', 'color', '__weakref__'
 
     def __init__(self, x, y, w, h, color):
         self.x = x
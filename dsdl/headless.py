@@ -0,0 +1,179 @@
+"""Headless backend, used to run worlds without window nor audio.
+
+When the backend is enabled(see :py:func:`enable_headless`) textures
+are replaced by null textures carrying only their size, rendering
+processors skip drawing(still updating the logic they own, e.g.
+animations), the mixer is muted and the pointer state is read from an
+input source instead of SDL(see :class:`ScriptedInput`).
+
+Nothing here requires a display or an audio device, so that worlds can
+be stepped as fast as the CPU allows(e.g. on a display-less server).
+"""
+import os
+import ctypes
+import struct
+import dsdl
+import sdl2
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+SCRIPTED_FINGER_ID = -1
+
+_headless = False
+_input_source = None
+
+
+def enable_headless(input_source=None):
+    """Enable the headless backend.
+
+    Should be called before any resource is loaded. SDL drivers are
+    set to dummy ones, in case some SDL subsystem gets initialized
+    anyway.
+
+    :param input_source: The input source used to retrieve the pointer
+                         state(see :class:`ScriptedInput`). If None, an
+                         empty :class:`ScriptedInput` is used.
+    """
+    global _headless
+
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+    _headless = True
+    set_input_source(ScriptedInput() if input_source is None
+                     else input_source)
+
+
+def is_headless():
+    """Check whether the headless backend is enabled."""
+    return _headless
+
+
+def get_input_source():
+    """Get the input source used in headless mode."""
+    return _input_source
+
+
+def set_input_source(input_source):
+    """Set the input source used in headless mode."""
+    global _input_source
+    _input_source = input_source
+
+
+def null_texture(w=0, h=0):
+    """Get a null SDL_Texture pointer, carrying the given size.
+
+    Like the textures loaded by :class:`TextureHandle`, the size is
+    stored in the `w` and `h` attributes.
+    """
+    texture = ctypes.POINTER(sdl2.SDL_Texture)()
+    texture.w = w
+    texture.h = h
+
+    return texture
+
+
+def png_size(filename):
+    """Get the size of a png image as (w, h), without decoding it.
+
+    :raises ValueError: If the given file isn't a png image.
+    """
+    with open(filename, 'rb') as file:
+        header = file.read(24)
+
+    if header[:8] != PNG_SIGNATURE:
+        raise ValueError('{} is not a png image'.format(filename))
+
+    # Width and height are the first fields of the IHDR chunk
+    return struct.unpack('>II', header[16:24])
+
+
+class ScriptedInput:
+    """Input source that replays a script, one entry per tick.
+
+    Each entry of the script is a tuple ``(pressing, x, y)`` describing
+    the state of the pointer(in window coordinates). Once the script is
+    over, the pointer is released where it was last seen.
+
+    Entries can also be in the form ``(pressing, x, y, dx, dy)``, in
+    which case a finger(see :py:mod:`dsdl.finger`) is kept down while
+    pressing and moved by dx, dy(normalized, like SDL touch events). A
+    None dx means that the finger isn't moving.
+
+    `touch` tells whether the application should prefer touch input
+    over the pointer(e.g. like on android).
+
+    The script can be any iterable(also an infinite generator).
+    """
+
+    def __init__(self, script=(), touch=False):
+        self._script = iter(script)
+        self.state = False, 0, 0
+        self.touch = touch
+        self.ticks = 0
+
+    def tick(self, model):
+        """Advance the script by one tick.
+
+        Called once per frame by :class:`EventHandlerProcessor`.
+        """
+        try:
+            entry = tuple(next(self._script))
+        except StopIteration:
+            entry = False, self.state[1], self.state[2]
+
+        self.state = entry[:3]
+        self._update_finger(entry[0], *entry[3:5])
+
+        self.ticks += 1
+
+    def _update_finger(self, pressing, dx=None, dy=None):
+        """Update the scripted finger, if any."""
+        if not pressing:
+            if SCRIPTED_FINGER_ID in dsdl.fingers:
+                dsdl.finger_id_up(SCRIPTED_FINGER_ID)
+            return
+
+        if dx is None and SCRIPTED_FINGER_ID not in dsdl.fingers:
+            return
+
+        if SCRIPTED_FINGER_ID not in dsdl.fingers:
+            dsdl.finger_id_down(SCRIPTED_FINGER_ID, None)
+
+        if dx is not None:
+            dsdl.finger_id_update(SCRIPTED_FINGER_ID,
+                                  dsdl.FingerMotion(dx, dy))
+
+    def get_mouse_state(self):
+        """Get the current pointer state as (pressing, x, y)."""
+        return self.state
+
+
+class HeadlessGameModel(dsdl.SDLGameModel):
+    """An :class:`SDLGameModel` without window and renderer.
+
+    The headless backend is enabled on construction. The current world
+    can be executed with the usual :py:meth:`loop` or manually, one
+    tick at a time, with :py:meth:`step`.
+    """
+
+    def __init__(self, dirs, importer_dict, window_size=(600, 1000),
+                 input_source=None):
+        enable_headless(input_source)
+        self.window_size = window_size
+
+        super().__init__(dirs, importer_dict, None, None)
+
+    def get_window_size(self):
+        """Get the size of the (virtual) window, as a tuple (w, h)."""
+        return self.window_size
+
+    def step(self, ticks=1):
+        """Process the current world for the given number of ticks.
+
+        Stop earlier if :py:attr:`quit` is set.
+        """
+        for _ in range(ticks):
+            if self.quit:
+                break
+
+            self._current_world.process(self)
@@ -1,15 +1,18 @@
+import ctypes
 from collections import deque
 import desper
+import dsdl
 from sdl2 import *
 
 
 class SDLGameModel(desper.GameModel):
     default_renderer = None
 
-    def __init__(self, dirs, importer_dict, window, renderer=None):
+    def __init__(self, dirs, importer_dict, window, renderer=None,
+                 manifest=None):
         self.window = window
 
-        if renderer is None:
+        if renderer is None and not dsdl.is_headless():
             renderer = SDL_CreateRenderer(window, -1,
                                           SDL_RENDERER_ACCELERATED
                                           | SDL_RENDERER_PRESENTVSYNC)
@@ -19,8 +22,17 @@ class SDLGameModel(desper.GameModel):
             SDLGameModel.default_renderer = self.renderer
 
         self.world_handle_stack = deque()
+        # Callables invoked when the app is about to go in background
+        # (e.g. on Android), since it might be killed afterwards
+        self.background_listeners = []
 
-        super().__init__(dirs, importer_dict)
+        super().__init__(dirs, importer_dict, manifest)
+
+    def get_window_size(self):
+        """Get the size of the window, as a tuple (w, h)."""
+        w, h = ctypes.c_int(), ctypes.c_int()
+        SDL_GetWindowSize(self.window, w, h)
+        return w.value, h.value
 
     def switch(self, room_handle, reset=False, stack=False):
         if stack:
@@ -0,0 +1,22 @@
+"""Module for pointer(mouse) management."""
+import ctypes
+import dsdl
+from sdl2 import *
+
+
+def get_mouse_state():
+    """Get the state of the pointer as a tuple (pressing, x, y).
+
+    `pressing` tells if the left button is pressed, x and y are in
+    window coordinates. In headless mode the state is read from the
+    current input source.
+    """
+    if dsdl.is_headless():
+        return dsdl.get_input_source().get_mouse_state()
+
+    mouse_x, mouse_y = ctypes.c_int(), ctypes.c_int()
+    pressing = bool(SDL_GetMouseState(ctypes.byref(mouse_x),
+                                      ctypes.byref(mouse_y))
+                    & SDL_BUTTON(SDL_BUTTON_LEFT))
+
+    return pressing, mouse_x.value, mouse_y.value
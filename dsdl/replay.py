@@ -0,0 +1,153 @@
+"""Input recording and replaying.
+
+Recorded inputs are stored in a compact binary format: a header,
+followed by run-length encoded records, one per distinct input state.
+
+Header (little endian): magic ``b'DSRP'``, format version(uint16),
+flags(uint8, bit 0 set if touch input is preferred) and the seed of the
+recorded world(uint64).
+
+Record: repetitions(uint16), flags(uint8, bit 0 set if pressing, bit 1
+set if the first finger is moving), x, y(int16, window coordinates,
+zeroed while not pressing). If the finger is moving, the record is
+followed by its motion dx, dy(two doubles).
+
+Together with a seeded world, a recording is enough to reproduce a
+whole game tick by tick(see :class:`InputReplayer`).
+"""
+import struct
+import esper
+import dsdl
+
+REPLAY_MAGIC = b'DSRP'
+REPLAY_VERSION = 1
+
+HEADER_STRUCT = struct.Struct('<4sHBQ')
+RECORD_STRUCT = struct.Struct('<HBhh')
+MOTION_STRUCT = struct.Struct('<dd')
+
+FLAG_TOUCH = 1
+FLAG_PRESSING = 1
+FLAG_FINGER = 2
+
+
+class InputRecorder:
+    """Record input states on a file, one per tick.
+
+    :param filename: The destination file.
+    :param seed: The seed of the recorded world, stored in the header.
+    :param touch: Whether touch input is preferred by the application.
+    """
+
+    def __init__(self, filename, seed=0, touch=False):
+        self.file = open(filename, 'wb')
+        self.file.write(HEADER_STRUCT.pack(
+            REPLAY_MAGIC, REPLAY_VERSION, FLAG_TOUCH if touch else 0,
+            seed))
+
+        self._last = None
+        self._repeat = 0
+        self.ticks = 0
+
+    def record(self, pressing, x, y, finger=None):
+        """Record the input state of the current tick.
+
+        :param finger: A (dx, dy) tuple if the first finger is moving,
+                       None otherwise.
+        """
+        if not pressing:
+            x = y = 0
+
+        state = bool(pressing), x, y, finger
+        if state == self._last and self._repeat < 0xFFFF:
+            self._repeat += 1
+        else:
+            self._flush()
+            self._last = state
+            self._repeat = 1
+
+        self.ticks += 1
+
+    def _flush(self):
+        """Write the pending record, if any."""
+        if self._last is None:
+            return
+
+        pressing, x, y, finger = self._last
+        flags = ((FLAG_PRESSING if pressing else 0)
+                 | (FLAG_FINGER if finger is not None else 0))
+        self.file.write(RECORD_STRUCT.pack(self._repeat, flags, x, y))
+        if finger is not None:
+            self.file.write(MOTION_STRUCT.pack(*finger))
+
+    def close(self):
+        """Flush pending records and close the file."""
+        if self.file.closed:
+            return
+
+        self._flush()
+        self._last = None
+        self.file.close()
+
+
+class InputRecordProcessor(esper.Processor):
+    """Record the input of each frame through an :class:`InputRecorder`.
+
+    Should be executed right after :class:`EventHandlerProcessor`.
+    """
+
+    def __init__(self, recorder):
+        self.recorder = recorder
+
+    def process(self, model):
+        finger = None
+        if dsdl.finger_stack:
+            motion = dsdl.fingers.get(dsdl.finger_stack[0])
+            if motion is not None and motion.moving:
+                finger = motion.dx, motion.dy
+
+        self.recorder.record(*dsdl.get_mouse_state(), finger)
+
+
+class InputReplayer(dsdl.ScriptedInput):
+    """Input source replaying a file written by :class:`InputRecorder`.
+
+    The recorded seed and touch preference are available as
+    :py:attr:`seed` and :py:attr:`touch`.
+
+    :raises ValueError: If the file isn't a valid recording.
+    """
+
+    def __init__(self, filename):
+        with open(filename, 'rb') as file:
+            data = file.read()
+
+        if len(data) < HEADER_STRUCT.size:
+            raise ValueError('{} is not a recording'.format(filename))
+
+        magic, version, flags, seed = HEADER_STRUCT.unpack_from(data)
+        if magic != REPLAY_MAGIC:
+            raise ValueError('{} is not a recording'.format(filename))
+        if version != REPLAY_VERSION:
+            raise ValueError('unsupported recording version {}'
+                             .format(version))
+
+        self.seed = seed
+        super().__init__(self._decode(data, HEADER_STRUCT.size),
+                         bool(flags & FLAG_TOUCH))
+
+    @staticmethod
+    def _decode(data, offset):
+        """Generate the recorded states, one per tick."""
+        while offset < len(data):
+            repeat, flags, x, y = RECORD_STRUCT.unpack_from(data, offset)
+            offset += RECORD_STRUCT.size
+
+            dx = dy = None
+            if flags & FLAG_FINGER:
+                dx, dy = MOTION_STRUCT.unpack_from(data, offset)
+                offset += MOTION_STRUCT.size
+
+            entry = bool(flags & FLAG_PRESSING), x, y, dx, dy
+            for _ in range(repeat):
+                yield entry
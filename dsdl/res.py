@@ -1,5 +1,8 @@
 import json
 import ctypes
+import functools
+import hashlib
+import os
 import os.path as pt
 import desper
 import dsdl
@@ -9,21 +12,27 @@ import sdl2.sdlttf as ttf
 import sdl2.sdlmixer as mix
 
 
+ATLAS_VERSION = 1
+ATLAS_MAX_WIDTH = 2048
+ATLAS_PADDING = 1       # Avoid bleeding between regions when filtering
+
+
 def log_importer(root, rel, res):
     print(root, rel, res)
 
 
 def get_texture_importer():
-    return desper.get_resource_importer('text', ('.png'))
+    return desper.get_resource_importer('text', ('.png',))
 
 
 def get_font_importer():
-    return desper.get_resource_importer('fonts', ('.json'))
+    return desper.get_resource_importer('fonts', ('.json',))
 
 
 def get_fontcache_importer():
-    lambd = desper.get_resource_importer('str', ('.json'))
+    lambd = desper.get_resource_importer('str', ('.json',))
 
+    @functools.wraps(lambd)     # Keep the rule indexable
     def decorated_lambda(root, rel, res):
         ret = lambd(root, rel, res)
         if ret is None:
@@ -38,19 +47,132 @@ def get_fontcache_importer():
 
 
 def get_chunk_importer():
-    return desper.get_resource_importer('chunks', ('.ogg'))
+    return desper.get_resource_importer('chunks', ('.ogg',))
 
 
 def get_mus_importer():
-    return desper.get_resource_importer('mus', ('.ogg'))
+    return desper.get_resource_importer('mus', ('.ogg',))
+
+
+def texture_from_surface(renderer, surface):
+    """Create a texture from a surface, storing its size in w and h.
+
+    In headless mode a null texture(of the same size) is returned.
+    """
+    if dsdl.is_headless():
+        return dsdl.null_texture(surface.contents.w, surface.contents.h)
+
+    texture = sdl2.SDL_CreateTextureFromSurface(renderer, surface)
+    texture.w = surface.contents.w
+    texture.h = surface.contents.h
+
+    return texture
+
+
+def texture_memory_usage(texture):
+    """Estimate the size of a texture in bytes(RGBA), 0 if None."""
+    if texture is None:
+        return 0
+
+    return texture.w * texture.h * 4
+
+
+def destroy_texture(texture):
+    """Destroy a texture, if valid(null textures are ignored)."""
+    if texture:
+        sdl2.SDL_DestroyTexture(texture)
+
+
+def atlas_region(atlas, x, y, w, h):
+    """Get a texture pointer referring to a region of an atlas.
+
+    The returned pointer shares the atlas texture. The region is stored
+    in the `region` attribute(an SDL_Rect) and its size in `w` and `h`,
+    like the textures loaded by :class:`TextureHandle`(regions are
+    taken into account by :class:`TextureRendererProcessor`).
+    """
+    texture = ctypes.cast(atlas, ctypes.POINTER(sdl2.SDL_Texture))
+    texture.w = w
+    texture.h = h
+    texture.region = sdl2.SDL_Rect(x, y, w, h)
+    texture.atlas = atlas       # Keep a reference to the whole atlas
+
+    return texture
+
+
+def pack_rects(sizes, max_width=ATLAS_MAX_WIDTH, padding=ATLAS_PADDING):
+    """Pack rectangles in rows, tallest first.
+
+    :param sizes: A dictionary in the form ``{key: (w, h)}``.
+    :param max_width: Maximum width of a row(wider rectangles get a row
+                      of their own).
+    :param padding: Space left between rectangles.
+    :return: A tuple (rects, w, h), where rects is a dictionary in the
+             form ``{key: (x, y, w, h)}`` and (w, h) is the size of the
+             smallest area containing all the rectangles.
+    """
+    rects = {}
+    x = y = row_h = width = 0
+    for key, (w, h) in sorted(sizes.items(), key=lambda item: -item[1][1]):
+        if x > 0 and x + w > max_width:
+            x = 0
+            y += row_h + padding
+            row_h = 0
+
+        rects[key] = x, y, w, h
+        width = max(width, x + w)
+        row_h = max(row_h, h)
+        x += w + padding
+
+    return rects, width, y + row_h
 
 
 class TextureHandle(desper.Handle):
+    memory_category = 'texture'
+
     def __init__(self, filename):
         super().__init__()
         self.filename = filename
 
+    def memory_usage(self):
+        """Estimate the size of the texture in bytes(RGBA)."""
+        return texture_memory_usage(self._value)
+
+    def clear(self):
+        """Clear the cached texture, destroying it."""
+        destroy_texture(self._value)
+        super().clear()
+
+    def _prepare(self):
+        # In headless mode, only the size is needed
+        if dsdl.is_headless():
+            return dsdl.png_size(self.filename)
+
+        surface = image.IMG_Load(self.filename.encode())
+        if not surface:
+            raise IOError('Unable to load {}: {}'.format(
+                self.filename, image.IMG_GetError().decode()))
+
+        return surface
+
+    def _load_prepared(self, prepared):
+        if dsdl.is_headless():
+            return dsdl.null_texture(*prepared)
+
+        text = texture_from_surface(dsdl.SDLGameModel.default_renderer,
+                                    prepared)
+        sdl2.SDL_FreeSurface(prepared)
+
+        return text
+
+    def _release_prepared(self, prepared):
+        if not dsdl.is_headless():
+            sdl2.SDL_FreeSurface(prepared)
+
     def _load(self):
+        if dsdl.is_headless():
+            return dsdl.null_texture(*dsdl.png_size(self.filename))
+
         text = image.IMG_LoadTexture(dsdl.SDLGameModel.default_renderer,
                                      self.filename.encode())
 
@@ -69,16 +191,43 @@ class FontHandle(desper.Handle):
         super().__init__()
         self.filename = filename
 
-    def _load(self):
+    def watched_files(self):
+        """Get the font description and the font file."""
+        try:
+            with open(self.filename) as file:
+                font_dict = json.load(file)
+        except (OSError, ValueError):
+            return self.filename,
+
+        return (self.filename,
+                pt.join(pt.dirname(self.filename), font_dict['filename']))
+
+    def _prepare(self):
         with open(self.filename) as file:
-            font_dict = json.load(file)
+            return json.load(file)
 
+    def _load_prepared(self, font_dict):
         filename = pt.join(pt.dirname(self.filename), font_dict['filename'])
         return ttf.TTF_OpenFont(filename.encode(), font_dict['size'])
 
+    def _load(self):
+        return self._load_prepared(self._prepare())
+
 
 class FontCacheHandle(desper.Handle):
-    """Caches rendered text on textures, and serves them on request."""
+    """Caches rendered text on textures, and serves them on request.
+
+    If :py:attr:`atlas_dir` is set, all the strings are rendered on a
+    single texture(an atlas), which is also saved on disk together with
+    an index of the regions(see :py:meth:`build_atlas`). As long as the
+    string table and the fonts it uses don't change, following loads
+    only decode and upload the saved atlas, without rendering any text.
+    """
+    memory_category = 'texture'
+
+    atlas_dir = None
+    """Directory where atlases are saved. If None, each string is
+    rendered on a texture of its own, on each load."""
 
     def __init__(self, filename, res):
         super().__init__()
@@ -87,35 +236,226 @@ class FontCacheHandle(desper.Handle):
         self._fallback = None   # Relative path to the handler to be
                                 # used when a key isn't found in this
                                 # one.
+        self._atlas = None
+
+    @property
+    def atlas_filenames(self):
+        """Filenames of the atlas image and of its index, as a tuple."""
+        name = pt.splitext(pt.basename(self.filename))[0]
+        return (pt.join(self.atlas_dir, name + '.png'),
+                pt.join(self.atlas_dir, name + '.json'))
+
+    def watched_files(self):
+        """Get the string table and, if loaded, the font files it uses
+        (see :py:meth:`FontHandle.watched_files`).
+        """
+        files = [self.filename]
+        if self._value is not None:
+            fonts = {dic['font'] for dic in self._value.values()}
+            for font in fonts:
+                files.extend(self.res['fonts'][font].watched_files())
+
+        return files
+
+    def content_hash(self, data, tot_dict):
+        """Get a hash of the string table and of the fonts it uses.
+
+        :param data: The raw content of the string table file.
+        :param tot_dict: The decoded string table.
+        """
+        digest = hashlib.sha1(str(ATLAS_VERSION).encode())
+        digest.update(data)
+
+        fonts = {dic['font'] for dic in tot_dict['strings'].values()}
+        for font in sorted(fonts):
+            font_filename = self.res['fonts'][font].filename
+            with open(font_filename, 'rb') as file:
+                font_data = file.read()
+            digest.update(font_data)
+
+            ttf_filename = pt.join(pt.dirname(font_filename),
+                                   json.loads(font_data)['filename'])
+            with open(ttf_filename, 'rb') as file:
+                digest.update(file.read())
+
+        return digest.hexdigest()
+
+    def _read_atlas(self, digest):
+        """Read the saved atlas, if still valid.
+
+        :return: A tuple (index, surface), or None if the atlas is
+                 missing or outdated. In headless mode the image isn't
+                 decoded(surface is None).
+        """
+        image_filename, index_filename = self.atlas_filenames
+        try:
+            with open(index_filename) as file:
+                index = json.load(file)
+        except (OSError, ValueError):
+            return None
+
+        if index.get('hash') != digest:
+            return None
+
+        if dsdl.is_headless():
+            return index, None
+
+        surface = image.IMG_Load(image_filename.encode())
+        if not surface:
+            return None
+
+        return index, surface
+
+    def _prepare(self):
+        # Text rendering isn't thread safe, only files are read in
+        # background
+        with open(self.filename, 'rb') as file:
+            data = file.read()
+        tot_dict = json.loads(data)
+
+        if self.atlas_dir is None:
+            return tot_dict, None, None
+
+        digest = self.content_hash(data, tot_dict)
+        return tot_dict, digest, self._read_atlas(digest)
+
+    def _release_prepared(self, prepared):
+        atlas = prepared[2]
+        if atlas is not None and atlas[1] is not None:
+            sdl2.SDL_FreeSurface(atlas[1])
 
     def _load(self):
-        with open(self.filename) as file:
-            tot_dict = json.load(file)
+        return self._load_prepared(self._prepare())
 
+    def _load_prepared(self, prepared):
+        tot_dict, digest, atlas = prepared
         self._fallback = tot_dict.get('fallback')
         string_dict = tot_dict['strings']
 
-        for key, dic in string_dict.items():
-            if dic.get('color') is not None:
-                color = [int(dic['color'][i:i + 2], 16)
-                         for i in range(0, len(dic['color']), 2)]
-            else:
-                color = 0xFF, 0xFF, 0xFF, 0xFF
-            surface = ttf.TTF_RenderText_Blended(
-                self.res['fonts'][dic['font']].get(),
-                str(dic['text']).encode(), sdl2.SDL_Color(*color))
-            dic['texture'] = sdl2.SDL_CreateTextureFromSurface(
-                dsdl.SDLGameModel.default_renderer, surface)
+        if self.atlas_dir is None:
+            for dic in string_dict.values():
+                surface = self._render(dic)
+                dic['texture'] = texture_from_surface(
+                    dsdl.SDLGameModel.default_renderer, surface)
+                sdl2.SDL_FreeSurface(surface)
+
+            return string_dict
 
-            w, h = ctypes.c_int(), ctypes.c_int()
-            sdl2.SDL_QueryTexture(dic['texture'], None, None, w, h)
-            dic['texture'].w = w.value
-            dic['texture'].h = h.value
+        if atlas is None:
+            atlas = self.build_atlas(tot_dict, digest)
+        index, surface = atlas
 
+        if surface is None:
+            self._atlas = dsdl.null_texture(*index['size'])
+        else:
+            self._atlas = texture_from_surface(
+                dsdl.SDLGameModel.default_renderer, surface)
             sdl2.SDL_FreeSurface(surface)
 
+        for key, dic in string_dict.items():
+            dic['texture'] = atlas_region(self._atlas, *index['rects'][key])
+
         return string_dict
 
+    def _render(self, dic):
+        """Render a string on a new surface."""
+        if dic.get('color') is not None:
+            color = [int(dic['color'][i:i + 2], 16)
+                     for i in range(0, len(dic['color']), 2)]
+        else:
+            color = 0xFF, 0xFF, 0xFF, 0xFF
+
+        return ttf.TTF_RenderText_Blended(
+            self.res['fonts'][dic['font']].get(),
+            str(dic['text']).encode(), sdl2.SDL_Color(*color))
+
+    def build_atlas(self, tot_dict=None, digest=None):
+        """Render all the strings on an atlas and save it.
+
+        The atlas is saved in :py:attr:`atlas_dir` as a png image,
+        together with a JSON index of the regions. Can be used as a
+        build step, so that the atlas is shipped with the game. If the
+        atlas can't be saved(e.g. read only directory, full disk), it's
+        only kept in memory.
+
+        :param tot_dict: The decoded string table(read from file if
+                         None).
+        :param digest: The hash of the string table(see
+                       :py:meth:`content_hash`, computed if None).
+        :return: A tuple (index, surface). The surface of the atlas
+                 must be freed by the caller.
+        """
+        if tot_dict is None or digest is None:
+            with open(self.filename, 'rb') as file:
+                data = file.read()
+            tot_dict = json.loads(data)
+            digest = self.content_hash(data, tot_dict)
+
+        surfaces = {key: self._render(dic)
+                    for key, dic in tot_dict['strings'].items()}
+        rects, w, h = pack_rects(
+            {key: (surface.contents.w, surface.contents.h)
+             for key, surface in surfaces.items()})
+
+        # Copy the rendered strings as they are(no blending)
+        atlas = sdl2.SDL_CreateRGBSurfaceWithFormat(
+            0, max(w, 1), max(h, 1), 32, sdl2.SDL_PIXELFORMAT_ARGB8888)
+        for key, surface in surfaces.items():
+            sdl2.SDL_SetSurfaceBlendMode(surface, sdl2.SDL_BLENDMODE_NONE)
+            sdl2.SDL_BlitSurface(surface, None, atlas,
+                                 sdl2.SDL_Rect(*rects[key]))
+            sdl2.SDL_FreeSurface(surface)
+
+        index = {'version': ATLAS_VERSION, 'hash': digest,
+                 'size': [atlas.contents.w, atlas.contents.h],
+                 'rects': rects}
+        try:
+            self._write_atlas(index, atlas)
+        except OSError as error:
+            print('Atlas not saved:', error)
+
+        return index, atlas
+
+    def _write_atlas(self, index, surface):
+        """Save an atlas and its index.
+
+        Files are written on temporary files first, so that a broken
+        atlas is never left behind. The index is replaced last.
+        """
+        image_filename, index_filename = self.atlas_filenames
+        os.makedirs(self.atlas_dir, exist_ok=True)
+
+        if image.IMG_SavePNG(surface, (image_filename + '.tmp').encode()):
+            raise IOError('Unable to save {}: {}'.format(
+                image_filename, sdl2.SDL_GetError().decode()))
+        with open(index_filename + '.tmp', 'w') as file:
+            json.dump(index, file, separators=(',', ':'))
+
+        os.replace(image_filename + '.tmp', image_filename)
+        os.replace(index_filename + '.tmp', index_filename)
+
+    def memory_usage(self):
+        """Estimate the size of all the cached textures in bytes."""
+        if self._value is None:
+            return 0
+
+        if self._atlas is not None:
+            return texture_memory_usage(self._atlas)
+
+        return sum(texture_memory_usage(dic['texture'])
+                   for dic in self._value.values())
+
+    def clear(self):
+        """Clear the cached textures, destroying them."""
+        if self._atlas is not None:
+            destroy_texture(self._atlas)
+        elif self._value is not None:
+            for dic in self._value.values():
+                destroy_texture(dic['texture'])
+
+        self._atlas = None
+        super().clear()
+
     def get_texture(self, key):
         """Get a cached texture, given the key."""
         value = self.get()
@@ -131,25 +471,116 @@ class FontCacheHandle(desper.Handle):
 
 
 class ChunkHandle(desper.Handle):
-    """Handle for a SDL audio chunk."""
+    """Handle for a SDL audio chunk.
+
+    When preloaded, the file is read in background and decoded on the
+    main thread.
+    """
+    memory_category = 'chunk'
 
     def __init__(self, filename):
         super().__init__()
         self.filename = filename
 
+    def memory_usage(self):
+        """Get the size of the decoded chunk in bytes."""
+        if not self._value:     # Not loaded, or failed to
+            return 0
+
+        return self._value.contents.alen
+
+    def clear(self):
+        """Clear the cached chunk, freeing it."""
+        if self._value is not None:
+            mix.Mix_FreeChunk(self._value)
+
+        super().clear()
+        self._invalidate_sound_settings()
+
+    def _notify_loaded(self):
+        super()._notify_loaded()
+        self._invalidate_sound_settings()
+
+    def _invalidate_sound_settings(self):
+        """Make the sound manager(if any) forget the chunk addresses it
+        knows, since they may be reused by a new chunk."""
+        sound_manager = dsdl.get_sound_manager()
+        if sound_manager is not None:
+            sound_manager.invalidate()
+
+    def _prepare(self):
+        if dsdl.is_headless():
+            return None
+
+        with open(self.filename, 'rb') as file:
+            return file.read()
+
+    def _load_prepared(self, prepared):
+        # Null mixer in headless mode
+        if dsdl.is_headless():
+            return None
+
+        # The chunk is decoded entirely, the buffer can be released
+        # right after
+        rw = sdl2.SDL_RWFromConstMem(prepared, len(prepared))
+        return mix.Mix_LoadWAV_RW(rw, 1)
+
     def _load(self):
+        # Null mixer in headless mode
+        if dsdl.is_headless():
+            return None
+
         return mix.Mix_LoadWAV(self.filename.encode())
 
 
 class MusicHandle(desper.Handle):
-    """Handle for a SDL music file."""
+    """Handle for a SDL music file.
+
+    The file is loaded in memory and the music is streamed from there
+    (``Mix_LoadMUS_RW``), so that playback never waits on storage(e.g.
+    compressed APK assets on android). The file can be read ahead on a
+    background thread by preloading the handle.
+    """
+    memory_category = 'music'
 
     def __init__(self, filename):
         super().__init__()
         self.filename = filename
+        self._data = None       # File content, the music streams from it
+
+    def memory_usage(self):
+        """Get the memory used by the music(its file size)."""
+        if self._data is None:
+            return 0
+
+        return len(self._data)
+
+    def clear(self):
+        """Clear the cached music, freeing it."""
+        if self._value is not None:
+            mix.Mix_FreeMusic(self._value)
+
+        self._data = None
+        super().clear()
+
+    def _prepare(self):
+        if dsdl.is_headless():
+            return None
+
+        with open(self.filename, 'rb') as file:
+            return file.read()
+
+    def _load_prepared(self, prepared):
+        # Null mixer in headless mode
+        if dsdl.is_headless():
+            return None
+
+        self._data = prepared
+        rw = sdl2.SDL_RWFromConstMem(prepared, len(prepared))
+        return mix.Mix_LoadMUS_RW(rw, 1)
 
     def _load(self):
-        return mix.Mix_LoadMUS(self.filename.encode())
+        return self._load_prepared(self._prepare())
 
 
 def _res_from_path(res, path):
@@ -1,5 +1,7 @@
 import __main__
+import argparse
 import os.path as pt
+import time
 from sdl2 import *
 from sdl2.sdlimage import *
 from sdl2.sdlttf import *
@@ -27,7 +29,41 @@ CURRENT_DB_NAME = 'current.db'
 CURRENT_DB_RES = 'current'
 
 
+def parse_args():
+    parser = argparse.ArgumentParser(description='monospace')
+    parser.add_argument('--seed', type=int,
+                        help='seed of the game worlds(random by default)')
+    parser.add_argument('--record', metavar='FILE',
+                        help='record the input of the last game on FILE')
+    parser.add_argument('--dev', action='store_true',
+                        help='reload resources when their files change, '
+                             'and enable debug checks')
+
+    # Ignore unknown arguments(e.g. given by the android launcher)
+    return parser.parse_known_args()[0]
+
+
+def start_db(model):
+    """Start the services using the current db, once migrated."""
+    db_handle = model.res['db'][CURRENT_DB_RES]
+
+    # Submit scores in background, as soon as the network is available
+    monospace.score_outbox = monospace.ScoreOutbox(
+        db_handle.filename, model.res['sc_hooks']['main'].get()).start()
+
+    # Serve options and scores from memory, writing them in background
+    monospace.store = monospace.Store(db_handle.filename).load(
+        db_handle.get()).start()
+    model.background_listeners.append(monospace.store.flush)
+
+    # Apply options
+    monospace.apply_options(monospace.store)
+
+
 def main():
+    startup_time = time.perf_counter()
+    args = parse_args()
+
     SDL_Init(SDL_INIT_VIDEO)
     IMG_Init(IMG_INIT_PNG)
     Mix_Init(MIX_INIT_OGG)
@@ -57,21 +93,30 @@ def main():
     SDL_RenderSetLogicalSize(renderer, monospace.LOGICAL_WIDTH,
                              monospace.LOGICAL_HEIGHT)
 
-    importer_dict = desper.importer_dict_builder \
-        .add_rule(dsdl.get_texture_importer(), dsdl.TextureHandle) \
-        .add_rule(dsdl.get_font_importer(), dsdl.FontHandle) \
-        .add_rule(dsdl.get_fontcache_importer(), dsdl.FontCacheHandle) \
-        .add_rule(monospace.get_db_importer(), monospace.DBHandle) \
-        .add_rule(dsdl.get_chunk_importer(), dsdl.ChunkHandle) \
-        .add_rule(dsdl.get_mus_importer(), dsdl.MusicHandle) \
-        .add_rule(monospace.get_score_importer(), monospace.ScoresHandle) \
-        .build()
-
-    dirs = [pt.join(pt.dirname(pt.abspath(__main__.__file__)), 'res')]
-    model = dsdl.SDLGameModel(dirs, importer_dict, window, renderer)
+    importer_dict = monospace.build_importer_dict()
+
+    app_dir = pt.dirname(pt.abspath(__main__.__file__))
+
+    # Render strings once, on a cached atlas
+    dsdl.FontCacheHandle.atlas_dir = pt.join(app_dir,
+                                             monospace.ATLAS_DIR_NAME)
+
+    dirs = [pt.join(app_dir, 'res')]
+    model = dsdl.SDLGameModel(dirs, importer_dict, window, renderer,
+                              pt.join(app_dir, monospace.MANIFEST_NAME))
     monospace.model = model
 
-    model.res['game_world'] = monospace.GameWorldHandle(model.res)
+    if args.dev:
+        desper.options['debug'] = True
+        desper.ResourceWatcher(model, dirs, importer_dict).install()
+
+    # Keep cached resources within budget
+    budgets = monospace.ANDROID_RESOURCE_BUDGETS if monospace.on_android \
+        else monospace.RESOURCE_BUDGETS
+    desper.ResourceManager(model, budgets).install()
+
+    model.res['game_world'] = monospace.GameWorldHandle(
+        model.res, args.seed, args.record)
     model.res['menu_world'] = monospace.MenuWorldHandle(model.res)
     model.res['pause_world'] = monospace.PauseWorldHandle(model.res)
     model.res['options_world'] = monospace.OptionsWorldHandle(model.res)
@@ -86,14 +131,44 @@ def main():
     cur_db_filename = monospace.dump_main_db()
     model.res['db'][CURRENT_DB_RES] = monospace.DBHandle(cur_db_filename)
 
-    # Migrate db if necessary
-    monospace.upgrade_db(model.res['db'][CURRENT_DB_RES].get())
-
-    # Apply options
-    monospace.apply_options(model.res['db'][CURRENT_DB_RES].get())
-    model.switch(model.res['menu_world'], stack=True)
-
-    model.loop()
+    # Mix sounds on preallocated channels, before applying the volume
+    monospace.init_sound_manager(model.res)
+
+    # Migrate db if necessary, in background while loading
+    model.res['db']['migration'] = monospace.MigrationHandle(cur_db_filename)
+
+    # Preload the most used resources before showing the menu
+    preload = ['db/migration', 'fonts', 'text', 'chunks',
+               'str/' + monospace.current_lang]
+    # Music is read in memory too, so that starting a game doesn't wait
+    # on storage
+    if 'mus' in model.res:
+        preload.append('mus')
+    model.res['loading_world'] = monospace.LoadingWorldHandle(
+        model.res, preload, model.res['menu_world'], start_db)
+    model.switch(model.res['loading_world'])
+
+    if args.dev:
+        print('Startup time: {:.3f}s, resource scan: {}'.format(
+            time.perf_counter() - startup_time, model.scan_stats))
+
+    try:
+        model.loop()
+    except monospace.MigrationError as error:
+        # The db can't be used, report it instead of crashing
+        print('Unable to migrate the db:', error)
+        SDL_ShowSimpleMessageBox(
+            SDL_MESSAGEBOX_ERROR, b'monospace',
+            'Unable to migrate the saved data: {}'.format(error).encode(),
+            None)
+
+    # Not started if quitting while loading
+    if monospace.store is not None:
+        monospace.store.stop()
+        monospace.score_outbox.stop()
+
+    # Terminate the recording, if any
+    model.res['game_world'].clear()
 
 
 if __name__ == '__main__':
@@ -9,9 +9,12 @@ from .powerups import *
 from .enemies import *
 from .menu import *
 from .score import *
+from .runlog import *
 from .migration import *
+from .datastore import *
 from .ship_selection import *
 from .leaderboard import *
+from .simulation import *
 
 import sdl2 as _sdl
 
@@ -0,0 +1,233 @@
+"""In memory store of options and scores(see :class:`Store`)."""
+import sqlite3
+import threading
+import monospace
+
+STORE_LOAD_QUERY = ("SELECT 'options', `option_name`, `value` FROM `options` "
+                    "UNION ALL SELECT 'scores', `type`, `value` FROM `scores`")
+STORE_WRITE_QUERIES = {
+    'options': 'UPDATE `options` SET `value`=? WHERE `option_name`=?',
+    'scores': 'UPDATE `scores` SET `value`=? WHERE `type`=?'
+}
+
+STORE_FLUSH_DELAY = .5      # Seconds waited to coalesce writes
+STORE_FLUSH_TIMEOUT = 2     # Maximum seconds waited by a blocking flush
+
+
+class Store:
+    """Options and scores, served from memory and written behind.
+
+    All the options and scores are loaded at once(see :py:meth:`load`),
+    so that reads never hit the db. Writes are applied to memory
+    immediately and written to the db by a background thread(see
+    :py:meth:`start`), which waits a short delay so that consecutive
+    writes are coalesced in a single transaction. Only the last value
+    of each entry is written.
+
+    Other statements(e.g. caches, see :py:meth:`execute`) can be
+    executed by the same thread, in the same transactions.
+
+    Pending writes are written on :py:meth:`flush`(e.g. when the game
+    is paused) and on :py:meth:`stop`(e.g. on quit).
+
+    The thread uses a connection of its own to the db.
+
+    :param db_filename: The db containing the `options` and `scores`
+                        tables.
+    :param flush_delay: Time waited before writing, in seconds.
+    """
+
+    def __init__(self, db_filename, flush_delay=STORE_FLUSH_DELAY):
+        self.db_filename = db_filename
+        self.flush_delay = flush_delay
+        self.options = {}
+        self.scores = {}
+        self.writes = 0             # Number of committed transactions
+
+        self._tables = {'options': self.options, 'scores': self.scores}
+        self._cond = threading.Condition()
+        self._dirty = {}            # {(table, key): value}
+        self._statements = []       # [(query, parameters), ...]
+        self._generation = 0        # Incremented on each write
+        self._written = 0           # Last generation written to the db
+        self._urgent = False
+        self._stopping = False
+        self._thread = None
+
+    def load(self, db):
+        """Load all the options and scores, with a single query.
+
+        :param db: A connection to the db(e.g. the main thread one).
+        :return: The store itself.
+        """
+        for table, key, value in db.cursor().execute(STORE_LOAD_QUERY):
+            self._tables[table][key] = value
+
+        return self
+
+    def start(self):
+        """Start the background writer.
+
+        :return: The store itself.
+        """
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, daemon=True,
+                                        name='store-writer')
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Write pending changes and stop the background writer.
+
+        Blocks until the writer is terminated.
+        """
+        if self._thread is None:
+            return
+
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+
+        self._thread.join()
+        self._thread = None
+
+    def get_option(self, name):
+        """Get the value of an option.
+
+        :raises KeyError: If the option doesn't exist.
+        """
+        return self.options[name]
+
+    def set_option(self, name, value):
+        """Set the value of an option(written in background).
+
+        :raises KeyError: If the option doesn't exist.
+        """
+        self._set('options', name, value)
+
+    def get_score(self, type_):
+        """Get a score(e.g. 'high' or 'total').
+
+        :raises KeyError: If the score doesn't exist.
+        """
+        return self.scores[type_]
+
+    def set_score(self, type_, value):
+        """Set a score(written in background).
+
+        :raises KeyError: If the score doesn't exist.
+        """
+        self._set('scores', type_, value)
+
+    def add_score(self, type_, amount):
+        """Add an amount to a score(written in background).
+
+        :raises KeyError: If the score doesn't exist.
+        """
+        self._set('scores', type_, self.scores[type_] + amount)
+
+    def execute(self, query, parameters=()):
+        """Schedule a statement, executed in background(after the
+        entries set in the meantime).
+
+        Statements are executed in order. The result is discarded.
+        """
+        with self._cond:
+            self._statements.append((query, parameters))
+            self._generation += 1
+            self._cond.notify_all()
+
+    def _set(self, table, key, value):
+        """Update an entry in memory and schedule its write."""
+        values = self._tables[table]
+        values[key]         # Check existence
+
+        with self._cond:
+            values[key] = value
+            self._dirty[table, key] = value
+            self._generation += 1
+            self._cond.notify_all()
+
+    @property
+    def pending(self):
+        """Number of entries and statements waiting to be written."""
+        return len(self._dirty) + len(self._statements)
+
+    def flush(self, wait=True, timeout=STORE_FLUSH_TIMEOUT):
+        """Write pending changes as soon as possible.
+
+        :param wait: Whether to block until the changes are written.
+        :param timeout: Maximum time to block, in seconds(None for no
+                        limit).
+        :return: True if all the changes made before the call are
+                 written(always False if not waiting).
+        """
+        with self._cond:
+            target = self._generation
+            if self._written >= target:
+                return wait
+
+            self._urgent = True
+            self._cond.notify_all()
+
+            if not wait or self._thread is None:
+                return False
+
+            return self._cond.wait_for(lambda: self._written >= target,
+                                       timeout)
+
+    def _write(self, db, dirty, statements):
+        """Write the given entries and execute the given statements, in
+        a single transaction."""
+        with db:
+            for (table, key), value in dirty.items():
+                db.execute(STORE_WRITE_QUERIES[table], (value, key))
+            for query, parameters in statements:
+                db.execute(query, parameters)
+        self.writes += 1
+
+    def _run(self):
+        """Main loop of the writer thread."""
+        db = monospace.connect_db(self.db_filename)
+        try:
+            while True:
+                with self._cond:
+                    self._cond.wait_for(lambda: self._dirty or self._statements
+                                        or self._stopping)
+                    # Give consecutive writes a chance to be coalesced
+                    self._cond.wait_for(
+                        lambda: self._urgent or self._stopping,
+                        self.flush_delay)
+
+                    dirty, self._dirty = self._dirty, {}
+                    statements, self._statements = self._statements, []
+                    generation = self._generation
+                    self._urgent = False
+                    stopping = self._stopping
+
+                try:
+                    if dirty or statements:
+                        self._write(db, dirty, statements)
+                except sqlite3.Error as error:
+                    print('Error writing the store:', error)
+                    with self._cond:
+                        # Retry later, unless overwritten in the meantime
+                        for entry, value in dirty.items():
+                            self._dirty.setdefault(entry, value)
+                        self._statements[:0] = statements
+                        if stopping:
+                            break       # Give up, the db is unusable
+
+                        self._cond.wait(self.flush_delay)
+                    continue
+                else:
+                    with self._cond:
+                        self._written = max(self._written, generation)
+                        self._cond.notify_all()
+
+                if stopping:
+                    with self._cond:
+                        if not self._dirty and not self._statements:
+                            break
+        finally:
+            db.close()
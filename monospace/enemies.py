@@ -1,6 +1,5 @@
 import ctypes
 import math
-import random
 import monospace
 import dsdl
 import desper
@@ -42,7 +41,9 @@ class EnemyProcessor(esper.Processor):
             if bbox is not None:
                 enemies = ENEMY_HASH.get_from_bbox(bbox)
 
-            for enemy, enemy_bbox in enemies:
+            # Sort candidates by entity for a deterministic outcome
+            for enemy, enemy_bbox in sorted(
+                    enemies, key=lambda couple: couple[0].entity):
                 if enemy.dead or bullet.hit:
                     continue
 
@@ -96,9 +97,13 @@ class Enemy(desper.OnAttachListener):
         game.score_up(self.reward)
         self.spawn_particles()
 
+        run_log = self.world.get_processor(monospace.RunLogProcessor)
+        if run_log is not None:
+            run_log.run.add_kill(type(self).__name__)
+
         # Feedback sound
         if self.death_sound is not None:
-            Mix_PlayChannel(-1, self.death_sound, 0)
+            dsdl.play_chunk(self.death_sound)
 
         self.spawn_bonus()
 
@@ -107,7 +112,7 @@ class Enemy(desper.OnAttachListener):
 
     def spawn_bonus(self):
         """Spawn a bonus for the player, maybe."""
-        powerup = random.choices(self.bonuses, self.bonuses_chances)[0]
+        powerup = monospace.rng.choices(self.bonuses, self.bonuses_chances)[0]
         if powerup is None:
             return
 
@@ -135,6 +140,10 @@ class Enemy(desper.OnAttachListener):
         self.blinking = True
         self.position.alpha = 127
         yield 6
+        # Once dead, the position may be recycled(see DotPool)
+        if self.dead:
+            return
+
         self.position.alpha = 255
         self.blinking = False
 
@@ -147,19 +156,17 @@ class DotEnemy(Enemy):
         texture = self.texture
         position = self.position
         offset = position.get_offset(texture.w, texture.h)
-        for _ in range(random.randrange(4, 8)):
-            angle = math.radians(random.randrange(0, 360))
-            mag = random.randrange(2, 4)
-
-            self.world.create_entity(
-                dsdl.Particle(30, -0.1 / 64, -0.002),
-                dsdl.Position(position.x - offset[0] + texture.w // 2,
-                              position.y - offset[1] + texture.h // 2,
-                              size_x=6 / 64, size_y=10 / 64,
-                              offset=dsdl.Offset.CENTER),
+        for _ in range(monospace.rng.randrange(4, 8)):
+            angle = math.radians(monospace.rng.randrange(0, 360))
+            mag = monospace.rng.randrange(2, 4)
+
+            monospace.particle_pool.acquire(
+                self.world,
                 monospace.model.res['text']['part']['circle'].get(),
-                dsdl.Velocity(x=math.cos(angle) * mag, y=math.sin(angle) * mag)
-            )
+                position.x - offset[0] + texture.w // 2,
+                position.y - offset[1] + texture.h // 2,
+                math.cos(angle) * mag, math.sin(angle) * mag,
+                30, -0.1 / 64, -0.002, size_x=6 / 64, size_y=10 / 64)
 
 
 class Dot2Enemy(DotEnemy):
@@ -175,7 +182,7 @@ class RollEnemy(Enemy, desper.AbstractComponent):
     def __init__(self):
         super().__init__()
 
-        self.trigger = random.randint(30, 100)
+        self.trigger = monospace.rng.randint(30, 100)
         self.timer = self.trigger
         self.rotation_speed = 0
         self._old_velocity = 0
@@ -225,19 +232,17 @@ class RollEnemy(Enemy, desper.AbstractComponent):
         texture = self.texture
         position = self.position
         offset = position.get_offset(texture.w, texture.h)
-        for _ in range(random.randrange(4, 8)):
-            angle = math.radians(random.randrange(0, 360))
-            mag = random.randrange(2, 4)
-
-            self.world.create_entity(
-                dsdl.Particle(30, -0.1 / 64, -0.002),
-                dsdl.Position(position.x - offset[0] + texture.w // 2,
-                              position.y - offset[1] + texture.h // 2,
-                              size_x=6 / 64, size_y=10 / 64,
-                              offset=dsdl.Offset.CENTER),
+        for _ in range(monospace.rng.randrange(4, 8)):
+            angle = math.radians(monospace.rng.randrange(0, 360))
+            mag = monospace.rng.randrange(2, 4)
+
+            monospace.particle_pool.acquire(
+                self.world,
                 monospace.model.res['text']['part']['circle'].get(),
-                dsdl.Velocity(x=math.cos(angle) * mag, y=math.sin(angle) * mag)
-            )
+                position.x - offset[0] + texture.w // 2,
+                position.y - offset[1] + texture.h // 2,
+                math.cos(angle) * mag, math.sin(angle) * mag,
+                30, -0.1 / 64, -0.002, size_x=6 / 64, size_y=10 / 64)
 
 
 class Roll2Enemy(RollEnemy):
@@ -261,21 +266,18 @@ class RocketEnemy(Enemy):
 
         # Spawn particles three times in time
         for _ in range(3):
-            for _ in range(random.randrange(6, 9)):
-                angle = math.radians(random.randrange(0, 360))
-                mag = random.randrange(2, 3)
-                size = random.randrange(3, 4)
-
-                self.world.create_entity(
-                    dsdl.Particle(60, -0.1 / 40, -0.002),
-                    dsdl.Position(position.x - offset[0] + texture.w // 2,
-                                  position.y - offset[1] + texture.h // 2,
-                                  size_x=1 / size, size_y=1 / size,
-                                  offset=dsdl.Offset.CENTER),
+            for _ in range(monospace.rng.randrange(6, 9)):
+                angle = math.radians(monospace.rng.randrange(0, 360))
+                mag = monospace.rng.randrange(2, 3)
+                size = monospace.rng.randrange(3, 4)
+
+                monospace.particle_pool.acquire(
+                    self.world,
                     monospace.model.res['text']['part']['circle'].get(),
-                    dsdl.Velocity(x=math.cos(angle) * mag,
-                                  y=math.sin(angle) * mag)
-                )
+                    position.x - offset[0] + texture.w // 2,
+                    position.y - offset[1] + texture.h // 2,
+                    math.cos(angle) * mag, math.sin(angle) * mag,
+                    60, -0.1 / 40, -0.002, size_x=1 / size, size_y=1 / size)
 
             yield 15
 
@@ -314,9 +316,9 @@ class Rocket2Enemy(RocketEnemy, desper.AbstractComponent):
 
         while self.world.entity_exists(self.entity):
             self.chase = True
-            yield random.randint(30, 70)
+            yield monospace.rng.randint(30, 70)
             self.chase = False
-            yield random.randint(30, 70)
+            yield monospace.rng.randint(30, 70)
 
     def update(self, *args):
         if self.chase and abs(self.position.x - self.target.x) > 10:
@@ -345,7 +347,7 @@ class ShooterEnemy(Enemy, desper.AbstractComponent):
             self.target_x = \
                 self.world.get_component(monospace.Ship)[0][1].position.x
         except IndexError:
-            self.target_x = random.randrange(0, monospace.LOGICAL_WIDTH)
+            self.target_x = monospace.rng.randrange(0, monospace.LOGICAL_WIDTH)
 
         self._shooting = False
         self._shot = False
@@ -379,9 +381,8 @@ class ShooterEnemy(Enemy, desper.AbstractComponent):
                 self.world.get_processor(desper.CoroutineProcessor) \
                     .start(self.target())
                 # Feedback sound
-                Mix_PlayChannel(
-                    -1, monospace.model.res['chunks']['enemies']['shot'].get(),
-                    0)
+                dsdl.play_chunk(
+                    monospace.model.res['chunks']['enemies']['shot'].get())
 
     def target(self):
         """Coroutine that chooses a new target."""
@@ -391,7 +392,7 @@ class ShooterEnemy(Enemy, desper.AbstractComponent):
             self.target_x = \
                 self.world.get_component(monospace.Ship)[0][1].position.x
         except IndexError:
-            self.target_x = random.randrange(0, monospace.LOGICAL_WIDTH)
+            self.target_x = monospace.rng.randrange(0, monospace.LOGICAL_WIDTH)
 
         self._shooting = False
         self._shot = False
@@ -410,20 +411,18 @@ class ShooterEnemy(Enemy, desper.AbstractComponent):
         texture = self.texture
         position = self.position
         offset = position.get_offset(texture.w, texture.h)
-        for _ in range(random.randrange(4, 8)):
-            angle = math.radians(
-                random.randint(0, 1) * 180 - random.randint(-10, 10))
-            mag = random.randrange(2, 4)
-
-            self.world.create_entity(
-                dsdl.Particle(30, -0.1 / 64, -0.002),
-                dsdl.Position(position.x - offset[0] + texture.w // 2,
-                              position.y - offset[1] + texture.h // 2,
-                              size_x=6 / 64, size_y=10 / 64,
-                              offset=dsdl.Offset.CENTER),
+        for _ in range(monospace.rng.randrange(4, 8)):
+            angle = math.radians(monospace.rng.randint(0, 1) * 180
+                                 - monospace.rng.randint(-10, 10))
+            mag = monospace.rng.randrange(2, 4)
+
+            monospace.particle_pool.acquire(
+                self.world,
                 monospace.model.res['text']['part']['circle'].get(),
-                dsdl.Velocity(x=math.cos(angle) * mag, y=math.sin(angle) * mag)
-            )
+                position.x - offset[0] + texture.w // 2,
+                position.y - offset[1] + texture.h // 2,
+                math.cos(angle) * mag, math.sin(angle) * mag,
+                30, -0.1 / 64, -0.002, size_x=6 / 64, size_y=10 / 64)
 
 
 class SphereEnemy(Enemy, desper.AbstractComponent):
@@ -458,15 +457,15 @@ class SphereEnemy(Enemy, desper.AbstractComponent):
 
         sides = 5
         mag = 3
-        base_angle = random.randrange(0, 360)
+        base_angle = monospace.rng.randrange(0, 360)
         for i in range(sides):
             angle = math.radians(base_angle + i * 360 // sides)
 
-            self.world.create_entity(
-                dsdl.Particle(60, -1 / 30, -mag / 60),
-                dsdl.Position(pos.x, pos.y),
+            monospace.particle_pool.acquire(
+                self.world,
                 monospace.model.res['text']['part']['circle'].get(),
-                dsdl.Velocity(math.cos(angle) * mag, math.sin(angle) * mag))
+                pos.x, pos.y, math.cos(angle) * mag, math.sin(angle) * mag,
+                60, -1 / 30, -mag / 60, offset=dsdl.Offset.ORIGIN)
 
     def blink(self):
         """Coroutine for blinking when hit."""
@@ -477,6 +476,9 @@ class SphereEnemy(Enemy, desper.AbstractComponent):
         prev_alpha = self.position.alpha
         self.position.alpha = 255
         yield 6
+        if self.dead:
+            return
+
         self.position.alpha = prev_alpha
         self.blinking = False
 
@@ -490,8 +492,8 @@ class Sphere2Enemy(SphereEnemy):
 def spawn_shooter(world, shot_speed=5):
     """Spawn a shooter enemy."""
     text = monospace.model.res['text']['enemies']['shooter'].get()
-    pos_x = random.choice((-60, monospace.LOGICAL_WIDTH + 60))
-    pos_y = random.randint(text.h, monospace.LOGICAL_HEIGHT // 3)
+    pos_x = monospace.rng.choice((-60, monospace.LOGICAL_WIDTH + 60))
+    pos_y = monospace.rng.randint(text.h, monospace.LOGICAL_HEIGHT // 3)
     world.create_entity(
         dsdl.Position(pos_x, pos_y, offset=dsdl.Offset.CENTER),
         dsdl.BoundingBox(w=50, h=50, offset=dsdl.Offset.CENTER),
@@ -503,7 +505,7 @@ def spawn_shooter(world, shot_speed=5):
 def spawn_roll(world, speed):
     """Spawn a roll enemy with the given vertical speed."""
     text = monospace.model.res['text']['enemies']['roll'].get()
-    pos_x = random.randint(text.w, monospace.LOGICAL_WIDTH - text.w)
+    pos_x = monospace.rng.randint(text.w, monospace.LOGICAL_WIDTH - text.w)
     world.create_entity(
         dsdl.Position(pos_x, -text.h, offset=dsdl.Offset.CENTER),
         dsdl.BoundingBox(w=50, h=50, offset=dsdl.Offset.CENTER),
@@ -514,7 +516,7 @@ def spawn_roll(world, speed):
 def spawn_roll2(world, speed):
     """Spawn a roll2 enemy with the given vertical speed."""
     text = monospace.model.res['text']['enemies']['roll2'].get()
-    pos_x = random.randint(text.w, monospace.LOGICAL_WIDTH - text.w)
+    pos_x = monospace.rng.randint(text.w, monospace.LOGICAL_WIDTH - text.w)
     world.create_entity(
         dsdl.Position(pos_x, -text.h, offset=dsdl.Offset.CENTER),
         dsdl.BoundingBox(w=50, h=50, offset=dsdl.Offset.CENTER),
@@ -525,7 +527,7 @@ def spawn_roll2(world, speed):
 def spawn_rocket(world, speed):
     """Spawn a rocket enemy with the given vertical speed."""
     text = monospace.model.res['text']['enemies']['rocket'].get()
-    pos_x = random.randint(text.w, monospace.LOGICAL_WIDTH - text.w)
+    pos_x = monospace.rng.randint(text.w, monospace.LOGICAL_WIDTH - text.w)
     world.create_entity(
         dsdl.Position(pos_x, -text.h, offset=dsdl.Offset.CENTER),
         dsdl.BoundingBox(w=50, h=50, offset=dsdl.Offset.CENTER),
@@ -536,7 +538,8 @@ def spawn_rocket(world, speed):
 def spawn_rocket2(world, speed):
     """Spawn a rocket2 enemy with the given vertical speed."""
     text = monospace.model.res['text']['enemies']['rocket2'].get()
-    pos_x = random.randint(text.w // 8, monospace.LOGICAL_WIDTH - text.w // 8)
+    pos_x = monospace.rng.randint(text.w // 8,
+                                  monospace.LOGICAL_WIDTH - text.w // 8)
     world.create_entity(
         dsdl.Position(pos_x, -text.h, offset=dsdl.Offset.CENTER),
         dsdl.BoundingBox(w=50, h=50, offset=dsdl.Offset.CENTER),
@@ -548,7 +551,7 @@ def spawn_rocket2(world, speed):
 def spawn_sphere(world, speed):
     """Spawn a sphere enemy with the given vertical speed."""
     text = monospace.model.res['text']['enemies']['sphere'].get()
-    pos_x = random.randint(text.w, monospace.LOGICAL_WIDTH - text.w)
+    pos_x = monospace.rng.randint(text.w, monospace.LOGICAL_WIDTH - text.w)
     world.create_entity(
         dsdl.Position(pos_x, -text.h, offset=dsdl.Offset.CENTER),
         dsdl.BoundingBox(w=50, h=50, offset=dsdl.Offset.CENTER),
@@ -559,9 +562,24 @@ def spawn_sphere(world, speed):
 def spawn_sphere2(world, speed):
     """Spawn a sphere2 enemy with the given vertical speed."""
     text = monospace.model.res['text']['enemies']['sphere2'].get()
-    pos_x = random.randint(text.w, monospace.LOGICAL_WIDTH - text.w)
+    pos_x = monospace.rng.randint(text.w, monospace.LOGICAL_WIDTH - text.w)
     world.create_entity(
         dsdl.Position(pos_x, -text.h, offset=dsdl.Offset.CENTER),
         dsdl.BoundingBox(w=50, h=50, offset=dsdl.Offset.CENTER),
         dsdl.Velocity(0, speed),
         text, monospace.SphereEnemy())
+
+
+SPAWN_RESOURCES = {
+    spawn_shooter: ('text/enemies/shooter', 'text/enemies/bullet',
+                    'text/part/circle', 'chunks/enemies/shot'),
+    spawn_roll: ('text/enemies/roll', 'text/part/circle'),
+    spawn_roll2: ('text/enemies/roll2', 'text/part/circle'),
+    spawn_rocket: ('text/enemies/rocket', 'text/part/circle'),
+    spawn_rocket2: ('text/enemies/rocket2', 'text/part/circle'),
+    spawn_sphere: ('text/enemies/sphere', 'text/part/circle'),
+    spawn_sphere2: ('text/enemies/sphere2', 'text/part/circle')
+}
+"""Resources used by each spawn function(see
+``desper.get_resource``), preloaded before the enemies are spawned(see
+:py:meth:`Wave.preload`)."""
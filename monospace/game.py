@@ -1,6 +1,5 @@
 import ctypes
 import copy
-import random
 import enum
 import math
 import desper
@@ -35,16 +34,18 @@ class GameProcessor(esper.Processor):
         self._rewards_spawned = False
         self._next_wave_coroutine = None
 
-        self.waves = [monospace.FirstWave(),
-                      random.choice((monospace.SecondWaveShooter(),
-                                     monospace.SecondWaveRoll())),
-                      random.choice((monospace.ThirdWave(),
-                                     monospace.ThirdWaveRocket())),
-                      monospace.FourthWave(),
-                      monospace.FifthWave(),
-                      monospace.SixthWave(),
-                      monospace.SeventhWave(),
-                      monospace.InfWave()]
+        # Defined in res/waves
+        load_wave = monospace.load_wave
+        self.waves = [load_wave('first'),
+                      monospace.rng.choice((load_wave('second_shooter'),
+                                            load_wave('second_roll'))),
+                      monospace.rng.choice((load_wave('third'),
+                                            load_wave('third_rocket'))),
+                      load_wave('fourth'),
+                      load_wave('fifth'),
+                      load_wave('sixth'),
+                      load_wave('seventh'),
+                      load_wave('inf')]
 
         self.keys = SDL_GetKeyboardState(None)
 
@@ -76,6 +77,12 @@ class GameProcessor(esper.Processor):
         if self.keys[dsdl.SCANCODE_BACK]:
             monospace.pause_game(0, self.world, monospace.model)
 
+    def cancel_preload(self):
+        """Cancel the pending preloads of all the waves(see
+        :py:meth:`Wave.cancel_preload`)."""
+        for wave in self.waves:
+            wave.cancel_preload()
+
     def spawn_rewards(self):
         yield 120
         self.waves[self._cur_threshold].spawn_rewards(self.world)
@@ -95,8 +102,8 @@ class GameProcessor(esper.Processor):
             text_surface = TTF_RenderText_Blended(
                 self.model.res['fonts']['timenspace_sm'].get(),
                 b'INF', SDL_Color())
-            text = SDL_CreateTextureFromSurface(
-                self.model.renderer, text_surface)
+            text = dsdl.texture_from_surface(self.model.renderer,
+                                             text_surface)
             self.world.create_entity(dsdl.Position(30, 30), text)
 
         def change_color_coroutine():
@@ -121,6 +128,11 @@ class GameProcessor(esper.Processor):
         self.world.get_processor(desper.CoroutineProcessor).start(
             change_color_coroutine())
 
+    @property
+    def wave_number(self):
+        """Number of the current wave, starting from 1."""
+        return self._cur_threshold + 1
+
     @property
     def is_infinite_wave(self):
         return math.isinf(self.WAVE_THRESHOLDS[self._cur_threshold])
@@ -158,7 +170,7 @@ class GameProcessor(esper.Processor):
         text_surface = TTF_RenderText_Blended(
             self.model.res['fonts']['timenspace'].get(),
             str(shown_score).encode(), SDL_Color())
-        self._cached_texture = SDL_CreateTextureFromSurface(
+        self._cached_texture = dsdl.texture_from_surface(
             self.model.renderer, text_surface)
 
         # Add entity
@@ -174,6 +186,7 @@ class GameProcessor(esper.Processor):
             return
 
         self._state = GameState.REWARD
+        self.waves[self._cur_threshold].cancel_preload()
         self.clear_screen()
 
         # Reset bonuses given to the ship
@@ -188,6 +201,7 @@ class GameProcessor(esper.Processor):
         # Clear all the enemies
         for en, enemy in self.world.get_component(monospace.Enemy):
             enemy.dead = True
+            monospace.enemies.ENEMY_HASH.remove((enemy, enemy.bbox))
             enemy.spawn_particles()
             self.world.delete_entity(en)
 
@@ -215,10 +229,12 @@ class EntityCleanerProcessor(esper.Processor):
             if position.y <= 50 and self.world.entity_exists(en):
                 self.world.delete_entity(en)
 
-        for en, _ in self.world.get_component(monospace.Enemy):
+        for en, enemy in self.world.get_component(monospace.Enemy):
             position = self.world.component_for_entity(en, dsdl.Position)
             if position.y > monospace.LOGICAL_HEIGHT + 50 \
                and self.world.entity_exists(en):
+                # The bounding box may be recycled(see DotPool)
+                monospace.enemies.ENEMY_HASH.remove((enemy, enemy.bbox))
                 self.world.delete_entity(en)
 
 
@@ -245,8 +261,14 @@ class Ship(desper.Controller):
         self.bonuses = set()
         self.default_blaster = None
 
-        # Select movement type(based on current platform)
-        self.movement_method = self.touch_movement if monospace.on_android \
+        # Select movement type(based on current platform, or on the
+        # input source in headless mode)
+        if dsdl.is_headless():
+            touch = dsdl.get_input_source().touch
+        else:
+            touch = monospace.on_android
+
+        self.movement_method = self.touch_movement if touch \
             else self.mouse_movement
 
     def on_attach(self, en, world):
@@ -277,17 +299,14 @@ class Ship(desper.Controller):
         for blaster in self.blasters:
             if blaster.shoot(self.position.x, self.position.y):
                 # Feedback sound
-                Mix_PlayChannel(-1,
-                                monospace.model.res['chunks']['shot'].get(),
-                                0)
+                dsdl.play_chunk(monospace.model.res['chunks']['shot'].get())
 
         # Check collisions with powerups
         powerup = self.check_collisions(PowerupBox)
         if powerup is not None:
             powerup.apply(self)
             # Feedback sound
-            Mix_PlayChannel(-1, monospace.model.res['chunks']['powerup'].get(),
-                            0)
+            dsdl.play_chunk(monospace.model.res['chunks']['powerup'].get())
 
         # Check collisions with enemy bullets
         enemy_bullet = self.check_collisions(EnemyBullet)
@@ -305,26 +324,23 @@ class Ship(desper.Controller):
 
     def mouse_movement(self):
         """Movement update managed by mouse(mainly for desktop)."""
-        mouse_x, mouse_y = ctypes.c_int(), ctypes.c_int()
-        pressing = (SDL_GetMouseState(ctypes.byref(mouse_x),
-                                      ctypes.byref(mouse_y))
-                    & SDL_BUTTON(SDL_BUTTON_LEFT))
+        pressing, mouse_x, mouse_y = dsdl.get_mouse_state()
 
         # Start drag
         if pressing and not self._old_pressing:
             self._drag = True
-            self._old_x, self._old_y = mouse_x.value, mouse_y.value
+            self._old_x, self._old_y = mouse_x, mouse_y
         elif not pressing and self._old_pressing:   # Stop drag
             self._drag = False
 
         if self._drag:
-            self.position.x += ((mouse_x.value - self._old_x)
+            self.position.x += ((mouse_x - self._old_x)
                                 * monospace.LOGICAL_WIDTH_RATIO
                                 * self.drag_ratio)
-            self.position.y += ((mouse_y.value - self._old_y)
+            self.position.y += ((mouse_y - self._old_y)
                                 * monospace.LOGICAL_WIDTH_RATIO
                                 * self.drag_ratio)
-            self._old_x, self._old_y = mouse_x.value, mouse_y.value
+            self._old_x, self._old_y = mouse_x, mouse_y
 
         self._old_pressing = pressing
 
@@ -378,40 +394,35 @@ class Ship(desper.Controller):
             position.alpha = 70
 
             for i in range(10):
-                x = random.randint(int(position.x - offset[0]),
-                                   int(position.x - offset[0] + texture.w))
-                y = random.randint(int(position.y - offset[1]),
-                                   int(position.y - offset[1] + texture.h))
+                x = monospace.rng.randint(
+                    int(position.x - offset[0]),
+                    int(position.x - offset[0] + texture.w))
+                y = monospace.rng.randint(
+                    int(position.y - offset[1]),
+                    int(position.y - offset[1] + texture.h))
 
                 # Big burst
-                for _ in range(random.randrange(10, 15)):
-                    angle = math.radians(random.randrange(0, 360))
-                    mag = random.randrange(1, 3)
-
-                    self.world.create_entity(
-                        dsdl.Particle(20, -0.1 / 64, -0.002),
-                        dsdl.Position(x, y,
-                                      size_x=20 / 64, size_y=20 / 64,
-                                      offset=dsdl.Offset.CENTER),
+                for _ in range(monospace.rng.randrange(10, 15)):
+                    angle = math.radians(monospace.rng.randrange(0, 360))
+                    mag = monospace.rng.randrange(1, 3)
+
+                    particle_pool.acquire(
+                        self.world,
                         monospace.model.res['text']['part']['quad'].get(),
-                        dsdl.Velocity(x=math.cos(angle) * mag,
-                                      y=math.sin(angle) * mag)
-                    )
+                        x, y, math.cos(angle) * mag, math.sin(angle) * mag,
+                        20, -0.1 / 64, -0.002,
+                        size_x=20 / 64, size_y=20 / 64)
 
                 # Small burst
-                for _ in range(random.randrange(4, 10)):
-                    angle = math.radians(random.randrange(0, 360))
-                    mag = random.randrange(1, 2)
-
-                    self.world.create_entity(
-                        dsdl.Particle(30),
-                        dsdl.Position(x, y,
-                                      size_x=5 / 64, size_y=5 / 64,
-                                      offset=dsdl.Offset.CENTER),
+                for _ in range(monospace.rng.randrange(4, 10)):
+                    angle = math.radians(monospace.rng.randrange(0, 360))
+                    mag = monospace.rng.randrange(1, 2)
+
+                    particle_pool.acquire(
+                        self.world,
                         monospace.model.res['text']['part']['quad'].get(),
-                        dsdl.Velocity(x=math.cos(angle) * mag,
-                                      y=math.sin(angle) * mag)
-                    )
+                        x, y, math.cos(angle) * mag, math.sin(angle) * mag,
+                        30, size_x=5 / 64, size_y=5 / 64)
 
                 # Feedback sound
                 if i % 2:
@@ -419,45 +430,41 @@ class Ship(desper.Controller):
                 else:
                     sound = monospace.model.res['chunks']['death2'].get()
 
-                Mix_PlayChannel(-1, sound, 0)
+                dsdl.play_chunk(sound)
 
                 yield 10
 
             # Final big burst
             x = position.x - offset[0] + texture.w / 2
             y = position.y - offset[1] + texture.h / 2
-            for _ in range(random.randrange(40, 60)):
-                angle = math.radians(random.randrange(0, 360))
-                mag = random.randrange(1, 3)
-                size = random.randint(10, 30)
-
-                self.world.create_entity(
-                    dsdl.Particle(160, -1 / (160 * 3)),
-                    dsdl.Position(x, y,
-                                  size_x=size / 64, size_y=size / 64,
-                                  offset=dsdl.Offset.CENTER),
+            for _ in range(monospace.rng.randrange(40, 60)):
+                angle = math.radians(monospace.rng.randrange(0, 360))
+                mag = monospace.rng.randrange(1, 3)
+                size = monospace.rng.randint(10, 30)
+
+                particle_pool.acquire(
+                    self.world,
                     monospace.model.res['text']['part']['quad'].get(),
-                    dsdl.Velocity(x=math.cos(angle) * mag,
-                                  y=math.sin(angle) * mag)
-                )
+                    x, y, math.cos(angle) * mag, math.sin(angle) * mag,
+                    160, -1 / (160 * 3), size_x=size / 64, size_y=size / 64)
 
             # Feedback sound
-            Mix_PlayChannel(-1, monospace.model.res['chunks']['death3'].get(),
-                            0)
+            dsdl.play_chunk(monospace.model.res['chunks']['death3'].get())
 
             self.world.delete_entity(self.entity)
 
             yield 210
 
             # Sound feedback
-            Mix_PlayChannel(
-                -1,
-                monospace.model.res['chunks']['enemies']['shot'].get(),
-                0)
+            dsdl.play_chunk(
+                monospace.model.res['chunks']['enemies']['shot'].get())
 
             # Change room
             # Set temporary score for next room
             monospace.score.temp_score = self.processor(GameProcessor).score
+            run_log = self.processor(monospace.RunLogProcessor)
+            if run_log is not None:
+                run_log.finish(monospace.score.temp_score)
             model = monospace.model
             model.switch(model.res['death_world'], True, stack=True)
 
@@ -492,21 +499,64 @@ class Blaster:
 
         # Restart timer and shoot
         self._timer = self.bullet_delay
-        components = [
-            dsdl.Position(self.offset[0] + x, self.offset[1] + y,
-                          offset=dsdl.Offset.BOTTOM_CENTER),
-            self.bullet_text,
-            dsdl.Velocity(*self.bullet_velocity),
-            dsdl.BoundingBox(w=self.bullet_bbox[0], h=self.bullet_bbox[1],
-                             offset=self.bullet_bbox[2]),
-            self.bullet_type()]
+        bullet_pool.acquire(self.world, self, self.offset[0] + x,
+                            self.offset[1] + y)
+
+        return True
 
-        if self.animation is not None:
-            components.append(dsdl.Animation(*self.animation))
 
-        self.world.create_entity(*components)
+class BulletPool(desper.EntityPool):
+    """Pool of bullets shot by :class:`Blaster` s.
 
-        return True
+    Bullets are recycled between blasters shooting the same type of
+    bullet(with or without animation).
+    """
+
+    def key(self, blaster, x, y):
+        return blaster.bullet_type, blaster.animation is not None
+
+    def create(self, blaster, x, y):
+        """Build the components of a bullet shot by the given blaster,
+        at the given position."""
+        components = (
+            dsdl.Position(x, y, offset=dsdl.Offset.BOTTOM_CENTER),
+            blaster.bullet_text,
+            dsdl.Velocity(*blaster.bullet_velocity),
+            dsdl.BoundingBox(w=blaster.bullet_bbox[0],
+                             h=blaster.bullet_bbox[1],
+                             offset=blaster.bullet_bbox[2]),
+            blaster.bullet_type())
+
+        if blaster.animation is not None:
+            components += dsdl.Animation(*blaster.animation),
+
+        return components
+
+    def reset(self, components, blaster, x, y):
+        position, _, velocity, bbox, bullet, *animation = components
+        position.__init__(x, y, offset=dsdl.Offset.BOTTOM_CENTER)
+        velocity.__init__(*blaster.bullet_velocity)
+        bbox.__init__(w=blaster.bullet_bbox[0], h=blaster.bullet_bbox[1],
+                      offset=blaster.bullet_bbox[2])
+        bullet.__init__()
+        for anim in animation:
+            anim.__init__(*blaster.animation)
+
+        return (position, blaster.bullet_text, velocity, bbox, bullet,
+                *animation)
+
+
+bullet_pool = BulletPool()
+"""Pool of all the bullets(see :class:`Blaster`)."""
+
+particle_pool = dsdl.ParticlePool()
+"""Pool of all the particles of the game."""
+
+
+def get_pools():
+    """Get the entity pools of the game, in the form ``{name: pool}``."""
+    return {'bullets': bullet_pool, 'particles': particle_pool,
+            'dots': monospace.dot_pool}
 
 
 class EnemyBullet(desper.Controller):
@@ -600,14 +650,14 @@ class MiniShip(desper.Controller):
 
         self._time = 0
         self._base_y = monospace.LOGICAL_HEIGHT / 4 * 3
-        self.flight_h = random.randrange(monospace.LOGICAL_HEIGHT // 6,
-                                         monospace.LOGICAL_HEIGHT // 4) / 2
+        self.flight_h = monospace.rng.randrange(
+            monospace.LOGICAL_HEIGHT // 6, monospace.LOGICAL_HEIGHT // 4) / 2
 
         self._base_x = monospace.LOGICAL_WIDTH / 2
-        self.flight_w = random.randrange(monospace.LOGICAL_WIDTH // 4,
-                                         monospace.LOGICAL_WIDTH // 1.2) / 2
+        self.flight_w = monospace.rng.randrange(
+            monospace.LOGICAL_WIDTH // 4, monospace.LOGICAL_WIDTH // 1.2) / 2
 
-        self.yfactor = random.randint(1, 3)
+        self.yfactor = monospace.rng.randint(1, 3)
 
     def on_attach(self, en, world):
         super().on_attach(en, world)
@@ -626,22 +676,20 @@ class MiniShip(desper.Controller):
     def shoot_coroutine(self):
         """Shoot every once in a while."""
         while self.world.entity_exists(self.entity):
-            yield random.randint(50, 120)
+            yield monospace.rng.randint(50, 120)
             self.shoot()
 
-            if random.randint(0, 2) == 0:       # Sometimes shoot twice
+            if monospace.rng.randint(0, 2) == 0:       # Sometimes shoot twice
                 yield 10
                 self.shoot()
 
-            if random.randint(0, 18) == 0:   # Rarely shoot a third time
+            if monospace.rng.randint(0, 18) == 0:   # Rarely shoot a third time
                 yield 10
                 self.shoot()
 
     def shoot(self):
         self.blaster.shoot(self.position.x, self.position.y)
-        Mix_PlayChannel(-1,
-                        monospace.model.res['chunks']['shot'].get(),
-                        0)
+        dsdl.play_chunk(monospace.model.res['chunks']['shot'].get())
 
     def update(self, *args):
         self.position.y = self._base_y \
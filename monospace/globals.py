@@ -1 +1,16 @@
+import random
+
 model = None
+
+store = None
+"""In memory store of options and scores(see :class:`Store`)."""
+
+score_outbox = None
+"""Outbox of pending score submissions(see :class:`ScoreOutbox`)."""
+
+rng = random.Random()
+"""Random generator for the game logic.
+
+It's seeded by each game world(see :class:`GameWorldHandle`), so that
+runs can be reproduced.
+"""
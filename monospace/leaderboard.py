@@ -2,8 +2,11 @@
 import math
 import json
 import copy
-import threading
 import ctypes
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
 import dsdl
 import monospace
 import pygmiscores
@@ -17,6 +20,146 @@ username = ['A', 'A', 'A']
 
 MAX_USERNAME_LENGTH = 8
 
+OUTBOX_ADD_QUERY = \
+    'INSERT INTO `score_outbox`(`username`, `score`) VALUES(?, ?)'
+OUTBOX_PENDING_QUERY = ('SELECT `username`, MAX(`score`), MAX(`id`) '
+                        'FROM `score_outbox` GROUP BY `username`')
+OUTBOX_REMOVE_QUERY = \
+    'DELETE FROM `score_outbox` WHERE `username`=? AND `id`<=?'
+
+LEADERBOARD_CACHE_GET_QUERY = ('SELECT `response`, `time` '
+                               'FROM `leaderboard_cache` WHERE `key`=?')
+LEADERBOARD_CACHE_SET_QUERY = ('REPLACE INTO `leaderboard_cache`'
+                               '(`key`, `response`, `time`) VALUES(?, ?, ?)')
+LEADERBOARD_TTL = 300       # Seconds before refreshing a cached page
+
+_leaderboard_textures = {}  # {text: texture}, see leaderboard_texture
+
+OUTBOX_RETRY_INTERVAL = 15      # Seconds
+OUTBOX_MAX_RETRY_INTERVAL = 600
+
+
+class ScoreOutbox:
+    """Durable queue of score submissions, flushed in background.
+
+    Scores are first stored in the `score_outbox` table of the db(see
+    :py:meth:`enqueue`), then submitted by a background thread with
+    ``SubmitMode.HIGHER``. Only the best pending score of each user is
+    submitted. Scores are removed from the outbox once the server
+    answers, so that they survive network errors and restarts. Failed
+    flushes are retried with an exponential backoff.
+
+    The thread uses a connection of its own to the db.
+
+    :param db_filename: The db containing the outbox.
+    :param scores: The ``pygmiscores.Scores`` client.
+    :param retry_interval: Time before the first retry, in seconds.
+    :param max_retry_interval: Maximum time between retries.
+    """
+
+    def __init__(self, db_filename, scores,
+                 retry_interval=OUTBOX_RETRY_INTERVAL,
+                 max_retry_interval=OUTBOX_MAX_RETRY_INTERVAL):
+        self.db_filename = db_filename
+        self.scores = scores
+        self.retry_interval = retry_interval
+        self.max_retry_interval = max_retry_interval
+
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._waiting = []          # Futures waiting for the next flush
+        self._thread = None
+
+    def start(self):
+        """Start the background thread, flushing pending scores.
+
+        :return: The outbox itself.
+        """
+        self._thread = threading.Thread(target=self._run, daemon=True,
+                                        name='score-outbox')
+        self._wake.set()
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the background thread(pending scores are kept)."""
+        self._stop.set()
+        self._wake.set()
+
+    def enqueue(self, db, username, score):
+        """Store a score submission, and wake up the flusher.
+
+        :param db: The main thread connection to the db.
+        """
+        db.cursor().execute(OUTBOX_ADD_QUERY, (username, score))
+        db.commit()
+        self._wake.set()
+
+    def flush(self):
+        """Wake up the flusher.
+
+        :return: A ``concurrent.futures.Future`` completed after the
+                 next flush, with the number of submitted scores as
+                 result(or the error that occurred).
+        """
+        future = Future()
+        with self._lock:
+            self._waiting.append(future)
+        self._wake.set()
+
+        return future
+
+    def _flush(self):
+        """Submit the best pending score of each user.
+
+        :return: The number of submitted scores.
+        :raises requests.RequestException: On network errors.
+        """
+        db = monospace.connect_db(self.db_filename)
+        try:
+            pending = db.execute(OUTBOX_PENDING_QUERY).fetchall()
+            for name, score, last_id in pending:
+                result = self.scores.add(
+                    username=name, score=score,
+                    mode=pygmiscores.SubmitMode.HIGHER)
+                if result['status'] != 200:
+                    print('Score rejected:', result['status'])
+
+                # Scores enqueued in the meantime are kept
+                db.execute(OUTBOX_REMOVE_QUERY, (name, last_id))
+                db.commit()
+
+            return len(pending)
+        finally:
+            db.close()
+
+    def _run(self):
+        """Main loop of the flusher thread."""
+        delay = None        # Wait for scores
+        while True:
+            self._wake.wait(delay)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+
+            with self._lock:
+                waiting, self._waiting = self._waiting, []
+
+            try:
+                sent = self._flush()
+            except (requests.RequestException, ValueError,
+                    sqlite3.Error) as error:
+                print('Error submitting scores, retrying later')
+                delay = self.retry_interval if delay is None \
+                    else min(delay * 2, self.max_retry_interval)
+                for future in waiting:
+                    future.set_exception(error)
+            else:
+                delay = None
+                for future in waiting:
+                    future.set_result(sent)
+
 
 class NameSelectorProcessor(esper.Processor):
     """Render username during selection."""
@@ -86,10 +229,7 @@ class UsernameChecker(desper.AbstractComponent):
 
     def update(self, en, world, model):
         res = model.res
-        db = res['db']['current'].get()
-        user_added = next(db.cursor().execute(monospace.OPTION_GET_QUERY,
-                                              ('username_added',)))[0]
-        if not user_added:
+        if not monospace.store.get_option('username_added'):
             # Set username
             model.switch(res['name_world'], reset=True, stack=True)
 
@@ -124,144 +264,190 @@ def ok_name_action(en, world, model: dsdl.SDLGameModel):
     If this is the first time the username is set, instantly submit
     the high score(if present). This automatically sends the high scores
     for people that had a previous version(when the leaderboard didn't
-    exist). WARNING: no retransmission on fail.
+    exist). The score is submitted through the outbox(see
+    :class:`ScoreOutbox`).
     """
-
-    def submit(highscore):
-        scores = model.res['sc_hooks']['main'].get()
-        try:
-            scores.add(username=''.join(username),
-                       score=highscore,
-                       mode=pygmiscores.SubmitMode.HIGHER)
-        except requests.ConnectionError:
-            print('Error submitting high score')
-
     # Update db
-    db = model.res['db']['current'].get()
-    cur = db.cursor()
-    added = next(cur.execute(monospace.OPTION_GET_QUERY,
-                             ('username_added',)))[0]
-    if not added:       # Submit high score
-        high = next(cur.execute(monospace.HIGH_SCORE_GET_QUERY))[0]
+    store = monospace.store
+    if not store.get_option('username_added'):      # Submit high score
+        high = store.get_score('high')
         if high > 0:
-            threading.Thread(target=submit, args=(high,)).start()
+            monospace.score_outbox.enqueue(
+                model.res['db']['current'].get(), ''.join(username), high)
 
-    cur.execute(monospace.OPTION_UPDATE_QUERY, (True, 'username_added'))
-    cur.execute(monospace.OPTION_UPDATE_QUERY, (''.join(username), 'username'))
-    db.commit()
+    store.set_option('username_added', True)
+    store.set_option('username', ''.join(username))
 
     monospace.split_button_action(None, wait=0)(en, world, model)
 
 
+def get_cached_leaderboard(db, key):
+    """Get a cached leaderboard response.
+
+    :param db: The current db.
+    :param key: The key of the request(see :py:func:`leaderboard_action`).
+    :return: A tuple (response, age), where the age is in seconds, or
+             (None, None) if the response isn't cached.
+    """
+    row = db.cursor().execute(LEADERBOARD_CACHE_GET_QUERY, (key,)) \
+        .fetchone()
+    if row is None:
+        return None, None
+
+    return json.loads(row[0]), time.time() - row[1]
+
+
+def cache_leaderboard(store, key, response):
+    """Store a leaderboard response in the cache.
+
+    :param store: The :class:`Store` writing it in background.
+    """
+    store.execute(LEADERBOARD_CACHE_SET_QUERY,
+                  (key, json.dumps(response), time.time()))
+
+
+class LeaderboardText:
+    """Marker for the entities displaying a leaderboard."""
+
+
+def leaderboard_texture(model, text):
+    """Get the texture of a leaderboard text.
+
+    Textures are cached, so that they are rendered only once(see
+    :py:func:`render_leaderboard`).
+    """
+    texture = _leaderboard_textures.get(text)
+    if texture is None:
+        surf = TTF_RenderUTF8_Blended(
+            model.res['fonts']['timenspace_sm'].get(), text.encode(),
+            SDL_Color())
+        texture = dsdl.texture_from_surface(model.renderer, surf)
+        SDL_FreeSurface(surf)
+        _leaderboard_textures[text] = texture
+
+    return texture
+
+
+def render_leaderboard(world, model, result):
+    """Display a leaderboard response, replacing the displayed one.
+
+    Textures of the texts that are still displayed are reused, the
+    others are destroyed.
+    """
+    # Components are removed right away, so that the textures can be
+    # destroyed safely
+    for en, _ in world.get_component(LeaderboardText):
+        world.remove_component(en, ctypes.POINTER(SDL_Texture))
+        world.delete_entity(en)
+
+    texts = set()
+    x = 50
+    if result['status'] == 200:
+        y = 150
+        inc_y = 80
+        rows = [(score, y + i * inc_y)
+                for i, score in enumerate(result['scores'])]
+        if result['playerScore'] is not None:
+            rows.append((result['playerScore'],
+                         monospace.LOGICAL_HEIGHT - 100))
+
+        for score, y in rows:
+            # Names
+            name = leaderboard_texture(model, score['username'])
+            world.create_entity(dsdl.Position(x, y), name,
+                                LeaderboardText())
+
+            # Points
+            points = leaderboard_texture(model, str(score['score']))
+            world.create_entity(
+                dsdl.Position(monospace.LOGICAL_WIDTH - x - points.w, y),
+                points, LeaderboardText())
+
+            texts.update((score['username'], str(score['score'])))
+
+    else:       # If an error occurred
+        world.create_entity(
+            model.res['str'][monospace.current_lang] \
+                .get_texture('error'),
+            dsdl.Position(x, 150), LeaderboardText())
+
+    for text in _leaderboard_textures.keys() - texts:
+        dsdl.destroy_texture(_leaderboard_textures.pop(text))
+
+
 def leaderboard_action(en, world, model: dsdl.SDLGameModel, submit=False,
                        reset=False):
     """Action for the Leaderboard button.
 
     Change world to the leaderboard one.
-    Make the leaderboard request on a separate thread and render it
-    on screen.
+    The last known leaderboard is displayed right away(if cached),
+    while a request for an updated one is made in background(if the
+    cached one is older than :py:attr:`LEADERBOARD_TTL`, or a score is
+    submitted).
     """
     model.switch(model.res['lead_world'], reset=reset, stack=True)
     world = model.current_world
 
     scores: pygmiscores.Scores = model.res['sc_hooks']['main'].get()
+    db = model.res['db']['current'].get()
+    list_params = {'perpage': 5, 'include_username': ''.join(username)}
+    key = json.dumps(list_params, sort_keys=True)
 
     def coroutine():
-        result = None
-
-        def list_thread():
-            nonlocal result
-            try:
-                results = []
-
-                # Submit current score if requested
-                if submit:
-                    results.append(scores.add(username=''.join(username),
-                                        score=monospace.score.last_score,
-                                        mode=pygmiscores.SubmitMode.HIGHER))
-                results.append(
-                    scores.list_parsed(perpage=5,
-                                       include_username=''.join(username)))
-
-                if not all(result['status'] == 200 for result in results):
-                    raise requests.ConnectionError()
-            except requests.ConnectionError:
-                result = {'status': 'Error'}
-            else:
-                result = results[-1]
-
-        list_thread = threading.Thread(target=list_thread)
-        list_thread.start()
-
-        # Wait for the thread
-        while list_thread.is_alive():
+        cached, age = get_cached_leaderboard(db, key)
+        if cached is not None:
+            render_leaderboard(world, model, cached)
+
+            if age < LEADERBOARD_TTL and not submit:
+                return
+
+        # Submit current score if requested(before listing). If it
+        # fails, the score stays in the outbox
+        if submit:
+            monospace.score_outbox.enqueue(db, ''.join(username),
+                                           monospace.score.last_score)
+            future = monospace.score_outbox.flush()
+            while not future.done():
+                yield
+
+        future = scores.list_async(**list_params)
+
+        # Wait for the request
+        while not future.done():
             yield
 
-        # Generate leaderboard
+        try:
+            result = future.result()
+            if result['status'] != 200:
+                raise requests.ConnectionError()
+        except (requests.RequestException, ValueError):
+            result = {'status': 'Error'}
+
         print('status', result['status'])
-        x = 50
-        if result['status'] == 200:
-            y = 150
-            inc_y = 80
-            for i, score in enumerate(result['scores']):
-                # Names
-                surf = TTF_RenderUTF8_Blended(
-                    model.res['fonts']['timenspace_sm'].get(),
-                    score['username'].encode(),
-                    SDL_Color())
-                text = SDL_CreateTextureFromSurface(model.renderer, surf)
-                world.create_entity(dsdl.Position(x, y), text)
-
-                # Points
-                surf = TTF_RenderUTF8_Blended(
-                    model.res['fonts']['timenspace_sm'].get(),
-                    str(score['score']).encode(),
-                    SDL_Color())
-                text = SDL_CreateTextureFromSurface(model.renderer, surf)
-                world.create_entity(
-                    dsdl.Position(monospace.LOGICAL_WIDTH - x
-                                  - surf.contents.w, y),
-                    text)
-
-                y += inc_y
-
-            if result['playerScore'] is not None:
-                # Your name
-                surf = TTF_RenderUTF8_Blended(
-                        model.res['fonts']['timenspace_sm'].get(),
-                        result['playerScore']['username'].encode(),
-                        SDL_Color())
-                text = SDL_CreateTextureFromSurface(model.renderer, surf)
-                world.create_entity(
-                    dsdl.Position(x, monospace.LOGICAL_HEIGHT - 100), text)
-
-                # Your score
-                surf = TTF_RenderUTF8_Blended(
-                        model.res['fonts']['timenspace_sm'].get(),
-                        str(result['playerScore']['score']).encode(),
-                        SDL_Color())
-                text = SDL_CreateTextureFromSurface(model.renderer, surf)
-                world.create_entity(
-                    dsdl.Position(monospace.LOGICAL_WIDTH - x
-                                  - surf.contents.w,
-                                  monospace.LOGICAL_HEIGHT - 100), text)
-
-        else:       # If an error occurred
-            world.create_entity(
-                model.res['str'][monospace.current_lang] \
-                    .get_texture('error'),
-                dsdl.Position(x, 150))
+        if result['status'] != 200:
+            # Keep the last known leaderboard, if any
+            if cached is None:
+                render_leaderboard(world, model, result)
+            return
+
+        cache_leaderboard(monospace.store, key, result)
+        if result != cached:
+            render_leaderboard(world, model, result)
 
     world.get_processor(desper.CoroutineProcessor).start(coroutine())
 
 
 # Resource
 def get_score_importer():
-    return desper.get_resource_importer('sc_hooks', ('.json'))
+    return desper.get_resource_importer('sc_hooks', ('.json',))
 
 
 class ScoresHandle(desper.Handle):
-    """Handle for pygmiscores.Scores."""
+    """Handle for pygmiscores.Scores.
+
+    The file contains the game id and secret, and optionally the
+    upstream url of the service(e.g. a local server, for development).
+    """
 
     def __init__(self, filename):
         super().__init__()
@@ -271,4 +457,12 @@ class ScoresHandle(desper.Handle):
         with open(self.filename) as file:
             dic = json.load(file)
 
-        return pygmiscores.Scores(game_id=dic['game_id'], secret=dic['secret'])
+        return pygmiscores.Scores(game_id=dic['game_id'], secret=dic['secret'],
+                                  upstream=dic.get('upstream'))
+
+    def clear(self):
+        """Clear the client, closing its session."""
+        if self._value is not None:
+            self._value.close()
+
+        super().clear()
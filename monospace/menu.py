@@ -9,11 +9,6 @@ from sdl2 import *
 from sdl2.sdlmixer import *
 
 
-OPTIONS_GET_ALL_QUERY = 'SELECT * FROM `options`'
-OPTION_GET_QUERY = 'SELECT `value` FROM `options` WHERE `option_name`=?'
-OPTION_UPDATE_QUERY = 'UPDATE `options` SET `value`=? WHERE `option_name`=?'
-
-
 class PauseBackProcessor(esper.Processor):
     """ECS system that unpauses on back button press."""
 
@@ -89,6 +84,21 @@ class MainMenuBackProcessor(esper.Processor):
         self._old_pressed = self.keys[dsdl.SCANCODE_BACK]
 
 
+class LoadingBarProcessor(esper.Processor):
+    """ECS system that stretches the loading bar(a FillRectangle)
+    following the progress of a preloader.
+    """
+
+    def __init__(self, preloader, width):
+        super().__init__()
+        self.preloader = preloader
+        self.width = width
+
+    def process(self, model):
+        for _, rect in self.world.get_component(dsdl.FillRectangle):
+            rect.w = self.width * self.preloader.progress
+
+
 class HaltMusic(desper.OnAttachListener):
     """Halt music on attach."""
 
@@ -100,6 +110,9 @@ class PlayMusic(desper.OnAttachListener):
     """Play music on attach, if not playing already. Resumes if paused."""
 
     def on_attach(self, *args):
+        if dsdl.is_headless():
+            return
+
         if Mix_PausedMusic():
             Mix_ResumeMusic()
         elif not Mix_PlayingMusic():
@@ -130,18 +143,12 @@ class ButtonProcessor(esper.Processor):
         self._old_pressed = True
 
     def process(self, model):
-        mouse_x, mouse_y = ctypes.c_int(0), ctypes.c_int(0)
-        if (SDL_GetMouseState(mouse_x, mouse_y)
-                & SDL_BUTTON(SDL_BUTTON_LEFT)):
-            pressed = True
-        else:
-            pressed = False
+        pressed, mouse_x, mouse_y = dsdl.get_mouse_state()
 
-        win_w, win_h = ctypes.c_int(0), ctypes.c_int(0)
-        SDL_GetWindowSize(monospace.model.window, win_w, win_h)
+        win_w, win_h = model.get_window_size()
 
-        mouse_x = mouse_x.value * monospace.LOGICAL_WIDTH_RATIO
-        mouse_y = mouse_y.value * monospace.LOGICAL_HEIGHT / win_h.value
+        mouse_x = mouse_x * monospace.LOGICAL_WIDTH_RATIO
+        mouse_y = mouse_y * monospace.LOGICAL_HEIGHT / win_h
 
         # print('window', win_w, win_h)
         # print('display mode', monospace.DISPLAY_MODE)
@@ -202,7 +209,7 @@ def split_button_action(world_handle, speed=30, wait=30, stack=False,
         world.remove_component(en, dsdl.FillRectangle)
 
         # Sound feedback
-        Mix_PlayChannel(-1, model.res['chunks']['button'].get(), 0)
+        dsdl.play_chunk(model.res['chunks']['button'].get())
 
         def coroutine():
             """Animation."""
@@ -232,8 +239,11 @@ def pause_game(en, world: esper.World, model: desper.GameModel):
     """Action for the game pause button."""
     try:
         world.get_component(monospace.Ship)[0][1]._drag = False
+        # The game may be left from here, save pending changes(without
+        # blocking, quitting and going in background wait for them)
+        monospace.store.flush(wait=False)
         # Sound feedback
-        Mix_PlayChannel(-1, model.res['chunks']['button'].get(), 0)
+        dsdl.play_chunk(model.res['chunks']['button'].get())
         model.switch(model.res['pause_world'], stack=True)
     except IndexError:
         pass
@@ -244,7 +254,7 @@ def resume_game(en, world: esper.World, model: desper.GameModel):
     world.delete_entity(en)
 
     # Sound feedback
-    Mix_PlayChannel(-1, model.res['chunks']['button'].get(), 0)
+    dsdl.play_chunk(model.res['chunks']['button'].get())
 
     def coroutine():
         """Countdown."""
@@ -270,7 +280,7 @@ def resume_game(en, world: esper.World, model: desper.GameModel):
             Mix_ResumeMusic()
 
         # Sound feedback
-        Mix_PlayChannel(-1, model.res['chunks']['button'].get(), 0)
+        dsdl.play_chunk(model.res['chunks']['button'].get())
         model.pop_switch(True)
 
     world.get_processor(desper.CoroutineProcessor).start(
@@ -279,17 +289,14 @@ def resume_game(en, world: esper.World, model: desper.GameModel):
 
 
 class Option(desper.OnAttachListener):
-    """Set the option initial state, queried from the db."""
+    """Set the option initial state, from the :class:`Store`."""
 
     def __init__(self, option_name):
         self.option_name = option_name
 
     def on_attach(self, en, world):
         res = monospace.model.res
-        c = res['db']['current'].get().cursor()
-
-        c.execute(OPTION_GET_QUERY, (self.option_name,))
-        value = next(c)[0]
+        value = monospace.store.get_option(self.option_name)
 
         comps = []
         if value:
@@ -311,17 +318,14 @@ class Option(desper.OnAttachListener):
 
 
 class SequencedOption(desper.OnAttachListener):
-    """Set the option initial state, queried from the db."""
+    """Set the option initial state, from the :class:`Store`."""
 
     def __init__(self, option_name):
         self.option_name = option_name
 
     def on_attach(self, en, world):
         res = monospace.model.res
-        c = res['db']['current'].get().cursor()
-
-        c.execute(OPTION_GET_QUERY, (self.option_name,))
-        value = next(c)[0]
+        value = monospace.store.get_option(self.option_name)
 
         comps = []
         bbox = world.try_component(en, dsdl.BoundingBox)
@@ -352,13 +356,8 @@ class OptionToggler:
         if self._coroutine is not None:
             return
 
-        db = model.res['db']['current'].get()
-        c = db.cursor()
-        c.execute(OPTION_GET_QUERY, (self.option_name,))
-
-        value = not next(c)[0]
-        c.execute(OPTION_UPDATE_QUERY, (value, self.option_name))
-        db.commit()
+        value = not monospace.store.get_option(self.option_name)
+        monospace.store.set_option(self.option_name, value)
 
         # Used by coroutines
         res = model.res
@@ -371,7 +370,7 @@ class OptionToggler:
         OPTIONS_SETTERS[self.option_name](value)
 
         # Feedback sound
-        Mix_PlayChannel(-1, res['chunks']['toggle'].get(), 0)
+        dsdl.play_chunk(res['chunks']['toggle'].get())
 
         def coroutine_toggle_on():
             """Create the rectangle."""
@@ -419,15 +418,10 @@ class OptionSequencer:
         self.max = max_
 
     def __call__(self, en, world, model):
-        db = model.res['db']['current'].get()
-        c = db.cursor()
-        c.execute(OPTION_GET_QUERY, (self.option_name,))
-
-        value = (next(c)[0] + 1)
+        value = monospace.store.get_option(self.option_name) + 1
         if value > self.max:
             value = self.min
-        c.execute(OPTION_UPDATE_QUERY, (value, self.option_name))
-        db.commit()
+        monospace.store.set_option(self.option_name, value)
 
         # Actually apply option
         OPTIONS_SETTERS[self.option_name](value)
@@ -439,13 +433,13 @@ class OptionSequencer:
         )
 
         # Feedback sound
-        Mix_PlayChannel(-1, model.res['chunks']['toggle'].get(), 0)
+        dsdl.play_chunk(model.res['chunks']['toggle'].get())
 
 
-def apply_options(db):
-    """Apply all options from the db. Useful at startup."""
-    c = db.cursor()
-    for name, value in c.execute(OPTIONS_GET_ALL_QUERY):
+def apply_options(store):
+    """Apply all options from the given :class:`Store`. Useful at
+    startup."""
+    for name, value in store.options.items():
         setter = OPTIONS_SETTERS.get(name)
         if setter is not None:
             setter(value)
@@ -1,5 +1,22 @@
-"""Module used for database migration."""
+"""Module used for database migration.
+
+The current db is migrated to :py:data:`MAIN_DB_VERSION` by applying the
+steps in :py:data:`VERSION_UPGRADES`(see :py:func:`upgrade_db`). Steps
+must not commit: all the pending steps are applied in a single
+transaction, so that an interrupted migration is simply applied again
+on the next launch.
+
+Run :py:func:`check_migrations` (``check_migrations.py``) after adding
+a step.
+"""
+import datetime
+import hashlib
+import itertools
+import os
 import shutil
+import sqlite3
+import tempfile
+import time
 import os.path as pt
 import monospace
 
@@ -11,37 +28,162 @@ except ImportError:
 
 CURRENT_DB_NAME = 'current.db'
 CURRENT_DB_RES = 'current'
+BACKUP_SUFFIX = '.bak'
+FRESH_SUFFIX = '.new'     # Fresh copy, migrated before replacing the db
+DB_FILE_SUFFIXES = ('', '-wal', '-shm')     # A db along with its journal
 main_db_path = None
 
 APP_DB_PATH = app_storage_path() if monospace.on_android else None
 
-MAIN_DB_VERSION = 4      # PRAGMA user_version
+MAIN_DB_VERSION = 8      # PRAGMA user_version
+SCHEMA_CHECKSUM = 'fe117e9a01557a5bed08c03938416c7b6d2e43fd'
+"""Checksum of the schema at :py:data:`MAIN_DB_VERSION` (see
+:py:func:`schema_checksum`)."""
 
 GET_VER_QUERY = 'PRAGMA user_version'
 SET_VER_QUERY = 'PRAGMA user_version=?'
+SCHEMA_QUERY = ("SELECT `type`, `name`, `tbl_name` FROM `sqlite_master` "
+                "WHERE `name` NOT LIKE 'sqlite_%' ORDER BY `type`, `name`")
 
+INITIAL_SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS "scores" ('
+    '"type" TEXT NOT NULL, "value" INTEGER NOT NULL DEFAULT 0, '
+    'PRIMARY KEY("type"))',
+    'CREATE TABLE IF NOT EXISTS "options" ('
+    '"option_name" TEXT NOT NULL, "value" INTEGER NOT NULL DEFAULT 1, '
+    'PRIMARY KEY("option_name"))',
+    "INSERT INTO `scores`(`type`, `value`) VALUES('total', 0), ('high', 0)",
+    "INSERT INTO `options`(`option_name`, `value`) "
+    "VALUES('music', 1), ('sfx', 1)"
+)
+"""Statements creating a db at version 0(the first released one)."""
 
-def upgrade_db(cur_db):
-    """Apply all the upgrades to the current db to match the main."""
-    cursor = cur_db.cursor()
-    cursor.execute(GET_VER_QUERY)
-    cur_version = next(cursor)[0]
 
-    for ver in range(cur_version, MAIN_DB_VERSION):
-        upgrade_fun = VERSION_UPGRADES.get(ver + 1)
+class MigrationError(Exception):
+    """Raised when a db can't be migrated."""
 
-        # If no upgrade function is found, simply dump a new db from main
-        if upgrade_fun is None:
-            print('Migration error, falling back')
-            dump_main_db(True)
+
+def get_db_version(db):
+    """Get the version of a db(PRAGMA user_version)."""
+    return db.execute(GET_VER_QUERY).fetchone()[0]
+
+
+def schema_checksum(db):
+    """Get a checksum of the schema of a db.
+
+    Tables(with their columns and constraints) and indices are
+    accounted, regardless of how their statements are formatted.
+
+    :return: The hex digest of the checksum.
+    """
+    digest = hashlib.sha1()
+    for type_, name, table in db.execute(SCHEMA_QUERY).fetchall():
+        digest.update(repr((type_, name, table)).encode())
+        if type_ == 'table':
+            info = db.execute('PRAGMA table_info(`{}`)'.format(name))
+        elif type_ == 'index':
+            info = db.execute('PRAGMA index_info(`{}`)'.format(name))
         else:
-            print('Migrating to ver', ver + 1)
-            upgrade_fun(cur_db)
-            # Update version
-            cursor = cur_db.cursor()
-            # Can't use ? parameter with pragma..?
-            cursor.execute(SET_VER_QUERY.replace('?', str(ver + 1)))
-            cur_db.commit()
+            continue
+        digest.update(repr(info.fetchall()).encode())
+
+    return digest.hexdigest()
+
+
+def upgrade_db(cur_db, upgrades=None, checksum=SCHEMA_CHECKSUM):
+    """Apply all the upgrades to the current db to match the main.
+
+    Pending steps are applied in a single transaction. Once applied,
+    the schema is verified against the given checksum(see
+    :py:func:`schema_checksum`). On any error the transaction is rolled
+    back, leaving the db untouched.
+
+    :param cur_db: A connection to the db, without pending changes.
+    :param upgrades: A dictionary in the form ``{version: step}`` (by
+                     default :py:data:`VERSION_UPGRADES`).
+    :param checksum: The expected schema checksum once migrated, or
+                     None to skip the verification.
+    :return: The list of applied versions.
+    :raises MigrationError: If a step is missing or fails, or if the
+                            schema doesn't match.
+    """
+    upgrades = VERSION_UPGRADES if upgrades is None else upgrades
+    target = max(upgrades, default=0)
+
+    cur_version = get_db_version(cur_db)
+    versions = list(range(cur_version + 1, target + 1))
+    if not versions:
+        return versions
+
+    missing = [ver for ver in versions if ver not in upgrades]
+    if missing:
+        raise MigrationError('No upgrade to version {}'.format(missing[0]))
+
+    cur_db.execute('BEGIN')
+    try:
+        for ver in versions:
+            print('Migrating to ver', ver)
+            try:
+                upgrades[ver](cur_db)
+            except sqlite3.Error as error:
+                raise MigrationError('Upgrade to version {} failed: {}'
+                                     .format(ver, error)) from error
+
+        # Can't use ? parameter with pragma..?
+        cur_db.execute(SET_VER_QUERY.replace('?', str(target)))
+
+        if checksum is not None and schema_checksum(cur_db) != checksum:
+            raise MigrationError('Schema checksum mismatch at version {}'
+                                 .format(target))
+    except BaseException:
+        cur_db.rollback()
+        raise
+
+    cur_db.commit()
+    return versions
+
+
+def migrate_db(db_filename):
+    """Migrate the current db, on a connection of its own.
+
+    If the db can't be migrated(see :py:func:`upgrade_db`), a fresh
+    copy of the main db is migrated in its place, then the db is backed
+    up(see :py:func:`backup_db`) and replaced by the copy. If the copy
+    can't be migrated either(i.e. the main db is broken), the db is
+    left untouched. Thread safe, as long as the db isn't used by anyone
+    else in the meantime.
+
+    :return: The list of applied versions.
+    :raises MigrationError: If neither the db nor a fresh copy of the
+                            main one can be migrated.
+    """
+    db = monospace.connect_db(db_filename)
+    try:
+        return upgrade_db(db)
+    except MigrationError as error:
+        print('Migration error, falling back:', error)
+        db_error = error
+    finally:
+        db.close()
+
+    fresh_filename = db_filename + FRESH_SUFFIX
+    remove_db(fresh_filename)       # Left by an interrupted fallback
+    shutil.copy2(main_db_path, fresh_filename)
+
+    db = monospace.connect_db(fresh_filename)
+    try:
+        versions = upgrade_db(db)
+    except MigrationError as error:
+        db.close()
+        remove_db(fresh_filename)
+        raise MigrationError('The main db can\'t be migrated either({}), '
+                             'current db left untouched'
+                             .format(error)) from db_error
+    db.close()
+
+    backup_db(db_filename)
+    os.replace(fresh_filename, db_filename)
+    return versions
 
 
 def dump_main_db(overwrite=False):
@@ -54,7 +196,8 @@ def dump_main_db(overwrite=False):
 
     if not pt.isfile(new_db_filename) or overwrite:
         if overwrite:
-            print('Overwriting current db')
+            print('Overwriting current db, backup in',
+                  backup_db(new_db_filename))
         else:
             print('Current db not found, instantiating')
         shutil.copy2(main_db_path, new_db_filename)
@@ -62,12 +205,57 @@ def dump_main_db(overwrite=False):
     return new_db_filename
 
 
+def backup_filename(db_filename):
+    """Get a free backup filename for a db(see
+    :py:data:`BACKUP_SUFFIX`).
+
+    Existing backups are never replaced: if the plain backup filename is
+    taken, a timestamp is added to it.
+    """
+    stamp = time.strftime('%Y%m%d-%H%M%S')
+    candidates = itertools.chain(
+        (db_filename + BACKUP_SUFFIX,
+         '{}.{}{}'.format(db_filename, stamp, BACKUP_SUFFIX)),
+        ('{}.{}-{}{}'.format(db_filename, stamp, count, BACKUP_SUFFIX)
+         for count in itertools.count(2)))
+
+    for backup in candidates:
+        if not any(pt.exists(backup + suffix)
+                   for suffix in DB_FILE_SUFFIXES):
+            return backup
+
+
+def backup_db(db_filename):
+    """Move a db(with its WAL journal, if any) to a new backup file(see
+    :py:func:`backup_filename`).
+
+    The db must not be in use.
+
+    :return: The backup filename.
+    """
+    backup = backup_filename(db_filename)
+    for suffix in DB_FILE_SUFFIXES:
+        if pt.isfile(db_filename + suffix):
+            os.replace(db_filename + suffix, backup + suffix)
+
+    return backup
+
+
+def remove_db(db_filename):
+    """Remove a db along with its WAL journal, if any.
+
+    The db must not be in use.
+    """
+    for suffix in DB_FILE_SUFFIXES:
+        if pt.isfile(db_filename + suffix):
+            os.remove(db_filename + suffix)
+
+
 def add_movement_ratio(db):
     """Apply a patch and add the 'movement_ratio' option."""
     cursor = db.cursor()
     cursor.execute("INSERT INTO `options`(`option_name`, `value`) "
                    + "VALUES('movement_ratio', 0)")
-    db.commit()
 
 
 def add_ships_and_events(db):
@@ -119,8 +307,6 @@ def add_ships_and_events(db):
         "INSERT INTO `event_ships`(`ship_name`, `event_id`) "
         "VALUES('halloween_ship', 1)")
 
-    db.commit()
-
 
 def add_username(db):
     """Add 'username' column to the options table.
@@ -134,8 +320,6 @@ def add_username(db):
     cursor.execute("INSERT INTO `options`(`option_name`, `value`) "
                    "VALUES('username_added', 0)")
 
-    db.commit()
-
 
 def add_christmas(db):
     """Add christmas event and ship."""
@@ -156,9 +340,177 @@ def add_christmas(db):
         "VALUES('christmas_ship', 2)")
 
 
+def add_score_outbox(db):
+    """Add the outbox of pending score submissions(see
+    :class:`monospace.ScoreOutbox`).
+    """
+    cursor = db.cursor()
+
+    cursor.execute(
+        "CREATE TABLE `score_outbox`(`id` INTEGER PRIMARY KEY AUTOINCREMENT,"
+        "`username` TEXT NOT NULL, `score` INTEGER NOT NULL)")
+
+
+def add_leaderboard_cache(db):
+    """Add the cache of leaderboard responses(see
+    :py:func:`monospace.leaderboard_action`).
+    """
+    cursor = db.cursor()
+
+    cursor.execute(
+        "CREATE TABLE `leaderboard_cache`(`key` TEXT PRIMARY KEY,"
+        "`response` TEXT NOT NULL, `time` REAL NOT NULL)")
+
+
+def add_event_days(db):
+    """Store the event ranges as days of the year(counted on a leap
+    year, like :py:func:`monospace.day_of_year`), indexed.
+
+    Events spanning the end of the year must be split in two rows.
+    """
+    def day_of_year(month, day):
+        # Computed here, the step must not change with the game code
+        return datetime.date(2000, month, day).timetuple().tm_yday
+
+    cursor = db.cursor()
+
+    cursor.execute("ALTER TABLE `events` ADD COLUMN `from_yday` INTEGER")
+    cursor.execute("ALTER TABLE `events` ADD COLUMN `to_yday` INTEGER")
+
+    events = cursor.execute(
+        "SELECT `id`, `from_month`, `from_day`, `to_month`, `to_day` "
+        "FROM `events`").fetchall()
+    cursor.executemany(
+        "UPDATE `events` SET `from_yday`=?, `to_yday`=? WHERE `id`=?",
+        ((day_of_year(from_month, from_day),
+          day_of_year(to_month, to_day), id_)
+         for id_, from_month, from_day, to_month, to_day in events))
+
+    cursor.execute(
+        "CREATE INDEX `events_yday` ON `events`(`from_yday`, `to_yday`)")
+
+
+def add_run_log(db):
+    """Add the log of the played runs(see :py:mod:`monospace.runlog`)."""
+    cursor = db.cursor()
+
+    cursor.execute(
+        "CREATE TABLE `runs`(`id` INTEGER PRIMARY KEY AUTOINCREMENT,"
+        "`time` REAL NOT NULL, `seed` INTEGER, `score` INTEGER NOT NULL,"
+        "`wave` INTEGER NOT NULL, `ticks` INTEGER NOT NULL,"
+        "`duration` REAL NOT NULL, `entity_peak` INTEGER NOT NULL,"
+        "`kills` TEXT NOT NULL, `frame_times` TEXT NOT NULL)")
+
+
 VERSION_UPGRADES = {
     1: add_movement_ratio,
     2: add_ships_and_events,
     3: add_username,
-    4: add_christmas
+    4: add_christmas,
+    5: add_score_outbox,
+    6: add_leaderboard_cache,
+    7: add_event_days,
+    8: add_run_log
 }
+
+
+def create_db(filename, version):
+    """Create a synthetic db at the given version.
+
+    The db is created at version 0(see :py:data:`INITIAL_SCHEMA`) and
+    upgraded one step at a time, committing after each one(like older
+    releases did). Some player data is added before upgrading.
+    """
+    db = sqlite3.connect(filename)
+    try:
+        for statement in INITIAL_SCHEMA:
+            db.execute(statement)
+        db.execute("UPDATE `scores` SET `value`=123 WHERE `type`='high'")
+        db.commit()
+
+        for ver in range(1, version + 1):
+            VERSION_UPGRADES[ver](db)
+            db.execute(SET_VER_QUERY.replace('?', str(ver)))
+            db.commit()
+    finally:
+        db.close()
+
+
+def check_migrations(main_db=None):
+    """Migrate synthetic dbs from every historical version, and
+    verify them.
+
+    Each db must reach :py:data:`MAIN_DB_VERSION` with the expected
+    schema(see :py:data:`SCHEMA_CHECKSUM`) and with its player data.
+    A failing step must leave the db untouched.
+
+    :param main_db: Path of the main db, migrated too if given.
+    :return: The list of errors, empty if all the checks passed.
+    """
+    errors = []
+
+    def check(db, name):
+        if get_db_version(db) != MAIN_DB_VERSION:
+            errors.append('{}: migrated to version {}'.format(
+                name, get_db_version(db)))
+        if schema_checksum(db) != SCHEMA_CHECKSUM:
+            errors.append('{}: schema checksum {}'.format(
+                name, schema_checksum(db)))
+
+    with tempfile.TemporaryDirectory() as dirname:
+        for version in range(MAIN_DB_VERSION + 1):
+            name = 'version {}'.format(version)
+            filename = pt.join(dirname, '{}.db'.format(version))
+            create_db(filename, version)
+
+            db = monospace.connect_db(filename)
+            try:
+                upgrade_db(db)
+                check(db, name)
+                if db.execute(monospace.HIGH_SCORE_GET_QUERY) \
+                        .fetchone()[0] != 123:
+                    errors.append('{}: high score lost'.format(name))
+            except (MigrationError, sqlite3.Error) as error:
+                errors.append('{}: {}'.format(name, error))
+            finally:
+                db.close()
+
+        # Interrupted migration
+        def fail(db):
+            raise MigrationError('Interrupted')
+
+        filename = pt.join(dirname, 'rollback.db')
+        create_db(filename, 0)
+        db = monospace.connect_db(filename)
+        try:
+            checksum = schema_checksum(db)
+            upgrades = dict(VERSION_UPGRADES)
+            upgrades[MAIN_DB_VERSION] = fail
+            try:
+                upgrade_db(db, upgrades)
+                errors.append('rollback: interruption not raised')
+            except MigrationError:
+                pass
+
+            if get_db_version(db) != 0 or schema_checksum(db) != checksum:
+                errors.append('rollback: db changed')
+
+            # Resume
+            upgrade_db(db)
+            check(db, 'rollback')
+        finally:
+            db.close()
+
+        if main_db is not None:
+            filename = pt.join(dirname, 'main.db')
+            shutil.copy2(main_db, filename)
+            db = monospace.connect_db(filename)
+            try:
+                upgrade_db(db)
+                check(db, 'main db')
+            except (MigrationError, sqlite3.Error) as error:
+                errors.append('main db: {}'.format(error))
+            finally:
+                db.close()
+
+    return errors
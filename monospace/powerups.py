@@ -2,7 +2,6 @@
 import copy
 import math
 import weakref
-import random
 import dsdl
 import desper
 import monospace
@@ -104,7 +103,7 @@ def powerup_help(ship: monospace.Ship):
         monospace.MiniShip(),
         dsdl.Position(offset=dsdl.Offset.CENTER, size_x=0.5, size_y=0.5),
         monospace.model.res['text']['ships'] \
-            [random.choice(monospace.ship_selection.owned_ships)] \
+            [monospace.rng.choice(monospace.ship_selection.owned_ships)] \
             .get())
 
 
@@ -1,3 +1,5 @@
+import contextlib
+import random
 import sqlite3
 import desper
 import dsdl
@@ -5,7 +7,58 @@ import monospace
 from sdl2 import *
 
 
-class MenuWorldHandle(desper.Handle):
+class LoadingWorldHandle(desper.WorldHandle):
+    """Handle for the loading world.
+
+    The given resources are preloaded(see
+    :py:meth:`desper.GameModel.preload`) while showing a progress bar,
+    then the model switches to the next world.
+
+    :param res: The resource dictionary.
+    :param items: The resources to preload(paths, subtrees or handles).
+    :param next_world_handle: The world to switch to once done.
+    :param on_loaded: Optional callable, called with the model once
+                      done, before switching.
+    """
+    BAR_WIDTH = 600
+    BAR_HEIGHT = 20
+
+    def __init__(self, res, items, next_world_handle, on_loaded=None):
+        super().__init__()
+        self.res = res
+        self.items = items
+        self.next_world_handle = next_world_handle
+        self.on_loaded = on_loaded
+
+    def _load(self):
+        w = desper.AbstractWorld()
+        preloader = monospace.model.preload(*self.items)
+
+        # Add processors
+        w.add_processor(dsdl.EventHandlerProcessor(), 10)
+        w.add_processor(dsdl.FillRectangleRenderProcessor(), -0.5)
+        w.add_processor(dsdl.ScreenClearerProcessor(), -2)
+        w.add_processor(dsdl.PreloadProcessor(preloader, self.on_done))
+        w.add_processor(monospace.LoadingBarProcessor(preloader,
+                                                      self.BAR_WIDTH))
+
+        # Progress bar
+        w.create_entity(dsdl.FillRectangle(
+            (monospace.LOGICAL_WIDTH - self.BAR_WIDTH) / 2,
+            (monospace.LOGICAL_HEIGHT - self.BAR_HEIGHT) / 2, 0,
+            self.BAR_HEIGHT, SDL_Color()))
+
+        return w
+
+    def on_done(self, model):
+        """Switch to the next world, dropping the loading one."""
+        if self.on_loaded is not None:
+            self.on_loaded(model)
+
+        model.switch(self.next_world_handle, reset=True, stack=True)
+
+
+class MenuWorldHandle(desper.WorldHandle):
     """Handle class that creates the main menu world."""
 
     def __init__(self, res):
@@ -109,7 +162,7 @@ class MenuWorldHandle(desper.Handle):
 
         # Apply options
         w.create_entity(monospace.HaltMusic())
-        monospace.apply_options(self.res['db']['current'].get())
+        monospace.apply_options(monospace.store)
 
         # My name
         name = self.res['str'][monospace.current_lang].get_texture('ballman')
@@ -120,18 +173,45 @@ class MenuWorldHandle(desper.Handle):
         return w
 
 
-class GameWorldHandle(desper.Handle):
-    """Handle class that creates the main game world."""
+class GameWorldHandle(desper.WorldHandle):
+    """Handle class that creates the main game world.
 
-    def __init__(self, res):
+    Each time the world is created, :py:attr:`monospace.rng` is seeded
+    with `seed`(or with a random seed if it's None). The seed in use
+    can be read from :py:attr:`current_seed`.
+
+    If `record_filename` is given, the input is recorded in the
+    given file(see :class:`dsdl.InputRecorder`) along with the seed, so
+    that the run can be replayed.
+
+    The world is rebuilt when resources are reloaded(see
+    ``desper.ResourceWatcher``).
+    """
+    rebuild_on_reload = True
+
+    def __init__(self, res, seed=None, record_filename=None):
         super().__init__()
         self.res = res
+        self.seed = seed
+        self.record_filename = record_filename
+        self.current_seed = None
+        self._recorder = None
 
     def _load(self):
+        self.current_seed = self.seed
+        if self.current_seed is None:
+            self.current_seed = random.getrandbits(63)
+        monospace.rng.seed(self.current_seed)
+
         w = desper.AbstractWorld()
 
         # Add processors
         w.add_processor(dsdl.EventHandlerProcessor(), 10)
+        if self.record_filename is not None:
+            self._recorder = dsdl.InputRecorder(
+                self.record_filename, self.current_seed,
+                touch=monospace.on_android)
+            w.add_processor(dsdl.InputRecordProcessor(self._recorder), 9)
         w.add_processor(dsdl.TextureRendererProcessor(), -1)
         w.add_processor(dsdl.ScreenClearerProcessor(), -2)
         w.add_processor(monospace.GameProcessor())
@@ -144,6 +224,7 @@ class GameWorldHandle(desper.Handle):
         w.add_processor(dsdl.ParticleProcessor())
         w.add_processor(desper.CoroutineProcessor())
         w.add_processor(monospace.ButtonProcessor())
+        w.add_processor(monospace.RunLogProcessor(self.current_seed))
 
         #w.add_processor(dsdl.FPSLoggerProcessor())
         #w.add_processor(dsdl.BoundingBoxRendererProcessor(), -1.5)
@@ -192,8 +273,22 @@ class GameWorldHandle(desper.Handle):
 
         return w
 
+    def clear(self):
+        """Clear the world, terminating the recording(if any) and
+        cancelling the pending wave preloads."""
+        if self._recorder is not None:
+            self._recorder.close()
+            self._recorder = None
 
-class PauseWorldHandle(desper.Handle):
+        if self._value is not None:
+            game = self._value.get_processor(monospace.GameProcessor)
+            if game is not None:
+                game.cancel_preload()
+
+        super().clear()
+
+
+class PauseWorldHandle(desper.WorldHandle):
     """Handle for the pause menu world."""
 
     def __init__(self, res):
@@ -242,7 +337,7 @@ class PauseWorldHandle(desper.Handle):
         return w
 
 
-class OptionsWorldHandle(desper.Handle):
+class OptionsWorldHandle(desper.WorldHandle):
     """Handle for the options world."""
 
     def __init__(self, res):
@@ -347,7 +442,7 @@ class OptionsWorldHandle(desper.Handle):
         return w
 
 
-class DeathWorldHandle(desper.Handle):
+class DeathWorldHandle(desper.WorldHandle):
     """Handle for the death screen."""
 
     def __init__(self, res):
@@ -443,7 +538,7 @@ class DeathWorldHandle(desper.Handle):
         return w
 
 
-class UnlockedWorldHandle(desper.Handle):
+class UnlockedWorldHandle(desper.WorldHandle):
     """Handle that generates a world with a message for unlockables."""
 
     def __init__(self, res, unlocked_item, event=None):
@@ -505,7 +600,7 @@ class UnlockedWorldHandle(desper.Handle):
         return w
 
 
-class NameSelectionWorldHandle(desper.Handle):
+class NameSelectionWorldHandle(desper.WorldHandle):
     """Handle that generates a world for the name selection."""
 
     def __init__(self, res):
@@ -567,7 +662,7 @@ class NameSelectionWorldHandle(desper.Handle):
         return w
 
 
-class LeaderboardWorldHandle(desper.Handle):
+class LeaderboardWorldHandle(desper.WorldHandle):
     """Handle that generates a world for the name selection."""
 
     def __init__(self, res):
@@ -609,15 +704,158 @@ class LeaderboardWorldHandle(desper.Handle):
         return w
 
 
+RESOURCE_BUDGETS = {'texture': 16 * 2 ** 20, 'chunk': 8 * 2 ** 20,
+                    'world': 3000}
+"""Memory budgets for the resource manager(see
+:class:`desper.ResourceManager`). Textures and chunks in bytes, worlds
+in entities."""
+
+ANDROID_RESOURCE_BUDGETS = {'texture': 4 * 2 ** 20, 'chunk': 2 * 2 ** 20,
+                            'world': 1500}
+"""Memory budgets for low-RAM(android) devices."""
+
+SOUND_GROUPS = {'game': 14, 'ui': 2}
+"""Groups of mixer channels(see :class:`dsdl.SoundManager`), so that
+game sounds can't prevent menu feedback from being played."""
+
+SOUND_SETTINGS = {
+    'chunks/button': ('ui', 1, 0),
+    'chunks/toggle': ('ui', 1, 0),
+    'chunks/shot': ('game', 3, 0),
+    'chunks/enemies/shot': ('game', 3, 0),
+    'chunks/enemies/death1': ('game', 2, 1),
+    'chunks/enemies/death2': ('game', 2, 1),
+    'chunks/enemies/death3': ('game', 2, 1),
+    'chunks/powerup': ('game', 1, 2),
+    'chunks/death1': ('game', 2, 3),
+    'chunks/death2': ('game', 2, 3),
+    'chunks/death3': ('game', 1, 3)
+}
+"""Mixing settings of the sounds, in the form
+``{path: (group, voices, priority)}`` (see
+:py:meth:`dsdl.SoundManager.configure`)."""
+
+
+def init_sound_manager(res):
+    """Install a :class:`dsdl.SoundManager` configured for the game.
+
+    :param res: The resource dictionary of the model.
+    :return: The installed manager.
+    """
+    manager = dsdl.SoundManager(SOUND_GROUPS).install()
+    for path, (group, voices, priority) in SOUND_SETTINGS.items():
+        manager.configure(desper.get_resource(res, path), group, voices,
+                          priority)
+
+    return manager
+
+
+MANIFEST_NAME = 'res_manifest.json'
+"""Name of the resource manifest file(see :py:mod:`desper.core.manifest`),
+placed next to the resource directory."""
+
+ATLAS_DIR_NAME = 'res_atlas'
+"""Name of the directory of the text atlases(see
+``dsdl.FontCacheHandle.atlas_dir``), placed next to the resource
+directory."""
+
+
+def build_importer_dict():
+    """Build the importer dictionary for the game resources."""
+    return desper.importer_dict_builder \
+        .add_rule(dsdl.get_texture_importer(), dsdl.TextureHandle) \
+        .add_rule(dsdl.get_font_importer(), dsdl.FontHandle) \
+        .add_rule(dsdl.get_fontcache_importer(), dsdl.FontCacheHandle) \
+        .add_rule(monospace.get_db_importer(), monospace.DBHandle) \
+        .add_rule(dsdl.get_chunk_importer(), dsdl.ChunkHandle) \
+        .add_rule(dsdl.get_mus_importer(), dsdl.MusicHandle) \
+        .add_rule(monospace.get_score_importer(), monospace.ScoresHandle) \
+        .add_rule(monospace.get_wave_importer(), monospace.WaveHandle) \
+        .build()
+
+
+DB_CACHED_STATEMENTS = 64   # All the game queries fit
+DB_PRAGMAS = ('PRAGMA journal_mode=WAL', 'PRAGMA synchronous=NORMAL')
+
+
+def connect_db(filename):
+    """Open a connection to a game db, tuned for small frequent writes.
+
+    The db is switched to WAL journaling, so that readers and the
+    background writers(see :class:`Store` and :class:`ScoreOutbox`)
+    don't block each other, and commits don't wait for storage
+    (``synchronous=NORMAL``). A crash may lose the last commits, but
+    can't corrupt the db.
+    """
+    db = sqlite3.connect(filename, cached_statements=DB_CACHED_STATEMENTS)
+    for pragma in DB_PRAGMAS:
+        db.execute(pragma)
+
+    return db
+
+
+class MigrationHandle(desper.Handle):
+    """Handle migrating a db(see :py:func:`migrate_db`).
+
+    When preloaded(see :py:meth:`desper.GameModel.preload`), the
+    migration runs in background. The resource is the list of applied
+    versions.
+    """
+
+    def __init__(self, filename):
+        super().__init__()
+        self.filename = filename
+
+    def watched_files(self):
+        return ()
+
+    def _load(self):
+        return monospace.migrate_db(self.filename)
+
+    def _prepare(self):
+        return self._load()
+
+    def _load_prepared(self, prepared):
+        return prepared
+
+
 def get_db_importer():
-    return desper.get_resource_importer('db', ('.db'))
+    return desper.get_resource_importer('db', ('.db',))
 
 
 class DBHandle(desper.Handle):
+    """Handle for a sqlite db connection(see :py:func:`connect_db`)."""
 
     def __init__(self, filename):
         super().__init__()
         self.filename = filename
+        self._transactions = 0      # Depth of nested transactions
+
+    def watched_files(self):
+        """Databases are written by the game itself, never reload."""
+        return ()
 
     def _load(self):
-        return sqlite3.connect(self.filename)
+        return connect_db(self.filename)
+
+    @contextlib.contextmanager
+    def transaction(self):
+        """Context manager committing the statements of a block at once.
+
+        The connection is given as target of the ``with`` statement.
+        Changes are committed on exit, or rolled back if an exception
+        is raised. Nested blocks are part of the outer transaction.
+        """
+        db = self.get()
+        outer = self._transactions == 0
+        self._transactions += 1
+        try:
+            yield db
+            if outer:
+                db.commit()
+        except BaseException:
+            if outer:
+                db.rollback()
+            raise
+        finally:
+            self._transactions -= 1
@@ -0,0 +1,187 @@
+"""Local log of the played runs, for gameplay and performance metrics.
+
+Aggregates of the current run are kept in memory by a
+:class:`RunLogProcessor` and written at once when the run ends(see
+:py:func:`save_run`). Only the last :py:data:`RUN_LOG_RETENTION` runs
+are kept.
+"""
+import bisect
+import json
+import math
+import time
+import esper
+import monospace
+
+RUN_LOG_RETENTION = 200     # Number of runs kept in the db
+
+FRAME_TIME_BUCKETS = (.004, .008, .012, .017, .020, .025, .034, .050,
+                      .100, .250, math.inf)
+"""Upper bounds(in seconds) of the buckets of the frame time histogram."""
+
+FRAME_TIME_GAP = .5
+"""Frame times above this(in seconds) are considered pauses(e.g. the
+game world was left for the pause menu), and aren't recorded."""
+
+RUN_METRICS = ('score', 'wave', 'ticks', 'duration', 'entity_peak')
+"""Columns of the `runs` table usable with
+:py:func:`run_percentiles`."""
+
+RUN_ADD_QUERY = ('INSERT INTO `runs`(`time`, `seed`, `score`, `wave`, '
+                 '`ticks`, `duration`, `entity_peak`, `kills`, '
+                 '`frame_times`) VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?)')
+RUN_RETENTION_QUERY = ('DELETE FROM `runs` '
+                       'WHERE `id`<=(SELECT MAX(`id`) FROM `runs`)-?')
+RUN_METRIC_QUERY = 'SELECT `{0}` FROM `runs` ORDER BY `{0}`'
+RUN_FRAME_TIMES_QUERY = 'SELECT `frame_times` FROM `runs`'
+
+temp_run = None     # Last finished run, saved by DeathScoreManager
+
+
+class RunLog:
+    """Aggregates of a single run.
+
+    :param seed: The seed of the game world(see
+                 :class:`GameWorldHandle`).
+    """
+
+    def __init__(self, seed=None):
+        self.seed = seed
+        self.score = 0
+        self.wave = 1
+        self.ticks = 0
+        self.duration = 0.
+        self.entity_peak = 0
+        self.kills = {}         # {enemy type: count}
+        self.frame_times = [0] * len(FRAME_TIME_BUCKETS)
+
+    def add_kill(self, enemy_type):
+        """Count a killed enemy, given the name of its type."""
+        self.kills[enemy_type] = self.kills.get(enemy_type, 0) + 1
+
+    def add_frame(self, frame_time, entities):
+        """Account a frame.
+
+        :param frame_time: The duration of the frame, in seconds.
+        :param entities: The number of entities in the world.
+        """
+        self.ticks += 1
+        self.entity_peak = max(self.entity_peak, entities)
+
+        if frame_time <= FRAME_TIME_GAP:
+            self.duration += frame_time
+            self.frame_times[
+                bisect.bisect_left(FRAME_TIME_BUCKETS, frame_time)] += 1
+
+
+class RunLogProcessor(esper.Processor):
+    """ECS system collecting the aggregates of the current run(see
+    :class:`RunLog`).
+
+    Kills are reported by the enemies(see :class:`Enemy`), the run is
+    finished by the ship on death(see :py:meth:`finish`).
+    """
+
+    def __init__(self, seed=None):
+        super().__init__()
+        self.run = RunLog(seed)
+        self._last_frame = None
+
+    def process(self, model):
+        now = time.perf_counter()
+        last_frame, self._last_frame = self._last_frame, now
+
+        game = self.world.get_processor(monospace.GameProcessor)
+        if game is not None:
+            self.run.wave = max(self.run.wave, game.wave_number)
+
+        # The first frame has no duration to measure
+        if last_frame is not None:
+            self.run.add_frame(now - last_frame, self.world.entity_count)
+
+    def finish(self, score):
+        """Set the final score, and make the run available to
+        :class:`DeathScoreManager`(see :py:data:`temp_run`).
+        """
+        global temp_run
+
+        self.run.score = score
+        temp_run = self.run
+
+
+def save_run(db_handle, run, retention=RUN_LOG_RETENTION):
+    """Write a run in the db, removing the oldest ones.
+
+    :param db_handle: The :class:`DBHandle` of the db.
+    :param run: A :class:`RunLog` instance.
+    :param retention: The number of runs to keep.
+    """
+    with db_handle.transaction() as db:
+        db.execute(RUN_ADD_QUERY, (
+            time.time(), run.seed, run.score, run.wave, run.ticks,
+            run.duration, run.entity_peak, json.dumps(run.kills),
+            json.dumps(run.frame_times)))
+        db.execute(RUN_RETENTION_QUERY, (retention,))
+
+
+def percentile(sorted_values, percent):
+    """Get a percentile(nearest rank) of a sorted sequence.
+
+    :return: The value, or None if the sequence is empty.
+    """
+    if not sorted_values:
+        return None
+
+    rank = max(math.ceil(percent / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def run_percentiles(db, metric, percents=(50, 90, 99)):
+    """Compute percentiles of a metric across the logged runs.
+
+    :param db: A connection to the db.
+    :param metric: One of :py:data:`RUN_METRICS`.
+    :param percents: The percentiles to compute, from 0 to 100.
+    :return: A dictionary in the form ``{percent: value}``(values are
+             None if no run is logged).
+    :raises ValueError: If the metric doesn't exist.
+    """
+    if metric not in RUN_METRICS:
+        raise ValueError('Unknown run metric {}'.format(metric))
+
+    values = [row[0] for row in db.execute(RUN_METRIC_QUERY.format(metric))]
+    return {percent: percentile(values, percent) for percent in percents}
+
+
+def frame_time_percentiles(db, percents=(50, 90, 99)):
+    """Compute frame time percentiles across the logged runs.
+
+    Frame times are known by bucket(see :py:data:`FRAME_TIME_BUCKETS`),
+    percentiles are given as the upper bound of the bucket they fall
+    in.
+
+    :param db: A connection to the db.
+    :param percents: The percentiles to compute, from 0 to 100.
+    :return: A dictionary in the form ``{percent: seconds}``(values are
+             None if no frame is logged).
+    """
+    counts = [0] * len(FRAME_TIME_BUCKETS)
+    for row in db.execute(RUN_FRAME_TIMES_QUERY):
+        for index, count in enumerate(json.loads(row[0])):
+            counts[index] += count
+
+    total = sum(counts)
+    result = {}
+    for percent in percents:
+        if total == 0:
+            result[percent] = None
+            continue
+
+        rank = max(math.ceil(percent / 100 * total), 1)
+        cumulative = 0
+        for bound, count in zip(FRAME_TIME_BUCKETS, counts):
+            cumulative += count
+            if cumulative >= rank:
+                result[percent] = bound
+                break
+
+    return result
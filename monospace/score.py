@@ -6,39 +6,29 @@ from sdl2.sdlttf import *
 
 
 HIGH_SCORE_GET_QUERY = "SELECT `value` FROM `scores` WHERE `type`='high'"
-HIGH_SCORE_UPDATE_QUERY = "UPDATE `scores` SET `value`=? WHERE `type`='high'"
-TOT_SCORE_GET_QUERY = "SELECT `value` FROM `scores` WHERE `type`='total'"
-TOT_SCORE_ADD_QUERY = ("UPDATE `scores` SET `value`=`value`+? "
-                       + " WHERE `type`='total'")
 
 temp_score = None
 last_score = None
 
 
-def get_high_score(db):
-    """Get current high score."""
-    cur = db.cursor()
-    return next(cur.execute(HIGH_SCORE_GET_QUERY))[0]
+def get_high_score():
+    """Get current high score(see :class:`Store`)."""
+    return monospace.store.get_score('high')
 
 
-def set_high_score(db, score):
-    """Set current highscore."""
-    cur = db.cursor()
-    cur.execute(HIGH_SCORE_UPDATE_QUERY, (score,))
-    db.commit()
+def set_high_score(score):
+    """Set current highscore(written in background)."""
+    monospace.store.set_score('high', score)
 
 
-def get_total_score(db):
-    """Get current total score."""
-    cur = db.cursor()
-    return next(cur.execute(HIGH_SCORE_GET_QUERY))[0]
+def get_total_score():
+    """Get current total score(see :class:`Store`)."""
+    return monospace.store.get_score('total')
 
 
-def add_total_score(db, score):
-    """Add score to the current total."""
-    cur = db.cursor()
-    cur.execute(TOT_SCORE_ADD_QUERY, (score,))
-    db.commit()
+def add_total_score(score):
+    """Add score to the current total(written in background)."""
+    monospace.store.add_score('total', score)
 
 
 class DeathScoreManager(desper.OnAttachListener):
@@ -54,9 +44,8 @@ class DeathScoreManager(desper.OnAttachListener):
         print('dd last score', last_score)
 
         res = monospace.model.res
-        db = res['db']['current'].get()
 
-        highscore = get_high_score(db)
+        highscore = get_high_score()
         print('highscore', highscore)
         print('score', temp_score)
 
@@ -102,7 +91,7 @@ class DeathScoreManager(desper.OnAttachListener):
             SDL_FreeSurface(hs_surf)
         else:       # Beaten
             # Update highscore
-            set_high_score(db, int(temp_score))
+            set_high_score(int(temp_score))
 
             # NEW RECORD text
             world.create_entity(
@@ -113,5 +102,10 @@ class DeathScoreManager(desper.OnAttachListener):
             world.create_entity(dsdl.Position(30, 130), score_texture)
 
         # Update total score and reset temp
-        add_total_score(db, int(temp_score))
+        add_total_score(int(temp_score))
         temp_score = None
+
+        # Log the run
+        if monospace.runlog.temp_run is not None:
+            monospace.save_run(res['db']['current'], monospace.runlog.temp_run)
+            monospace.runlog.temp_run = None
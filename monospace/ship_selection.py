@@ -1,4 +1,5 @@
 from collections import deque
+import datetime
 import math
 import dsdl
 import monospace
@@ -6,25 +7,12 @@ import desper
 import esper
 
 OWNED_SHIPS_QUERY = 'SELECT `name` FROM `ships` WHERE `unlocked`=1'
-CURRENT_EVENTS_QUERY = \
-    ("SELECT `id`, `name` FROM `events` "
-     "WHERE date('now') BETWEEN date(strftime('%Y', date('now')) "
-     "|| '-' || substr('0' || `from_month`, -2, 2) || '-' "
-     "|| substr('0' || `from_day`, -2, 2)) "
-     "AND date(strftime('%Y', date('now')) || '-' "
-     "|| substr('0' || `to_month`, -2, 2) "
-     "|| '-' || substr('0' || `to_day`, -2, 2))")
 CUR_EVENT_SHIPS_QUERY = \
     ("SELECT `ships`.`name`, `unlocked`, `events`.`name` "
-     "FROM `ships` INNER JOIN `event_ships` "
-     "ON `ships`.`name`=`ship_name` INNER JOIN `events` "
-     "ON `events`.`id`=`event_id` "
-     "WHERE date('now') BETWEEN date(strftime('%Y', date('now')) "
-     "|| '-' || substr('0' || `from_month`, -2, 2) || '-' "
-     "|| substr('0' || `from_day`, -2, 2)) "
-     "AND date(strftime('%Y', date('now')) || '-' "
-     "|| substr('0' || `to_month`, -2, 2) "
-     "|| '-' || substr('0' || `to_day`, -2, 2))")
+     "FROM `events` INNER JOIN `event_ships` "
+     "ON `events`.`id`=`event_id` INNER JOIN `ships` "
+     "ON `ships`.`name`=`ship_name` "
+     "WHERE `from_yday`<=?1 AND `to_yday`>=?1")
 UNLOCK_SHIP_QUERY = "UPDATE `ships` SET `unlocked`=1 WHERE `name`=?"
 SELECTOR_Y_FACTOR = 1 / 10
 SELECTOR_X_FACTOR = 1 / 5
@@ -35,6 +23,42 @@ owned_ships = deque()
 
 _selection_animation_coroutine = None
 
+_locked_event_ships = None  # (date, [(ship, event), ...]), see EventChecker
+
+CALENDAR_YEAR = 2000        # Leap year, so that all the days have a place
+
+
+def day_of_year(month, day):
+    """Get the day of the year of a date, regardless of the year.
+
+    Days are counted on a leap year, so that the same date always
+    gets the same number(e.g. March 1st is always 61).
+    """
+    return datetime.date(CALENDAR_YEAR, month, day).timetuple().tm_yday
+
+
+def get_locked_event_ships(db):
+    """Get the locked ships of the events active today.
+
+    Events are queried once per calendar day(local time), then the
+    result is cached.
+
+    :return: The list of (ship name, event name) pairs, shared with the
+             cache(remove unlocked ships from it).
+    """
+    global _locked_event_ships
+
+    today = datetime.date.today()
+    if _locked_event_ships is None or _locked_event_ships[0] != today:
+        ships = [(name, event_name) for name, unlocked, event_name
+                 in db.cursor().execute(
+                     CUR_EVENT_SHIPS_QUERY,
+                     (day_of_year(today.month, today.day),))
+                 if not unlocked]
+        _locked_event_ships = today, ships
+
+    return _locked_event_ships[1]
+
 
 def get_selected_ship_texture():
     """Retrieve the SDL_Texture for the currently selected ship."""
@@ -56,8 +80,7 @@ class ShipSelector(desper.OnAttachListener):
         owned_ships.append('default')
 
         # Get selected ship
-        selected_ship = next(cursor.execute(
-            monospace.OPTION_GET_QUERY, ('selected_ship',)))[0]
+        selected_ship = monospace.store.get_option('selected_ship')
 
         # Rotate until the selected ship is found
         if selected_ship in owned_ships:
@@ -132,10 +155,7 @@ class SelectShipAction:
         # Rotate and select the new ship(+ update db)
         rotation_index = int(math.copysign(1, vel_x))
         owned_ships.rotate(rotation_index)
-        db = model.res['db']['current'].get()
-        db.cursor().execute(monospace.OPTION_UPDATE_QUERY,
-                            (owned_ships[0], 'selected_ship'))
-        db.commit()
+        monospace.store.set_option('selected_ship', owned_ships[0])
 
         # Create the new ship
         if rotation_index > 0:
@@ -196,17 +216,20 @@ class EventChecker(desper.AbstractComponent):
     def update(self, en, world, model):
         # Check for active events and unlock ships if necessary
         res = model.res
-        db = model.res['db']['current'].get()
-        for name, unlocked, event_name \
-                in (db.cursor().execute(CUR_EVENT_SHIPS_QUERY)):
-            if not unlocked:
-                db.cursor().execute(UNLOCK_SHIP_QUERY, (name,))
-                db.commit()
-                print('unlocked event ship', name)
-
-                model.switch(
-                    monospace.UnlockedWorldHandle(res, name, event_name), True,
-                    stack=True)
+        locked_ships = get_locked_event_ships(res['db']['current'].get())
+        unlocked_ships = tuple(locked_ships)
+        if unlocked_ships:
+            with res['db']['current'].transaction() as db:
+                db.executemany(UNLOCK_SHIP_QUERY,
+                               ((name,) for name, _ in unlocked_ships))
+            locked_ships.clear()
+
+        for name, event_name in unlocked_ships:
+            print('unlocked event ship', name)
+
+            model.switch(
+                monospace.UnlockedWorldHandle(res, name, event_name), True,
+                stack=True)
 
         # Self destruct after the check
         world.delete_entity(en)
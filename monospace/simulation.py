@@ -0,0 +1,174 @@
+"""Headless game simulation(no window, no audio).
+
+Useful to run many games in a row for balancing and performance work.
+"""
+import gc
+import math
+import os.path as pt
+import time
+import esper
+import desper
+import dsdl
+import monospace
+from sdl2.sdlttf import TTF_Init
+
+RES_DIR = pt.join(pt.dirname(pt.dirname(pt.abspath(__file__))), 'res')
+
+DEFAULT_MAX_TICKS = 60 * 60 * 30     # Half an hour of gameplay
+
+
+class EndWorldHandle(desper.WorldHandle):
+    """Handle for an empty world, used to mark the end of a simulation.
+
+    During a simulation, switching to the death world ends the game.
+    """
+
+    def _load(self):
+        return desper.AbstractWorld()
+
+
+class ResumeProcessor(esper.Processor):
+    """Immediately go back to the previous world(see
+    :py:meth:`dsdl.SDLGameModel.pop_switch`).
+    """
+
+    def process(self, model):
+        model.pop_switch(True)
+
+
+class ResumeWorldHandle(desper.WorldHandle):
+    """Handle for a world that immediately resumes the previous one.
+
+    Used in place of the pause menu, so that pausing doesn't consume
+    input ticks(keeping recorded runs in sync when replayed).
+    """
+
+    def _load(self):
+        w = desper.AbstractWorld()
+        w.add_processor(ResumeProcessor())
+
+        return w
+
+
+class GCMonitor:
+    """Count the garbage collections(and their duration) while active.
+
+    Usable as a context manager. Collections are counted per
+    generation, in :py:attr:`collections`. The total time spent
+    collecting(in seconds) is in :py:attr:`pause_time`.
+    """
+
+    def __init__(self):
+        self.collections = [0] * len(gc.get_stats())
+        self.collected = 0
+        self.pause_time = 0.
+        self._start = None
+
+    def _callback(self, phase, info):
+        if phase == 'start':
+            self._start = time.perf_counter()
+        elif self._start is not None:
+            self.pause_time += time.perf_counter() - self._start
+            self.collections[info['generation']] += 1
+            self.collected += info['collected']
+            self._start = None
+
+    def __enter__(self):
+        gc.callbacks.append(self._callback)
+        return self
+
+    def __exit__(self, *exc_info):
+        gc.callbacks.remove(self._callback)
+
+
+def set_pools_enabled(enabled):
+    """Enable or disable the recycling of entities(see
+    :py:func:`monospace.get_pools`), e.g. to measure its impact."""
+    for pool in monospace.get_pools().values():
+        pool.capacity = desper.DEFAULT_POOL_CAPACITY if enabled else 0
+        pool.clear()
+
+
+def sweep_input(width, height, period=240):
+    """Get an infinite pointer script dragging the ship left and right.
+
+    Coordinates are in window space(see :class:`dsdl.ScriptedInput`).
+    """
+    x = width // 2
+    y = height * 9 // 10
+
+    # Release first, so that the drag starts
+    yield False, x, y
+
+    tick = 0
+    while True:
+        yield (True, int(x + width / 3 * math.sin(2 * math.pi * tick
+                                                  / period)), y)
+        tick += 1
+
+
+def init_headless_model(dirs=None, input_source=None, seed=None,
+                        record_filename=None):
+    """Build a headless model, ready to run the game world.
+
+    The built model is also set as the current :py:attr:`model`.
+
+    :param dirs: The resource directories(the game's one by default).
+    :param input_source: The input source driving the ship. By default,
+                         :py:func:`sweep_input` is used.
+    :param seed: The seed of the game world(see
+                 :class:`GameWorldHandle`). If None and `input_source`
+                 is a :class:`dsdl.InputReplayer`, the recorded seed is
+                 used.
+    :param record_filename: If given, the input is recorded on the
+                            given file.
+    """
+    if seed is None and isinstance(input_source, dsdl.InputReplayer):
+        seed = input_source.seed
+
+    desper.options['resource_extensions'] = False
+    TTF_Init()
+    monospace.init_screen_resolution()
+
+    window_size = monospace.DISPLAY_MODE.w, monospace.DISPLAY_MODE.h
+    if input_source is None:
+        input_source = dsdl.ScriptedInput(sweep_input(*window_size))
+
+    model = dsdl.HeadlessGameModel(
+        [RES_DIR] if dirs is None else dirs, monospace.build_importer_dict(),
+        window_size, input_source)
+    monospace.model = model
+
+    model.res['game_world'] = monospace.GameWorldHandle(
+        model.res, seed, record_filename)
+    model.res['pause_world'] = ResumeWorldHandle()
+    model.res['death_world'] = EndWorldHandle()
+
+    return model
+
+
+def simulate(model, max_ticks=DEFAULT_MAX_TICKS):
+    """Run a whole game on the given headless model.
+
+    The game ends when the ship dies(or when `max_ticks` are reached).
+    Ticks spent in the pause world aren't counted.
+
+    :return: A tuple (score, ticks).
+    """
+    game_handle = model.res['game_world']
+    game_handle.clear()         # Always start a brand new game
+
+    model.world_handle_stack.clear()
+    model.switch(game_handle, stack=True)
+    game = model.current_world.get_processor(monospace.GameProcessor)
+
+    ticks = 0
+    while (not isinstance(model.current_world_handle, EndWorldHandle)
+           and not model.quit and ticks < max_ticks):
+        if model.current_world_handle is game_handle:
+            ticks += 1
+        model.step()
+
+    game_handle.clear()         # Terminate recording, if any
+
+    return game.score, ticks
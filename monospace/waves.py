@@ -1,372 +1,463 @@
-import random
+"""Game waves, defined by the json files in ``res/waves``(see
+:class:`WaveHandle`).
+
+A wave definition is a json object with the following(optional) keys:
+
+- ``bg_color``: background color, as [r, g, b, a]
+- ``enemy_threshold_range``: range of frames between two spawns
+- ``enemies``: list of spawns, each one in the form ``{"spawn": name,
+  "args": [...], "count": n, "weight": w}``, where `name` is a spawn
+  function of the :py:mod:`monospace` package(e.g. ``spawn_roll``)
+- ``rewards``: list of powerup names(e.g. ``powerup_delay1``)
+- ``num_rewards``: number of rewards drawn from ``rewards``
+- ``dots``: dots formations(see :class:`DotsWave`), in the form
+  ``{"threshold_range": [min, max], "rows": n, "columns_range": [min,
+  max], "speed": s, "enemy": class name, "texture": name}``
+
+Arguments and counts can be random, in the form ``{"randint": [a,
+b]}``, ``{"choice": [...]}`` or ``{"choices": [[...], [weights]]}``
+(see :py:data:`RANDOM_VALUES`).
+"""
+import heapq
 import itertools
+import json
+import operator
+import desper
 import monospace
 import dsdl
 from sdl2 import SDL_Color
 
+RANDOM_VALUES = {
+    'randint': lambda rng, args: rng.randint(*args),
+    'choice': lambda rng, args: rng.choice(args),
+    'choices': lambda rng, args: rng.choices(*args)[0]
+}
+"""Random values for wave definitions, in the form ``{kind: draw}``."""
 
-class Wave:
-    """A class representing a game's wave metadata.
+TIMELINE_LOOKAHEAD = 60 * 5     # Ticks of spawn events scheduled ahead
 
-    It defines which enemies and with what probability can be spawned
-    during a specific wave(and which rewards can be assigned).
 
-    It also defines which rewards are spawned at the end of the wave
-    (a pool, and a quantity of extracted elements from that pool).
+def resolve_value(value):
+    """Get a value from a wave definition, drawing it if random(see
+    :py:data:`RANDOM_VALUES`)."""
+    if isinstance(value, dict):
+        (kind, args), = value.items()
+        return RANDOM_VALUES[kind](monospace.rng, args)
 
-    It's a base class and should be implemented to define the lists
-    containing the possible spawn function and probabilities.
-    """
-    bg_color = SDL_Color(0, 0, 0, 255)
+    return value
 
-    def __init__(self):
-        self.enemies = [None]
-        # Functions that accept a single paramenter of type World, and
-        # spawn a designed enemy when invoked.
-        self.enemy_chances = [1]
 
-        self.rewards = []
-        # Powerup functions to be incapsulated into PowerupBox.
-        self.reward_chances = []
-        self.num_rewards = 0
+def get_wave_attribute(name):
+    """Get a function or class of the :py:mod:`monospace` package,
+    given its name in a wave definition.
 
-        self.enemy_threshold_range = 200, 300
-        self._enemy_timer = 0
-        self._enemy_threshold = random.randint(*self.enemy_threshold_range)
+    :raises ValueError: If it doesn't exist.
+    """
+    try:
+        return getattr(monospace, name)
+    except AttributeError:
+        raise ValueError('Unknown name in wave: {}'.format(name)) from None
 
-    def spawn(self, world):
-        """Main method that spawns enemies from this wave.
 
-        If the extracted spawn function is None, spawn nothing.
-        """
-        self._enemy_timer += 1
-        if self._enemy_timer > self._enemy_threshold:
-            spawn_fun = random.choices(self.enemies, self.enemy_chances)[0]
-            if spawn_fun is not None:
-                spawn_fun(world)
+class Spawn:
+    """A spawn of a wave(an element of its spawn table).
 
-            # Reset timer
-            self._enemy_threshold = random.randint(*self.enemy_threshold_range)
-            self._enemy_timer = 0
+    :param function: The spawn function, accepting the world and the
+                     given arguments(e.g. :py:func:`spawn_roll`).
+    :param args: Arguments for the function, eventually random(see
+                 :py:func:`resolve_value`).
+    :param count: Number of calls per spawn, eventually random.
+    """
 
-    def spawn_rewards(self, world):
-        """Method that spawns rewards for the cleared wave(powerups)."""
-        if self.num_rewards > 0:
-            rewards = random.sample(self.rewards, self.num_rewards)
-            for i, reward in enumerate(rewards):
-                x = monospace.LOGICAL_WIDTH // (self.num_rewards + 1) * (i + 1)
-                y = monospace.LOGICAL_HEIGHT // 2
+    def __init__(self, function, args=(), count=1):
+        self.function = function
+        self.args = tuple(args)
+        self.count = count
+        self.resources = monospace.SPAWN_RESOURCES.get(function, ())
+        self._random = any(isinstance(value, dict)
+                           for value in (count,) + self.args)
 
-                world.create_entity(
-                    monospace.PowerupBox(reward),
-                    dsdl.Position(x, y, dsdl.Offset.CENTER),
-                    dsdl.BoundingBox(dsdl.Offset.CENTER, w=50, h=50),
-                    monospace.model.res['text']['powerups']['blank'].get())
+    def __call__(self, world):
+        if not self._random:
+            for _ in range(self.count):
+                self.function(world, *self.args)
+            return
 
+        for _ in range(resolve_value(self.count)):
+            self.function(world, *map(resolve_value, self.args))
 
-class DotsWave(Wave):
-    """A wave that adds the chance for spawning dots.
 
-    The chance for spawning dots is completely separated from the
-    standard spawning probabilities, so that the spawned enemies are
-    simply spawned additionally to the dots.
-    """
-
-    def __init__(self):
-        super().__init__()
+class SpawnTable:
+    """Weighted table of spawns, compiled for sampling.
 
-        self.dots_threshold_range = 100, 200   # In frames
-        self._dots_threshold = random.randint(*self.dots_threshold_range)
-        self.dots_rows = 1
-        self.dots_columns_range = 1, 3
-        self._dots_timer = 0
-        self.dots_speed = 5
+    Weights are accumulated once, so that sampling is a single random
+    draw and a binary search.
 
-    def spawn_dot(self, world, x, y=-50):
-        """Spawn a dot enemy at given position."""
-        world.create_entity(
-            dsdl.Position(x, y),
-            dsdl.BoundingBox(w=50, h=50), dsdl.Velocity(0, self.dots_speed),
-            monospace.model.res['text']['enemies']['dot'].get(),
-            dsdl.Animation(2, 60), monospace.DotEnemy())
+    :param spawns: A sequence of spawns(see :class:`Spawn`).
+    :param weights: The weight of each spawn.
+    """
 
-    def spawn_dots(self, world, columns, rows):
-        """Spawn dot enemies in their infamous formation.
+    def __init__(self, spawns, weights):
+        self.spawns = tuple(spawns)
+        self.cum_weights = tuple(itertools.accumulate(weights))
 
-        At random location horizontally.
-        """
-        base_x = (min(random.randrange(0, monospace.LOGICAL_WIDTH // 50),
-                      monospace.LOGICAL_WIDTH // 50 - columns) * 50)
+    def __len__(self):
+        return len(self.spawns)
 
-        y = -50
-        var_y = -50
-        var_x = 50
-        for i in range(rows):
-            x = base_x
-            for j in range(columns):
-                self.spawn_dot(world, x, y)
-                x += var_x
-            y -= var_y
+    def sample(self, rng):
+        """Draw a spawn with the given random generator.
 
-    def spawn(self, world):
-        super().spawn(world)
+        :return: The drawn spawn, None if the table is empty.
+        """
+        if len(self.spawns) <= 1:
+            return self.spawns[0] if self.spawns else None
 
-        # Spawn a dots every x frames
-        self._dots_timer += 1
-        if self._dots_timer > self._dots_threshold:
-            # By default, columns are random from 1 to 3
-            self.spawn_dots(world, random.randint(*self.dots_columns_range),
-                            self.dots_rows)
+        return rng.choices(self.spawns, cum_weights=self.cum_weights)[0]
 
-            self._dots_threshold = random.randint(*self.dots_threshold_range)
-            self._dots_timer = 0
 
+class WaveSpec:
+    """A compiled wave definition(see the module documentation).
 
-class FirstWave(DotsWave):
-    """Custom wave for the first one of the game."""
+    Shared by all the waves built from it(see :py:func:`load_wave`).
 
-    def __init__(self):
-        super().__init__()
+    :param definition: The wave definition, as a dictionary.
+    :raises ValueError: If a name in the definition doesn't exist.
+    """
 
-        self.rewards = [monospace.powerup_shield, monospace.powerup_drift]
-        self.num_rewards = 1
+    def __init__(self, definition):
+        self.bg_color = SDL_Color(*definition.get('bg_color',
+                                                  (0, 0, 0, 255)))
+        self.enemy_threshold_range = tuple(
+            definition.get('enemy_threshold_range', (200, 300)))
+
+        enemies = definition.get('enemies', ())
+        self.enemies = SpawnTable(
+            (Spawn(get_wave_attribute(enemy['spawn']),
+                   enemy.get('args', ()), enemy.get('count', 1))
+             for enemy in enemies),
+            (enemy.get('weight', 1) for enemy in enemies))
+
+        self.rewards = [get_wave_attribute(name)
+                        for name in definition.get('rewards', ())]
+        self.num_rewards = definition.get('num_rewards', 0)
+
+        dots = definition.get('dots')
+        self.has_dots = dots is not None
+        if self.has_dots:
+            self.dots_threshold_range = tuple(dots['threshold_range'])
+            self.dots_rows = dots.get('rows', 1)
+            self.dots_columns_range = tuple(dots.get('columns_range',
+                                                     (1, 3)))
+            self.dots_speed = dots.get('speed', 5)
+            self.dot_enemy = get_wave_attribute(dots.get('enemy',
+                                                         'DotEnemy'))
+            self.dot_texture = dots.get('texture', 'dot')
+
+
+class WaveTimeline:
+    """Spawn events of a wave, scheduled in advance.
+
+    Events are tuples (tick, function, args), meaning that
+    ``function(world, *args)`` must be called at the given tick. They
+    are pulled from the given sources(iterators of events sorted by
+    tick) for the next `lookahead` ticks, merged in a sorted list. A
+    cursor points to the next due event, so that advancing a tick
+    costs a comparison when nothing spawns.
+
+    :param sources: An iterable of event iterators(eventually
+                    endless). On ties, events of the first sources
+                    come first.
+    :param lookahead: Number of ticks scheduled in advance.
+    :param on_schedule: Optional callable, called with the list of
+                        newly scheduled events.
+    """
 
+    def __init__(self, sources, lookahead=TIMELINE_LOOKAHEAD,
+                 on_schedule=None):
+        self.tick = 0
+        self.lookahead = lookahead
+        self.on_schedule = on_schedule
+        self.events = []
+        self.cursor = 0
+
+        self._source = heapq.merge(*sources, key=operator.itemgetter(0))
+        self._next_event = next(self._source, None)
+        self._schedule()
+
+    def _schedule(self):
+        """Pull the events within the lookahead from the sources."""
+        # Drop fired events
+        del self.events[:self.cursor]
+        self.cursor = 0
+
+        start = len(self.events)
+        horizon = self.tick + self.lookahead
+        while (self._next_event is not None
+               and self._next_event[0] <= horizon):
+            self.events.append(self._next_event)
+            self._next_event = next(self._source, None)
+
+        if self.on_schedule is not None and len(self.events) > start:
+            self.on_schedule(self.events[start:])
+
+    def upcoming(self):
+        """Get the scheduled events that haven't been fired yet."""
+        return self.events[self.cursor:]
+
+    def advance(self, world):
+        """Advance by a tick, firing the due events.
+
+        :return: The number of fired events.
+        """
+        self.tick += 1
 
-class SecondWaveRoll(DotsWave):
-    """Custom wave for the second one of the game."""
-    bg_color = SDL_Color(0, 13, 45, 255)
+        fired = 0
+        events = self.events
+        while (self.cursor < len(events)
+               and events[self.cursor][0] <= self.tick):
+            _, function, args = events[self.cursor]
+            self.cursor += 1
+            function(world, *args)
+            fired += 1
 
-    def __init__(self):
-        super().__init__()
+        if (self._next_event is not None
+                and self._next_event[0] <= self.tick + self.lookahead):
+            self._schedule()
 
-        self.enemy_threshold_range = 100, 350
-        self._enemy_threshold = random.randint(*self.enemy_threshold_range)
-        self.dots_threshold_range = 70, 160
-        self.dots_columns_range = 1, 4
-        self.dots_speed = 7
+        return fired
 
-        self.enemies = [
-            lambda world: monospace.spawn_roll(world, 3)]
-        self.enemy_chances = [1]
 
-        self.rewards = [monospace.powerup_delay1,
-                        monospace.powerup_double_blasters]
-        self.num_rewards = 1
+def get_wave_importer():
+    return desper.get_resource_importer('waves', ('.json',))
 
 
-class SecondWaveShooter(DotsWave):
-    """Custom wave for the second one of the game."""
-    bg_color = SDL_Color(0, 35, 13, 255)
+class WaveHandle(desper.Handle):
+    """Handle for a wave definition file, compiled to a
+    :class:`WaveSpec`."""
 
-    def __init__(self):
+    def __init__(self, filename):
         super().__init__()
+        self.filename = filename
 
-        self.enemy_threshold_range = 100, 350
-        self._enemy_threshold = random.randint(*self.enemy_threshold_range)
-        self.dots_threshold_range = 70, 160
-        self.dots_columns_range = 1, 4
-        self.dots_speed = 7
-
-        self.enemies = [
-            monospace.spawn_shooter]
-        self.enemy_chances = [1]
+    def _load(self):
+        with open(self.filename) as file:
+            return WaveSpec(json.load(file))
 
-        self.rewards = [monospace.powerup_double_blasters,
-                        monospace.powerup_delay1,
-                        monospace.powerup_quick,
-                        monospace.powerup_help]
-        self.num_rewards = 2
+    def _prepare(self):
+        return self._load()
 
+    def _load_prepared(self, prepared):
+        return prepared
 
-class ThirdWave(DotsWave):
-    """Custom wave for the second one of the game."""
-    bg_color = SDL_Color(0, 0, 0, 255)
 
-    def __init__(self):
-        super().__init__()
+def load_wave(name):
+    """Build a new wave from its definition(``res/waves/<name>``).
 
-        self.enemy_threshold_range = 100, 300
-        self._enemy_threshold = random.randint(*self.enemy_threshold_range)
-        self.dots_threshold_range = 50, 150
-        self.dots_rows = 2
-        self.dots_columns_range = 1, 4
-        self.dots_speed = 8
+    :return: A :class:`DotsWave` if the definition has dots, a
+             :class:`Wave` otherwise.
+    """
+    spec = monospace.model.res['waves'][name].get()
+    return DotsWave(spec) if spec.has_dots else Wave(spec)
 
-        self.enemies = [
-            lambda world: monospace.spawn_roll(world, 3),
-            monospace.spawn_shooter,
-            lambda world: monospace.spawn_rocket(world, 4)]
-        self.enemy_chances = [10, 10, 1]
 
-        self.rewards = [monospace.powerup_add_blaster,
-                        monospace.powerup_delay1]
-        self.num_rewards = 2
+class Wave:
+    """A class representing a game's wave metadata.
 
+    It defines which enemies and with what probability can be spawned
+    during a specific wave(and which rewards can be assigned).
 
-class ThirdWaveRocket(DotsWave):
-    """Custom wave for the second one of the game."""
-    bg_color = SDL_Color(45, 0, 0, 255)
+    It also defines which rewards are spawned at the end of the wave
+    (a pool, and a quantity of extracted elements from that pool).
 
-    def __init__(self):
-        super().__init__()
+    The metadata comes from a compiled wave definition(see
+    :class:`WaveSpec`). Spawns are scheduled on a
+    :class:`WaveTimeline`, created when the wave starts spawning. The
+    resources of the scheduled spawns are preloaded in the meantime.
+    """
 
-        self.enemy_threshold_range = 50, 200
-        self._enemy_threshold = random.randint(*self.enemy_threshold_range)
-        self.dots_threshold_range = 50, 150
-        self.dots_rows = 2
-        self.dots_columns_range = 1, 4
-        self.dots_speed = 7
+    def __init__(self, spec):
+        self.spec = spec
+        self.bg_color = spec.bg_color
 
-        self.enemies = [self.spawn_rocket]
-        self.enemy_chances = [1]
+        self.enemies = spec.enemies
+        # Compiled table of Spawn instances, sampled once per spawn.
 
-        self.rewards = [monospace.powerup_add_blaster,
-                        monospace.powerup_delay1,
-                        monospace.powerup_shield]
-        self.num_rewards = 3
+        self.rewards = spec.rewards
+        # Powerup functions to be incapsulated into PowerupBox.
+        self.num_rewards = spec.num_rewards
+
+        self.enemy_threshold_range = spec.enemy_threshold_range
+        self.timeline = None
+        self._preloaders = []
+        self._preloading = set()    # Handles submitted to the preloaders
+
+    def sources(self):
+        """Get the iterators of spawn events of the wave(see
+        :class:`WaveTimeline`)."""
+        return [self.enemy_events()]
+
+    def enemy_events(self):
+        """Generate the enemy spawn events, endlessly."""
+        if not self.enemies:
+            return
+
+        tick = 0
+        while True:
+            tick += monospace.rng.randint(*self.enemy_threshold_range) + 1
+            yield tick, self.enemies.sample(monospace.rng), ()
+
+    def get_resources(self, function):
+        """Get the resources used by a spawn function of the wave."""
+        return getattr(function, 'resources', ())
+
+    def preload(self, events):
+        """Start preloading the resources of the given spawn events,
+        if they aren't loaded(or being preloaded) already."""
+        res = monospace.model.res
+        paths = set()
+        for _, function, _ in events:
+            paths.update(self.get_resources(function))
+
+        handles = [handle
+                   for handle in desper.collect_handles(res, sorted(paths))
+                   if not handle.loaded and handle not in self._preloading]
+        if handles:
+            self._preloading.update(handles)
+            self._preloaders.append(monospace.model.preload(*handles))
 
-    def spawn_rocket(self, world):
-        """Spawn special rockets."""
-        num = random.choice((1, 2))
+    def spawn(self, world):
+        """Main method that spawns enemies from this wave.
 
-        for _ in range(num):
-            speed = random.choices((3, 6, 10), (3, 1, 1))[0]
-            monospace.spawn_rocket(world, speed)
+        Called each frame while the wave is active.
+        """
+        if self.timeline is None:
+            self.timeline = WaveTimeline(self.sources(),
+                                         on_schedule=self.preload)
 
+        self.timeline.advance(world)
 
-class FourthWave(DotsWave):
-    """Custom wave for the second one of the game."""
-    bg_color = SDL_Color(45, 0, 45, 255)
+        if self._preloaders:
+            self._preloaders = [preloader for preloader in self._preloaders
+                                if not preloader.update()]
+            if not self._preloaders:
+                self._preloading.clear()
 
-    def __init__(self):
-        super().__init__()
+    def cancel_preload(self):
+        """Cancel the pending preloads(see :py:meth:`preload`).
 
-        self.enemy_threshold_range = 80, 200
-        self._enemy_threshold = random.randint(*self.enemy_threshold_range)
-        self.dots_threshold_range = 50, 150
-        self.dots_rows = 2
-        self.dots_columns_range = 2, 4
-        self.dots_speed = 8
-
-        self.enemies = [
-            lambda world: monospace.spawn_roll(world, 3),
-            lambda world: monospace.spawn_shooter(world, 7),
-            lambda world: monospace.spawn_rocket(world, 4),
-            lambda world: monospace.spawn_sphere(world, 4)]
-        self.enemy_chances = [3, 3, 2, 4]
+        Called when the wave ends or its world is dropped, so that the
+        data prepared in background is released.
+        """
+        for preloader in self._preloaders:
+            preloader.cancel()
+        self._preloaders = []
+        self._preloading.clear()
 
-        self.rewards = [monospace.powerup_add_blaster,
-                        monospace.powerup_delay1,
-                        monospace.powerup_double_blasters]
-        self.num_rewards = 2
+    def spawn_rewards(self, world):
+        """Method that spawns rewards for the cleared wave(powerups)."""
+        if self.num_rewards > 0:
+            rewards = monospace.rng.sample(self.rewards, self.num_rewards)
+            for i, reward in enumerate(rewards):
+                x = monospace.LOGICAL_WIDTH // (self.num_rewards + 1) * (i + 1)
+                y = monospace.LOGICAL_HEIGHT // 2
 
+                world.create_entity(
+                    monospace.PowerupBox(reward),
+                    dsdl.Position(x, y, dsdl.Offset.CENTER),
+                    dsdl.BoundingBox(dsdl.Offset.CENTER, w=50, h=50),
+                    monospace.model.res['text']['powerups']['blank'].get())
 
-class FifthWave(DotsWave):
-    """Custom wave for the second one of the game."""
-    bg_color = SDL_Color(0, 0, 0, 255)
 
-    def __init__(self):
-        super().__init__()
+class DotsWave(Wave):
+    """A wave that adds the chance for spawning dots.
 
-        self.enemy_threshold_range = 80, 120
-        self._enemy_threshold = random.randint(*self.enemy_threshold_range)
-        self.dots_threshold_range = 50, 100
-        self.dots_rows = 3
-        self.dots_columns_range = 2, 4
-        self.dots_speed = 8
+    The chance for spawning dots is completely separated from the
+    standard spawning probabilities, so that the spawned enemies are
+    simply spawned additionally to the dots.
+    """
 
-        self.enemies = [
-            lambda world: monospace.spawn_roll(world, 3),
-            lambda world: monospace.spawn_shooter(world, 8),
-            lambda world: monospace.spawn_rocket(world, 4),
-            lambda world: monospace.spawn_sphere(world, 4)]
-        self.enemy_chances = [1, 1, 1, 1]
+    def __init__(self, spec):
+        super().__init__(spec)
 
-        self.rewards = [monospace.powerup_delay1,
-                        monospace.powerup_drift,
-                        monospace.powerup_help]
-        self.num_rewards = 2
+        self.dots_threshold_range = spec.dots_threshold_range  # In frames
+        self.dots_rows = spec.dots_rows
+        self.dots_columns_range = spec.dots_columns_range
+        self.dots_speed = spec.dots_speed
 
+    def sources(self):
+        return super().sources() + [self.dots_events()]
 
-class SixthWave(DotsWave):
-    """Custom wave for the second one of the game."""
-    bg_color = SDL_Color(0, 0, 0, 255)
+    def dots_events(self):
+        """Generate the dots spawn events, endlessly."""
+        tick = 0
+        while True:
+            tick += monospace.rng.randint(*self.dots_threshold_range) + 1
+            yield (tick, self.spawn_dots,
+                   (monospace.rng.randint(*self.dots_columns_range),
+                    self.dots_rows))
 
-    def __init__(self):
-        super().__init__()
+    def get_resources(self, function):
+        if function == self.spawn_dots:
+            return ('text/enemies/' + self.spec.dot_texture,
+                    'text/part/circle')
 
-        self.enemy_threshold_range = 80, 120
-        self._enemy_threshold = random.randint(*self.enemy_threshold_range)
-        self.dots_threshold_range = 50, 100
-        self.dots_rows = 2
-        self.dots_columns_range = 2, 4
-        self.dots_speed = 9
+        return super().get_resources(function)
 
-        self.enemies = [
-            lambda world: monospace.spawn_roll(world, 4),
-            lambda world: monospace.spawn_shooter(world, 9),
-            lambda world: monospace.spawn_rocket(world, 5),
-            lambda world: monospace.spawn_sphere(world, 4)]
-        self.enemy_chances = [1, 1, 1, 1]
+    def spawn_dot(self, world, x, y=-50):
+        """Spawn a dot enemy at given position."""
+        dot_pool.acquire(
+            world, x, y, self.dots_speed,
+            monospace.model.res['text']['enemies'][
+                self.spec.dot_texture].get(),
+            self.spec.dot_enemy)
 
-        self.rewards = [monospace.powerup_quick, monospace.powerup_help]
-        self.num_rewards = 1
+    def spawn_dots(self, world, columns, rows):
+        """Spawn dot enemies in their infamous formation.
 
-    def spawn_dot(self, world, x, y=-50):
-        """Spawn stronger dot enemy at given position."""
-        world.create_entity(
-            dsdl.Position(x, y),
-            dsdl.BoundingBox(w=50, h=50), dsdl.Velocity(0, self.dots_speed),
-            monospace.model.res['text']['enemies']['dot2'].get(),
-            dsdl.Animation(2, 60), monospace.Dot2Enemy())
+        At random location horizontally.
+        """
+        base_x = (min(monospace.rng.randrange(0,
+                                              monospace.LOGICAL_WIDTH // 50),
+                      monospace.LOGICAL_WIDTH // 50 - columns) * 50)
 
+        y = -50
+        var_y = -50
+        var_x = 50
+        for i in range(rows):
+            x = base_x
+            for j in range(columns):
+                self.spawn_dot(world, x, y)
+                x += var_x
+            y -= var_y
 
-class SeventhWave(SixthWave):
-    """Custom wave for the second one of the game."""
-    bg_color = SDL_Color(30, 30, 30, 255)
 
-    def __init__(self):
-        super().__init__()
+class DotPool(desper.EntityPool):
+    """Pool of dot enemies(see :py:meth:`DotsWave.spawn_dot`).
 
-        self.enemy_threshold_range = 50, 100
-        self._enemy_threshold = random.randint(*self.enemy_threshold_range)
-        self.dots_threshold_range = 40, 80
-        self.dots_rows = 2
-        self.dots_columns_range = 2, 4
-        self.dots_speed = 10
+    The enemy component itself isn't recycled, since it may still be
+    referenced after its death(e.g. by running coroutines).
+    """
 
-        self.enemies = [
-            lambda world: monospace.spawn_roll2(world, 4),
-            lambda world: monospace.spawn_shooter(world, 12),
-            lambda world: monospace.spawn_rocket2(world, 5),
-            lambda world: monospace.spawn_sphere2(world, 4)]
-        self.enemy_chances = [1, 1, 1, 1]
+    def create(self, x, y, speed, texture, enemy_type):
+        """Build the components of a dot enemy.
 
-        self.rewards = [monospace.powerup_delay1]
-        self.num_rewards = 1
+        :param speed: Vertical speed of the dot.
+        :param texture: The texture of the dot.
+        :param enemy_type: The :class:`Enemy` subclass of the dot.
+        """
+        return (dsdl.Position(x, y), dsdl.BoundingBox(w=50, h=50),
+                dsdl.Velocity(0, speed), texture, dsdl.Animation(2, 60),
+                enemy_type())
 
+    def reset(self, components, x, y, speed, texture, enemy_type):
+        position, bbox, velocity, _, animation, _ = components
+        position.__init__(x, y)
+        bbox.__init__(w=50, h=50)
+        velocity.__init__(0, speed)
+        animation.__init__(2, 60)
 
-class InfWave(SixthWave):
-    """Custom wave for the second one of the game."""
-    bg_color = SDL_Color(0, 0, 0, 255)
+        return position, bbox, velocity, texture, animation, enemy_type()
 
-    def __init__(self):
-        super().__init__()
 
-        self.enemy_threshold_range = 50, 80
-        self._enemy_threshold = random.randint(*self.enemy_threshold_range)
-        self.dots_threshold_range = 30, 70
-        self.dots_rows = 3
-        self.dots_columns_range = 2, 4
-        self.dots_speed = 11
-
-        self.enemies = [
-            lambda world: monospace.spawn_roll2(world, 3),
-            lambda world: monospace.spawn_shooter(world, 15),
-            lambda world: monospace.spawn_rocket2(world,
-                                                  random.randint(6, 14)),
-            lambda world: monospace.spawn_sphere2(world, 7)]
-        self.enemy_chances = [1, 1, 1, 1]
-
-        self.rewards = [monospace.powerup_delay1]
-        self.num_rewards = 1
+dot_pool = DotPool()
+"""Pool of all the dot enemies."""
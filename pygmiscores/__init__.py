@@ -2,7 +2,16 @@ import enum
 import hashlib
 import json
 import base64
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter, Retry
+
+DEFAULT_UPSTREAM = 'https://gmiscores.altervista.org/api/v1'
+DEFAULT_TIMEOUT = 5         # Seconds, for both connect and read
+DEFAULT_RETRIES = 2
+DEFAULT_BACKOFF = .5        # Seconds, doubled at each retry
+DEFAULT_MAX_WORKERS = 2
+RETRY_STATUSES = 500, 502, 503, 504
 
 
 class SubmitMode(enum.Enum):
@@ -40,13 +49,71 @@ class Scores:
     For this class to correctly send requests, a the game secret
     is required(can be obtained from the site above).
 
+    Requests share a keep-alive session(one connection pool per
+    instance). Failed connections are retried with an exponential
+    backoff, as well as failed list requests(score submissions are
+    only retried if they didn't reach the server).
+
+    The *_async methods run the requests on a small pool of worker
+    threads, returning concurrent.futures.Future instances.
+
+    game_id - The game_id (from https://gmiscores.altervista.org)
+    secret - The game secret (from https://gmiscores.altervista.org)
+    upstream - Base url of the service(see DEFAULT_UPSTREAM)
+    timeout - Timeout of each request, in seconds
+    retries - Maximum number of retries of each request
+    backoff - Backoff factor between retries, in seconds
+    max_workers - Number of threads for asynchronous requests
+
     NOTE: private key security is not supported.
     """
-    upstream = 'https://gmiscores.altervista.org/api/v1'
+    upstream = DEFAULT_UPSTREAM
 
-    def __init__(self, game_id=-1, secret=''):
+    def __init__(self, game_id=-1, secret='', upstream=None,
+                 timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES,
+                 backoff=DEFAULT_BACKOFF, max_workers=DEFAULT_MAX_WORKERS):
         self.secret = secret
         self.game_id = game_id
+        if upstream is not None:
+            self.upstream = upstream
+        self.timeout = timeout
+        self.max_workers = max_workers
+
+        self.session = requests.Session()
+        retry = Retry(total=retries, backoff_factor=backoff,
+                      status_forcelist=RETRY_STATUSES,
+                      allowed_methods=frozenset({'GET'}),
+                      raise_on_status=False)
+        adapter = HTTPAdapter(max_retries=retry)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self._executor = None
+
+    def close(self):
+        """Close the session and stop the worker threads.
+
+        Pending asynchronous requests are completed first.
+        """
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _submit(self, fun, *args, **kwargs):
+        """Run a function on the worker threads, return a Future."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                self.max_workers, thread_name_prefix='pygmiscores')
+
+        return self._executor.submit(fun, *args, **kwargs)
 
     def game(self, game_id=None, secret=None):
         """Set the game id and secret for this instance, if given.
@@ -64,8 +131,8 @@ class Scores:
     def add_raw(self, username, score, mode=SubmitMode.ALL,
                 game_id=None, secret=None):
         """Submit a score online.
-        Note that this request is synchronous, run it in a separate
-        thread when used in real time applications.
+        Note that this request is synchronous, see add_async() for
+        real time applications.
 
         username - The username of the player
         score - The score of the player
@@ -96,15 +163,15 @@ class Scores:
                 .hexdigest()
         }
 
-        return requests.post('{}/add.php'.format(self.upstream),
-                             data=data)
+        return self.session.post('{}/add.php'.format(self.upstream),
+                                 data=data, timeout=self.timeout)
 
     @_json_parsed
     def add(self, username, score, mode=SubmitMode.ALL,
             game_id=None, secret=None):
         """Submit a score online.
-        Note that this request is synchronous, run it in a separate
-        thread when used in real time applications.
+        Note that this request is synchronous, see add_async() for
+        real time applications.
 
         username - The username of the player
         score - The score of the player
@@ -119,12 +186,25 @@ class Scores:
         return self.add_raw(username=username, score=score, mode=mode,
                             game_id=game_id, secret=secret)
 
+    def add_async(self, username, score, mode=SubmitMode.ALL,
+                  game_id=None, secret=None):
+        """Submit a score online, asynchronously.
+
+        Parameters are the same of add().
+
+        Return a concurrent.futures.Future, which result is the
+        dictionary returned by add(). Request errors(e.g.
+        requests.ConnectionError) are raised by its result() method.
+        """
+        return self._submit(self.add, username=username, score=score,
+                            mode=mode, game_id=game_id, secret=secret)
+
     def list_raw(self, game_id=None, page=0, perpage=10,
                  order=ScoreOrder.DESCENDING, player=None, start_time=None,
                  end_time=None, include_username=None):
         """Get a list of scores(unparsed).
-        Note that this request is synchronous, run it in a separate
-        thread when used in real time applications.
+        Note that this request is synchronous, see list_async() for
+        real time applications.
 
         page - The leaderboard page to inspect(only one page at a time)
         perpage - The number of records for page(max 1000)
@@ -172,15 +252,16 @@ class Scores:
             if val is None:
                 del data[key]
 
-        return requests.get('{}/list.php'.format(self.upstream), params=data)
+        return self.session.get('{}/list.php'.format(self.upstream),
+                                params=data, timeout=self.timeout)
 
     @_json_parsed
     def list_parsed(self, game_id=None, page=0, perpage=10,
                     order=ScoreOrder.DESCENDING, player=None, start_time=None,
                     end_time=None, include_username=None):
         """Get a list of scores(parsed).
-        Note that this request is synchronous, run it in a separate
-        thread when used in real time applications.
+        Note that this request is synchronous, see list_async() for
+        real time applications.
 
         page - The leaderboard page to inspect(only one page at a time)
         perpage - The number of records for page(max 1000)
@@ -204,6 +285,22 @@ class Scores:
             start_time=start_time, end_time=end_time,
             include_username=include_username, game_id=game_id)
 
+    def list_async(self, game_id=None, page=0, perpage=10,
+                   order=ScoreOrder.DESCENDING, player=None, start_time=None,
+                   end_time=None, include_username=None):
+        """Get a list of scores(parsed), asynchronously.
+
+        Parameters are the same of list_parsed().
+
+        Return a concurrent.futures.Future, which result is the
+        dictionary returned by list_parsed(). Request errors(e.g.
+        requests.ConnectionError) are raised by its result() method.
+        """
+        return self._submit(
+            self.list_parsed, page=page, perpage=perpage, order=order,
+            player=player, start_time=start_time, end_time=end_time,
+            include_username=include_username, game_id=game_id)
+
 
 # Instantiate one client and export methods to module level
 _inst = Scores()
@@ -213,3 +310,5 @@ add_raw = _inst.add_raw
 add = _inst.add
 list_raw = _inst.list_raw
 list_parsed = _inst.list_parsed
+add_async = _inst.add_async
+list_async = _inst.list_async
@@ -0,0 +1,64 @@
+"""Run headless games of monospace, printing score and speed."""
+import argparse
+import time
+import dsdl
+import monospace
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-n', '--games', type=int, default=1,
+                        help='number of games to simulate')
+    parser.add_argument('--max-ticks', type=int,
+                        default=monospace.simulation.DEFAULT_MAX_TICKS,
+                        help='maximum length of a game, in ticks')
+    parser.add_argument('--seed', type=int,
+                        help='seed of the games(random by default)')
+    parser.add_argument('--record', metavar='FILE',
+                        help='record the input of the last game on FILE')
+    parser.add_argument('--replay', metavar='FILE',
+                        help='replay a recorded game(implies -n 1)')
+    parser.add_argument('--stats', action='store_true',
+                        help='print entity pool and garbage collection '
+                             'statistics')
+    parser.add_argument('--no-pools', action='store_true',
+                        help="don't recycle entities(see --stats)")
+    args = parser.parse_args()
+
+    input_source = None
+    if args.replay is not None:
+        input_source = dsdl.InputReplayer(args.replay)
+        args.games = 1
+
+    model = monospace.init_headless_model(
+        input_source=input_source, seed=args.seed,
+        record_filename=args.record)
+    monospace.simulation.set_pools_enabled(not args.no_pools)
+
+    with monospace.simulation.GCMonitor() as gc_monitor:
+        for game in range(args.games):
+            start = time.perf_counter()
+            score, ticks = monospace.simulate(model, args.max_ticks)
+            elapsed = time.perf_counter() - start
+
+            print('game {}: seed {}, score {}, {} ticks in {:.2f}s '
+                  '({:.0f} ticks/s)'.format(
+                      game, model.res['game_world'].current_seed, score,
+                      ticks, elapsed, ticks / elapsed))
+
+    if args.stats:
+        for name, pool in monospace.get_pools().items():
+            stats = pool.stats
+            print('pool {}: {} created, {} reused ({:.0%}), {} released, '
+                  '{} discarded, {} free'.format(
+                      name, stats.created, stats.reused, stats.reuse_ratio,
+                      stats.released, stats.discarded, pool.free))
+
+        print('gc: {} collections per generation, {} collected, '
+              '{:.1f}ms paused'.format(
+                  gc_monitor.collections, gc_monitor.collected,
+                  gc_monitor.pause_time * 1000))
+
+
+if __name__ == '__main__':
+    main()